@@ -8,11 +8,48 @@ from .settings import (
     AWS_REGION,
     AWS_ACCESS_KEY,
     AWS_SECRET_ACCESS_KEY,
+    AWS_MAX_POOL_CONNECTIONS,
     S3_BUCKET_USER_DATA,
     S3_BUCKET_KNOWLEDGE_BASE,
     BEDROCK_AGENT_ID,
     BEDROCK_AGENT_ALIAS_ID,
+    BEDROCK_STATE_BACKEND,
+    BEDROCK_STATE_MAX_SESSIONS,
+    BEDROCK_STATE_TTL,
+    BEDROCK_STATE_MAX_HISTORY,
+    REDIS_URL,
+    BEDROCK_TURN_BUDGET,
+    BEDROCK_TURN_TOTAL_BUDGET,
+    BEDROCK_HEDGE_ENABLED,
+    BEDROCK_HEDGE_PERCENTILE,
+    BEDROCK_HEDGE_MIN_DELAY,
+    BEDROCK_FALLBACK_REGION,
+    BEDROCK_FALLBACK_AGENT_ID,
+    BEDROCK_FALLBACK_AGENT_ALIAS_ID,
+    BEDROCK_WARMUP_ENABLED,
+    BEDROCK_WARM_CONNECTIONS,
+    BEDROCK_KEEPALIVE_INTERVAL,
+    BEDROCK_PREFETCH_ENABLED,
     WHISPER_MODEL,
+    WHISPER_POOL_SIZE,
+    WHISPER_MAX_QUEUE,
+    WHISPER_REQUEST_TIMEOUT,
+    WHISPER_BATCH_MAX_SIZE,
+    WHISPER_BATCH_MAX_WAIT_MS,
+    STREAMING_STT_ENABLED,
+    STREAMING_STT_INTERVAL,
+    TTS_MAX_IN_FLIGHT,
+    TTS_STREAM_CHUNKS,
+    TTS_CACHE_MAX_MB,
+    TTS_CACHE_DIR,
+    TTS_CACHE_DISK_MAX_MB,
+    TTS_CACHE_S3_ENABLED,
+    SESSION_CODEC,
+    SESSION_FLUSH_INTERVAL,
+    ANALYTICS_SNAPSHOT_INTERVAL,
+    ANALYTICS_CACHE_ENABLED,
+    ANALYTICS_ROLLUP_FLUSH_INTERVAL,
+    ANALYTICS_INDEX_RETRY_INTERVAL,
     WS_CONNECTION_TIMEOUT
 )
 
@@ -24,11 +61,48 @@ __all__ = [
     "AWS_REGION",
     "AWS_ACCESS_KEY",
     "AWS_SECRET_ACCESS_KEY",
+    "AWS_MAX_POOL_CONNECTIONS",
     "S3_BUCKET_USER_DATA",
     "S3_BUCKET_KNOWLEDGE_BASE",
     "BEDROCK_AGENT_ID",
     "BEDROCK_AGENT_ALIAS_ID",
+    "BEDROCK_STATE_BACKEND",
+    "BEDROCK_STATE_MAX_SESSIONS",
+    "BEDROCK_STATE_TTL",
+    "BEDROCK_STATE_MAX_HISTORY",
+    "REDIS_URL",
+    "BEDROCK_TURN_BUDGET",
+    "BEDROCK_TURN_TOTAL_BUDGET",
+    "BEDROCK_HEDGE_ENABLED",
+    "BEDROCK_HEDGE_PERCENTILE",
+    "BEDROCK_HEDGE_MIN_DELAY",
+    "BEDROCK_FALLBACK_REGION",
+    "BEDROCK_FALLBACK_AGENT_ID",
+    "BEDROCK_FALLBACK_AGENT_ALIAS_ID",
+    "BEDROCK_WARMUP_ENABLED",
+    "BEDROCK_WARM_CONNECTIONS",
+    "BEDROCK_KEEPALIVE_INTERVAL",
+    "BEDROCK_PREFETCH_ENABLED",
     "WHISPER_MODEL",
+    "WHISPER_POOL_SIZE",
+    "WHISPER_MAX_QUEUE",
+    "WHISPER_REQUEST_TIMEOUT",
+    "WHISPER_BATCH_MAX_SIZE",
+    "WHISPER_BATCH_MAX_WAIT_MS",
+    "STREAMING_STT_ENABLED",
+    "STREAMING_STT_INTERVAL",
+    "TTS_MAX_IN_FLIGHT",
+    "TTS_STREAM_CHUNKS",
+    "TTS_CACHE_MAX_MB",
+    "TTS_CACHE_DIR",
+    "TTS_CACHE_DISK_MAX_MB",
+    "TTS_CACHE_S3_ENABLED",
+    "SESSION_CODEC",
+    "SESSION_FLUSH_INTERVAL",
+    "ANALYTICS_SNAPSHOT_INTERVAL",
+    "ANALYTICS_CACHE_ENABLED",
+    "ANALYTICS_ROLLUP_FLUSH_INTERVAL",
+    "ANALYTICS_INDEX_RETRY_INTERVAL",
     "WS_CONNECTION_TIMEOUT",
     # Interview types
     "get_interview_config",
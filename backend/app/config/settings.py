@@ -7,6 +7,7 @@ load_dotenv()
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))  # per shared client, also AWS executor size
 
 # S3 Configuration
 S3_BUCKET_USER_DATA = os.getenv("S3_BUCKET_USER_DATA", "prepai-user-data")
@@ -15,9 +16,51 @@ S3_BUCKET_KNOWLEDGE_BASE = os.getenv("S3_BUCKET_KNOWLEDGE_BASE", "prepai-knowled
 # Bedrock Configuration
 BEDROCK_AGENT_ID = os.getenv("BEDROCK_AGENT_ID", "")
 BEDROCK_AGENT_ALIAS_ID = os.getenv("BEDROCK_AGENT_ALIAS_ID", "")
+BEDROCK_STATE_BACKEND = os.getenv("BEDROCK_STATE_BACKEND", "memory")  # memory, redis or local
+BEDROCK_STATE_MAX_SESSIONS = int(os.getenv("BEDROCK_STATE_MAX_SESSIONS", "1000"))  # memory backend LRU bound
+BEDROCK_STATE_TTL = float(os.getenv("BEDROCK_STATE_TTL", "3600"))  # seconds idle before a session's state expires
+BEDROCK_STATE_MAX_HISTORY = int(os.getenv("BEDROCK_STATE_MAX_HISTORY", "40"))  # messages kept per session
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+BEDROCK_TURN_BUDGET = float(os.getenv("BEDROCK_TURN_BUDGET", "15"))  # seconds to first token per turn, 0 disables
+BEDROCK_TURN_TOTAL_BUDGET = float(os.getenv("BEDROCK_TURN_TOTAL_BUDGET", "90"))  # seconds for the whole response, 0 disables
+BEDROCK_HEDGE_ENABLED = os.getenv("BEDROCK_HEDGE_ENABLED", "false").lower() == "true"  # needs a fallback target
+BEDROCK_HEDGE_PERCENTILE = float(os.getenv("BEDROCK_HEDGE_PERCENTILE", "95"))  # of first-token latency
+BEDROCK_HEDGE_MIN_DELAY = float(os.getenv("BEDROCK_HEDGE_MIN_DELAY", "1.5"))  # seconds, also used until enough samples
+BEDROCK_FALLBACK_REGION = os.getenv("BEDROCK_FALLBACK_REGION", "")  # hedge/failover target region
+BEDROCK_FALLBACK_AGENT_ID = os.getenv("BEDROCK_FALLBACK_AGENT_ID", "")  # defaults to BEDROCK_AGENT_ID
+BEDROCK_FALLBACK_AGENT_ALIAS_ID = os.getenv("BEDROCK_FALLBACK_AGENT_ALIAS_ID", "")  # defaults to BEDROCK_AGENT_ALIAS_ID
+BEDROCK_WARMUP_ENABLED = os.getenv("BEDROCK_WARMUP_ENABLED", "true").lower() == "true"  # at startup and per WebSocket
+BEDROCK_WARM_CONNECTIONS = int(os.getenv("BEDROCK_WARM_CONNECTIONS", "2"))  # pooled connections kept warm per target
+BEDROCK_KEEPALIVE_INTERVAL = float(os.getenv("BEDROCK_KEEPALIVE_INTERVAL", "45"))  # seconds between keep-alive pings, 0 disables
+BEDROCK_PREFETCH_ENABLED = os.getenv("BEDROCK_PREFETCH_ENABLED", "false").lower() == "true"  # warm-only throwaway first turn during the greeting; output discarded
 
 # Voice Models Configuration
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "2"))  # model instances / worker threads
+WHISPER_MAX_QUEUE = int(os.getenv("WHISPER_MAX_QUEUE", "32"))
+WHISPER_REQUEST_TIMEOUT = float(os.getenv("WHISPER_REQUEST_TIMEOUT", "30"))  # max seconds queued
+WHISPER_BATCH_MAX_SIZE = int(os.getenv("WHISPER_BATCH_MAX_SIZE", "8"))  # 1 disables cross-session batching
+WHISPER_BATCH_MAX_WAIT_MS = float(os.getenv("WHISPER_BATCH_MAX_WAIT_MS", "30"))
+STREAMING_STT_ENABLED = os.getenv("STREAMING_STT_ENABLED", "true").lower() == "true"
+STREAMING_STT_INTERVAL = float(os.getenv("STREAMING_STT_INTERVAL", "1.0"))  # seconds between interim passes
+
+# TTS Configuration
+TTS_MAX_IN_FLIGHT = int(os.getenv("TTS_MAX_IN_FLIGHT", "3"))  # concurrent sentence syntheses per reply
+TTS_STREAM_CHUNKS = os.getenv("TTS_STREAM_CHUNKS", "true").lower() == "true"  # allow clients to opt in via audio_config
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "64"))  # in-memory tier, 0 disables the cache
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "")  # optional on-disk tier
+TTS_CACHE_DISK_MAX_MB = int(os.getenv("TTS_CACHE_DISK_MAX_MB", "512"))
+TTS_CACHE_S3_ENABLED = os.getenv("TTS_CACHE_S3_ENABLED", "false").lower() == "true"  # shared tier under tts-cache/
+
+# Session Persistence
+SESSION_CODEC = os.getenv("SESSION_CODEC", "json")  # json (compact), gzip, zstd or msgpack
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "5.0"))  # seconds between write-behind flushes
+
+# Analytics Configuration
+ANALYTICS_SNAPSHOT_INTERVAL = float(os.getenv("ANALYTICS_SNAPSHOT_INTERVAL", "900"))  # seconds between exports, 0 disables
+ANALYTICS_CACHE_ENABLED = os.getenv("ANALYTICS_CACHE_ENABLED", "true").lower() == "true"  # in-process response cache
+ANALYTICS_ROLLUP_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_ROLLUP_FLUSH_INTERVAL", "2.0"))  # seconds between rollup batch writes
+ANALYTICS_INDEX_RETRY_INTERVAL = float(os.getenv("ANALYTICS_INDEX_RETRY_INTERVAL", "10"))  # seconds between retries of failed index writes
 
 # WebSocket Configuration
 WS_CONNECTION_TIMEOUT = int(os.getenv("WS_CONNECTION_TIMEOUT", "900"))  # 15 minutes
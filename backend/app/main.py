@@ -28,6 +28,49 @@ app.include_router(websocket.router)
 app.include_router(code.router)
 app.include_router(analytics.router)
 
+@app.on_event("startup")
+async def start_analytics_snapshot_export():
+    """Periodically re-export the columnar analytics snapshot, if enabled"""
+    from app.config import ANALYTICS_SNAPSHOT_INTERVAL
+    if ANALYTICS_SNAPSHOT_INTERVAL > 0:
+        from app.services.analytics_snapshot_service import get_snapshot_service
+        get_snapshot_service().start_periodic_export(ANALYTICS_SNAPSHOT_INTERVAL)
+
+@app.on_event("startup")
+async def start_bedrock_warmup():
+    """Open Bedrock connections before the first interview and keep them alive"""
+    from app.config import BEDROCK_WARMUP_ENABLED
+    if BEDROCK_WARMUP_ENABLED:
+        from app.services.bedrock_warmup import get_bedrock_warmer
+        get_bedrock_warmer().start()
+
+@app.on_event("shutdown")
+async def stop_bedrock_warmup():
+    from app.services import bedrock_warmup
+    if bedrock_warmup.bedrock_warmer:
+        bedrock_warmup.bedrock_warmer.stop()
+
+@app.on_event("shutdown")
+async def flush_analytics_rollups():
+    """Apply any queued analytics rollup events before the process exits"""
+    from app.services import analytics_rollup_service
+    if analytics_rollup_service.rollup_service:
+        analytics_rollup_service.rollup_service.stop()
+
+@app.on_event("shutdown")
+async def retry_session_index_writes():
+    """Retry any queued candidate index and manifest writes before the process exits"""
+    from app.services import session_index_writer
+    if session_index_writer.session_index_writer:
+        session_index_writer.session_index_writer.stop()
+
+@app.on_event("shutdown")
+async def flush_session_writes():
+    """Persist any buffered session updates before the process exits"""
+    from app.services import session_write_buffer
+    if session_write_buffer.session_write_buffer:
+        session_write_buffer.session_write_buffer.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -45,6 +88,63 @@ async def health_check():
         "service": "prepai-backend"
     }
 
+@app.get("/health/tts")
+async def tts_health():
+    """TTS audio cache hit/miss counters"""
+    from app.services.tts_service import get_tts_cache
+    cache = get_tts_cache()
+    return {
+        "cache_enabled": cache is not None,
+        "cache": cache.stats() if cache else None
+    }
+
+@app.get("/health/stt")
+async def stt_health():
+    """Whisper worker pool queue depth and latency metrics"""
+    from app.services import transcription_service
+    pool = transcription_service.whisper_pool
+    batcher = transcription_service.batch_scheduler
+    return {
+        "status": "ready" if pool else "not_loaded",
+        "pool": pool.stats() if pool else None,
+        "batching": batcher.stats() if batcher else None
+    }
+
+@app.get("/health/sessions")
+async def sessions_health():
+    """Write-behind session buffer counters"""
+    from app.services.session_write_buffer import get_session_write_buffer
+    return get_session_write_buffer().stats()
+
+@app.get("/health/cache")
+async def cache_health():
+    """Analytics response cache counters"""
+    from app.services.response_cache import get_analytics_cache
+    return get_analytics_cache().stats()
+
+@app.get("/health/analytics")
+async def analytics_health():
+    """Rollup event queue and candidate index / manifest write retry counters"""
+    from app.services.analytics_rollup_service import get_rollup_service
+    from app.services.session_index_writer import get_session_index_writer
+    return {
+        "rollups": get_rollup_service().stats(),
+        "indexes": get_session_index_writer().stats()
+    }
+
+@app.get("/health/bedrock")
+async def bedrock_health():
+    """Bedrock latency histograms, hedging counters, warm-up and session state store counters"""
+    from app.services import bedrock_warmup
+    from app.services.bedrock_service import invocation_stats
+    from app.services.session_state_store import get_session_state_store
+    warmer = bedrock_warmup.bedrock_warmer
+    return {
+        "invocations": invocation_stats(),
+        "warmup": warmer.stats() if warmer else None,
+        "session_state": get_session_state_store().stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
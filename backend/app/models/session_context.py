@@ -0,0 +1,196 @@
+"""
+Session Context Model
+Per-connection view of an interview session, loaded once and kept in memory
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import BEDROCK_STATE_MAX_HISTORY
+from app.config.interview_types import get_interview_config
+from app.services.aws_clients import run_blocking
+from app.services.session_write_buffer import get_session_write_buffer
+
+DEFAULT_PHASES = ["introduction", "background", "technical", "problem_solving", "closing"]
+
+
+class SessionContext:
+    """
+    Session data, resolved interview configuration, turn count and transcript
+    for one WebSocket connection.
+
+    The session document is read once when the connection starts. After that
+    every update is applied locally and queued in the session write buffer,
+    which flushes it to storage in the background, so the voice-turn hot path
+    never waits on S3.
+    """
+
+    def __init__(self, s3_service, session_id: str, session_data: Optional[Dict[str, Any]]):
+        self.s3_service = s3_service
+        self.write_buffer = get_session_write_buffer()
+        self.session_id = session_id
+        self.session_data = session_data or {}
+        self.exists = bool(session_data)
+
+        self.candidate_name = self.session_data.get("candidate_name", "candidate")
+        self.interview_type = self.session_data.get("interview_type", "Technical Interview")
+        self.resume_summary = self.session_data.get("resume_summary", "Not provided")
+        self.interview_config = get_interview_config(self.interview_type)
+
+        self.transcript: List[Dict[str, Any]] = list(self.session_data.get("transcript", []))
+        self.turn_count = len([msg for msg in self.transcript if msg.get("role") == "user"])
+
+        # Agent history from the session state store, when it is ahead of the loaded transcript
+        self.restored_history: Optional[List[Dict[str, Any]]] = None
+        self._restored_at = 0
+
+    @classmethod
+    async def load(cls, s3_service, session_id: str) -> "SessionContext":
+        """
+        Fetch the session document once, off the event loop
+
+        Args:
+            s3_service: Storage service used for the initial read and write-through
+            session_id: Session identifier
+
+        Returns:
+            SessionContext for the connection
+        """
+        session_data = await s3_service.aio.get_session(
+            session_id, fields=("candidate_name", "interview_type", "resume_summary", "transcript")
+        )
+        context = cls(s3_service, session_id, session_data)
+        print(f"[{session_id}] Session context loaded: candidate={context.candidate_name}, "
+              f"type={context.interview_type}, turns={context.turn_count}")
+        return context
+
+    @property
+    def phases(self) -> List[str]:
+        return self.interview_config.get("phases", DEFAULT_PHASES)
+
+    @property
+    def current_phase(self) -> str:
+        """
+        Determine current phase based on turn count and phase progression
+        Coding practice: ["introduction", "coding"] - 2 phases
+        Regular interviews: ["introduction", "background", "technical", "problem_solving", "closing"] - 5 phases
+        """
+        phases = self.phases
+        turn_count = self.turn_count
+
+        if turn_count == 0:
+            return phases[0]  # introduction
+        elif turn_count <= 1:
+            return phases[1] if len(phases) > 1 else phases[0]  # coding or background
+        elif len(phases) == 2:
+            # Coding practice - stay in coding phase
+            return phases[1]  # coding
+        elif turn_count <= 3:
+            return phases[2] if len(phases) > 2 else phases[-1]  # technical or behavioral
+        elif turn_count <= 8:
+            return phases[3] if len(phases) > 3 else phases[-1]  # problem_solving or scenario_based
+        else:
+            return phases[-1]  # closing
+
+    def conversation_history(self, max_messages: int = BEDROCK_STATE_MAX_HISTORY) -> List[Dict[str, Any]]:
+        """
+        The newest user and assistant messages of the transcript
+
+        Args:
+            max_messages: Number of messages to keep (0 for none)
+
+        Returns:
+            List of {"role", "content"} dicts, oldest first
+        """
+        if max_messages <= 0:
+            return []
+        history = list(self.restored_history or [])
+        history += [
+            {"role": message["role"], "content": message["content"]}
+            for message in self.transcript[self._restored_at:]
+            if message.get("role") in ("user", "assistant") and message.get("content")
+        ]
+        return history[-max_messages:]
+
+    def restore_agent_state(self, session_state: Dict[str, Any]) -> bool:
+        """
+        Adopt the agent state recorded by an earlier connection if it is ahead
+
+        After a reconnect the transcript may lack turns that are still buffered
+        on another worker; the stored history and turn count then stand in for
+        them, and messages recorded from now on are added after them.
+
+        Args:
+            session_state: State from BedrockService.resume_session
+
+        Returns:
+            True if the stored state was adopted
+        """
+        stored_turns = session_state.get("turnCount", 0)
+        if stored_turns <= self.turn_count:
+            return False
+        self.restored_history = [
+            {"role": message["role"], "content": message["content"]}
+            for message in session_state.get("conversationHistory", [])
+        ]
+        self._restored_at = len(self.transcript)
+        self.turn_count = stored_turns
+        return True
+
+    def bedrock_session_state(self) -> Dict[str, Any]:
+        """
+        Session state passed to BedrockService.astream_agent
+
+        Built before the turn's user message is recorded, so conversationHistory
+        holds only earlier turns; it is replayed to agent targets that do not
+        share the primary's agent memory.
+        """
+        return {
+            "interviewType": self.interview_type,
+            "candidateName": self.candidate_name,
+            "resumeSummary": self.resume_summary,
+            "turnCount": self.turn_count,
+            "currentPhase": self.current_phase,
+            "difficultyLevel": "medium",  # Adapt based on performance
+            "conversationHistory": self.conversation_history()
+        }
+
+    def context_prefix(self) -> str:
+        """Interview context line prepended to the candidate's input"""
+        config = self.interview_config
+        display_name = config.get("display_name", self.interview_type)
+        focus_areas = config.get("focus_areas", "technical skills")
+        key_topics = config.get("key_topics", "general topics")
+        difficulty = config.get("difficulty_range", "medium")
+
+        return (f"[CONTEXT: Interviewing {self.candidate_name} for {display_name}. Focus: {focus_areas}. "
+                f"Topics: {key_topics}. Difficulty: {difficulty}. Current phase: {self.current_phase}.]\n")
+
+    def append_message(self, role: str, content: str, **extra) -> Dict[str, Any]:
+        """
+        Record a transcript message locally and queue it for the next buffered flush
+
+        Args:
+            role: "user", "assistant" or "system"
+            content: Message text
+            **extra: Additional fields stored with the message (e.g. code, testResults)
+
+        Returns:
+            The stored message
+        """
+        message = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.utcnow().isoformat(),
+            **extra
+        }
+        self.transcript.append(message)
+        if role == "user":
+            self.turn_count += 1
+
+        self.write_buffer.append_transcript(self.session_id, message)
+        return message
+
+    async def flush(self) -> bool:
+        """Flush buffered updates for this session (turn boundaries and disconnect)"""
+        return await run_blocking(self.write_buffer.flush, self.session_id)
@@ -3,54 +3,59 @@ Analytics Router
 Performance analytics, benchmarks, and trend analysis
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
-from app.services.s3_service import S3Service
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from collections import defaultdict
+from app.services.analytics_rollup_service import benchmark_sketches, get_rollup_service, sketch_percentiles
+from app.services.analytics_snapshot_service import GROUP_BY_COLUMNS, SCORE_COLUMNS, get_snapshot_service
+from app.services.candidate_index_service import CandidateIndexService
+from app.services.session_manifest_service import SessionManifestService
+from app.services.response_cache import cached_response, get_analytics_cache
+from app.services.aws_clients import run_blocking
+from typing import Optional
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
-s3_service = S3Service()
+rollup_service = get_rollup_service()
+candidate_index = CandidateIndexService(rollup_service.s3_service)
+session_manifest = SessionManifestService(rollup_service.s3_service)
+analytics_cache = get_analytics_cache()
+
+
+def parse_datetime_param(value: Optional[str], name: str) -> Optional[datetime]:
+    """
+    Parse an ISO date/time query parameter as naive UTC (how session timestamps are stored)
+
+    Raises:
+        HTTPException: 400 if the value is not an ISO date or date-time
+    """
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO date (YYYY-MM-DD) or date-time")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 
 @router.get("/aggregate")
+@cached_response(analytics_cache, "aggregate", ttl=30, stale_ttl=300)
 async def get_aggregate_analytics():
     """Get aggregate statistics across all interviews"""
     try:
-        # Get all sessions
-        all_sessions = s3_service.list_all_sessions()
+        rollups = await run_blocking(rollup_service.get_rollups)
+        total = rollups["total_interviews"]
 
-        if not all_sessions:
+        if not total:
             return JSONResponse(content={
                 "success": True,
                 "total_interviews": 0,
                 "message": "No interview data yet"
             })
 
-        # Calculate aggregates
-        total = len(all_sessions)
-        completed = sum(1 for s in all_sessions if s.get('status') == 'completed')
-
-        # Interview types distribution
-        interview_types = defaultdict(int)
-        for session in all_sessions:
-            interview_types[session.get('interview_type', 'Unknown')] += 1
-
-        # Average scores
-        scores = [
-            s.get('performance_report', {}).get('overallScore', 0)
-            for s in all_sessions
-            if s.get('performance_report')
-        ]
-        avg_score = sum(scores) / len(scores) if scores else 0
-
-        # Recommendations distribution
-        recommendations = defaultdict(int)
-        for session in all_sessions:
-            rec = session.get('performance_report', {}).get('recommendation')
-            if rec:
-                recommendations[rec] += 1
+        completed = rollups["completed_interviews"]
+        avg_score = rollups["score_sum"] / rollups["score_count"] if rollups["score_count"] else 0
 
         return JSONResponse(content={
             "success": True,
@@ -58,9 +63,9 @@ async def get_aggregate_analytics():
             "completed_interviews": completed,
             "completion_rate": round((completed / total) * 100, 2) if total > 0 else 0,
             "average_score": round(avg_score, 2),
-            "interview_types": dict(interview_types),
-            "recommendations": dict(recommendations),
-            "total_candidates": len(set(s.get('candidate_name') for s in all_sessions))
+            "interview_types": rollups["interview_types"],
+            "recommendations": rollups["recommendations"],
+            "total_candidates": rollups["candidate_count"]
         })
 
     except Exception as e:
@@ -68,18 +73,42 @@ async def get_aggregate_analytics():
 
 
 @router.get("/benchmarks/{interview_type}")
-async def get_benchmarks(interview_type: str):
-    """Get benchmark scores for specific interview type"""
+@cached_response(analytics_cache, "benchmarks", ttl=60, stale_ttl=600)
+async def get_benchmarks(
+    interview_type: str,
+    percentiles: str = "25,50,75,90",
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """
+    Get benchmark scores for specific interview type
+
+    Args:
+        percentiles: Comma-separated percentiles to report (0-100)
+        since: First interview day to include (ISO date; a date-time selects its UTC day)
+        until: Last interview day to include (ISO date; a date-time selects its UTC day)
+    """
     try:
-        # Get all sessions of this type
-        all_sessions = s3_service.list_all_sessions()
-        type_sessions = [
-            s for s in all_sessions
-            if s.get('interview_type', '').lower() == interview_type.lower()
-            and s.get('performance_report')
-        ]
-
-        if not type_sessions:
+        try:
+            requested = [float(p) for p in percentiles.split(",") if p.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="percentiles must be comma-separated numbers")
+        if any(p < 0 or p > 100 for p in requested):
+            raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+        since_at = parse_datetime_param(since, "since")
+        until_at = parse_datetime_param(until, "until")
+        if since_at and until_at and since_at > until_at:
+            raise HTTPException(status_code=400, detail="since must not be after until")
+        # Benchmark sketches are kept per day, keyed YYYY-MM-DD
+        since_day = since_at.date().isoformat() if since_at else None
+        until_day = until_at.date().isoformat() if until_at else None
+
+        sketches = benchmark_sketches(
+            await run_blocking(rollup_service.get_rollups), interview_type, since_day, until_day
+        )
+        sample_size = int(sketches["overall"].count) if "overall" in sketches else 0
+
+        if not sample_size:
             return JSONResponse(content={
                 "success": True,
                 "interview_type": interview_type,
@@ -87,77 +116,35 @@ async def get_benchmarks(interview_type: str):
                 "message": "No benchmark data available"
             })
 
-        # Calculate benchmarks
-        scores = []
-        for session in type_sessions:
-            report = session.get('performance_report', {})
-            if report.get('overallScore'):
-                scores.append({
-                    'overall': report['overallScore'],
-                    'technical': report.get('scores', {}).get('technicalKnowledge', 0),
-                    'problem_solving': report.get('scores', {}).get('problemSolving', 0),
-                    'communication': report.get('scores', {}).get('communication', 0),
-                    'code_quality': report.get('scores', {}).get('codeQuality', 0),
-                    'cultural_fit': report.get('scores', {}).get('culturalFit', 0)
-                })
-
-        if not scores:
-            return JSONResponse(content={
-                "success": True,
-                "interview_type": interview_type,
-                "has_data": False
-            })
-
-        # Calculate percentiles
-        def calculate_percentiles(values):
-            sorted_values = sorted(values)
-            n = len(sorted_values)
-            return {
-                "p25": sorted_values[n // 4] if n > 0 else 0,
-                "p50": sorted_values[n // 2] if n > 0 else 0,
-                "p75": sorted_values[3 * n // 4] if n > 0 else 0,
-                "p90": sorted_values[9 * n // 10] if n > 0 else 0,
-                "min": min(sorted_values) if sorted_values else 0,
-                "max": max(sorted_values) if sorted_values else 0,
-                "avg": sum(sorted_values) / len(sorted_values) if sorted_values else 0
-            }
-
         benchmarks = {
-            "overall": calculate_percentiles([s['overall'] for s in scores]),
-            "technical": calculate_percentiles([s['technical'] for s in scores]),
-            "problem_solving": calculate_percentiles([s['problem_solving'] for s in scores]),
-            "communication": calculate_percentiles([s['communication'] for s in scores]),
-            "code_quality": calculate_percentiles([s['code_quality'] for s in scores]),
-            "cultural_fit": calculate_percentiles([s['cultural_fit'] for s in scores])
+            dimension: sketch_percentiles(sketch, requested)
+            for dimension, sketch in sketches.items()
         }
 
         return JSONResponse(content={
             "success": True,
             "interview_type": interview_type,
             "has_data": True,
-            "sample_size": len(scores),
+            "sample_size": sample_size,
             "benchmarks": benchmarks
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/trends")
-async def get_trends(days: int = 30):
+@cached_response(analytics_cache, "trends", ttl=60, stale_ttl=600)
+async def get_trends(days: int = Query(30, ge=1, le=366), interview_type: Optional[str] = None):
     """Get performance trends over time"""
     try:
-        # Get sessions from last N days
+        # Only the manifest partitions of the last N days are read
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        all_sessions = s3_service.list_all_sessions()
-
-        recent_sessions = [
-            s for s in all_sessions
-            if datetime.fromisoformat(s.get('created_at', '2000-01-01')) >= cutoff_date
-            and s.get('performance_report')
-        ]
+        trend_data = await run_blocking(session_manifest.daily_scores, cutoff_date, interview_type=interview_type)
 
-        if not recent_sessions:
+        if not trend_data:
             return JSONResponse(content={
                 "success": True,
                 "days": days,
@@ -165,29 +152,6 @@ async def get_trends(days: int = 30):
                 "message": "No data in timeframe"
             })
 
-        # Group by date
-        daily_stats = defaultdict(lambda: {'scores': [], 'count': 0})
-
-        for session in recent_sessions:
-            date = datetime.fromisoformat(session['created_at']).date().isoformat()
-            score = session.get('performance_report', {}).get('overallScore')
-
-            if score:
-                daily_stats[date]['scores'].append(score)
-                daily_stats[date]['count'] += 1
-
-        # Calculate daily averages
-        trend_data = []
-        for date in sorted(daily_stats.keys()):
-            stats = daily_stats[date]
-            avg_score = sum(stats['scores']) / len(stats['scores']) if stats['scores'] else 0
-
-            trend_data.append({
-                "date": date,
-                "average_score": round(avg_score, 2),
-                "num_interviews": stats['count']
-            })
-
         # Calculate overall trend
         if len(trend_data) >= 2:
             first_avg = trend_data[0]['average_score']
@@ -212,46 +176,119 @@ async def get_trends(days: int = 30):
 
 
 @router.get("/candidate/{candidate_name}/history")
-async def get_candidate_history(candidate_name: str):
-    """Get interview history for specific candidate"""
+@cached_response(analytics_cache, "candidate_history", ttl=30, stale_ttl=120)
+async def get_candidate_history(
+    candidate_name: str,
+    since: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Get interview history for specific candidate
+
+    Args:
+        since: Only sessions created on or after this date (YYYY-MM-DD)
+        limit: Page size for scores_over_time
+        offset: Number of scored sessions to skip
+    """
     try:
-        all_sessions = s3_service.list_all_sessions()
-        candidate_sessions = [
-            s for s in all_sessions
-            if s.get('candidate_name', '').lower() == candidate_name.lower()
-        ]
+        try:
+            history = await run_blocking(candidate_index.get_history, candidate_name, since=since, limit=limit, offset=offset)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        if not candidate_sessions:
+        if not history or not history["total_interviews"]:
             return JSONResponse(content={
                 "success": True,
                 "candidate_name": candidate_name,
                 "has_history": False
             })
 
-        # Sort by date
-        candidate_sessions.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-
-        # Calculate progression
         scores_over_time = [
             {
-                "date": s.get('created_at'),
-                "interview_type": s.get('interview_type'),
-                "score": s.get('performance_report', {}).get('overallScore'),
-                "recommendation": s.get('performance_report', {}).get('recommendation')
+                "date": entry["date"],
+                "interview_type": entry["interview_type"],
+                "score": entry["score"],
+                "recommendation": entry["recommendation"]
             }
-            for s in candidate_sessions
-            if s.get('performance_report')
+            for entry in history["page"]
         ]
+        next_offset = offset + len(scores_over_time)
 
         return JSONResponse(content={
             "success": True,
             "candidate_name": candidate_name,
             "has_history": True,
-            "total_interviews": len(candidate_sessions),
-            "completed_interviews": sum(1 for s in candidate_sessions if s.get('status') == 'completed'),
+            "total_interviews": history["total_interviews"],
+            "completed_interviews": history["completed_interviews"],
             "scores_over_time": scores_over_time,
-            "latest_score": scores_over_time[0]['score'] if scores_over_time else None
+            "latest_score": history["latest_score"],
+            "total_scored": history["total_scored"],
+            "next_offset": next_offset if next_offset < history["total_scored"] else None
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/explore")
+@cached_response(analytics_cache, "explore", ttl=60, stale_ttl=300)
+async def explore_analytics(
+    group_by: str = "interview_type",
+    metric: str = "overall",
+    percentiles: str = "",
+    interview_type: Optional[str] = None,
+    candidate_name: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    completed_only: bool = False
+):
+    """
+    Ad-hoc group-by over the columnar analytics snapshot
+
+    Args:
+        group_by: interview_type, recommendation, candidate, status or day
+        metric: Score to summarize (overall, technical, problem_solving, communication, code_quality, cultural_fit)
+        percentiles: Comma-separated percentiles of the metric per group
+        interview_type, candidate_name, since, until, completed_only: Row filters
+    """
+    try:
+        if group_by not in GROUP_BY_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(GROUP_BY_COLUMNS)}")
+        if metric not in SCORE_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(SCORE_COLUMNS)}")
+        try:
+            requested = [float(p) for p in percentiles.split(",") if p.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="percentiles must be comma-separated numbers")
+        if any(p < 0 or p > 100 for p in requested):
+            raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+        since_at = parse_datetime_param(since, "since")
+        until_at = parse_datetime_param(until, "until")
+        if since_at and until_at and since_at > until_at:
+            raise HTTPException(status_code=400, detail="since must not be after until")
+
+        snapshot = await run_blocking(get_snapshot_service().get_snapshot)
+        mask = snapshot.mask(
+            interview_type=interview_type,
+            candidate_name=candidate_name,
+            since=since_at.isoformat() if since_at else None,
+            until=until_at.isoformat() if until_at else None,
+            completed_only=completed_only
+        )
+
+        return JSONResponse(content={
+            "success": True,
+            "snapshot_created_at": snapshot.created_at,
+            "group_by": group_by,
+            "metric": metric,
+            "matched_sessions": int(mask.sum()),
+            "groups": snapshot.group_by(group_by, metric, requested, mask)
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -11,7 +11,8 @@ from datetime import datetime
 import uuid
 
 from app.services.lambda_service import LambdaService
-from app.services.s3_service import S3Service
+from app.services.session_write_buffer import get_session_write_buffer
+from app.services.aws_clients import run_blocking
 from app.models.code_submission import (
     CodeSubmission,
     TestCaseResult,
@@ -20,7 +21,7 @@ from app.models.code_submission import (
 
 router = APIRouter(prefix="/api/code", tags=["code"])
 lambda_service = LambdaService()
-s3_service = S3Service()
+session_buffer = get_session_write_buffer()
 
 
 class TestCaseRequest(BaseModel):
@@ -49,7 +50,7 @@ async def execute_code(request: CodeExecutionRequest):
     """
     try:
         # Execute code via Lambda
-        result = lambda_service.invoke_code_executor(
+        result = await lambda_service.aio.invoke_code_executor(
             code=request.code,
             language=request.language,
             test_cases=[{"input": tc.input, "expected": tc.expected} for tc in request.testCases],
@@ -89,14 +90,8 @@ async def execute_code(request: CodeExecutionRequest):
             error=result.get('error')
         )
 
-        # Store in session
-        session_data = s3_service.get_session(request.sessionId)
-        if session_data:
-            if 'code_submissions' not in session_data:
-                session_data['code_submissions'] = []
-
-            session_data['code_submissions'].append(submission.to_dict())
-            s3_service.save_session(session_data)
+        # Store in session (buffered; coalesced with other writes for this session)
+        session_buffer.append_to_list(request.sessionId, 'code_submissions', submission.to_dict())
 
         # Return results
         return JSONResponse(content={
@@ -118,7 +113,7 @@ async def execute_code(request: CodeExecutionRequest):
 async def get_code_submissions(session_id: str):
     """Get all code submissions for a session"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await run_blocking(session_buffer.get_session, session_id, fields=("code_submissions",))
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -148,7 +143,7 @@ async def get_code_submissions(session_id: str):
 async def get_code_submission(session_id: str, submission_id: str):
     """Get a specific code submission"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await run_blocking(session_buffer.get_session, session_id, fields=("code_submissions",))
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -174,7 +169,7 @@ async def get_code_submission(session_id: str, submission_id: str):
 async def get_quality_summary(session_id: str):
     """Get code quality summary for a session"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await run_blocking(session_buffer.get_session, session_id, fields=("code_submissions",))
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -2,6 +2,11 @@ from fastapi import APIRouter, HTTPException, UploadFile, File
 from fastapi.responses import JSONResponse
 from app.models.session import TranscriptResponse, TranscriptMessage, EndSessionResponse
 from app.services.s3_service import S3Service
+from app.services.session_write_buffer import get_session_write_buffer
+from app.services.analytics_rollup_service import get_rollup_service
+from app.services.session_index_writer import get_session_index_writer
+from app.services.response_cache import get_analytics_cache
+from app.services.aws_clients import run_blocking
 from app.services.lambda_service import LambdaService
 from app.services.textract_service import TextractService, IndustrySkillExtractor
 from datetime import datetime
@@ -10,14 +15,24 @@ import json
 
 router = APIRouter(prefix="/api/interviews", tags=["interviews"])
 s3_service = S3Service()
+session_buffer = get_session_write_buffer()
+rollup_service = get_rollup_service()
+session_indexes = get_session_index_writer()
 lambda_service = LambdaService()
 textract_service = TextractService()
 
+def record_session_completed(previous_session: dict, session_data: dict):
+    """Update the analytics rollups, candidate index and session manifest for a completed session"""
+    rollup_service.record_session_completed(previous_session, session_data)
+    session_indexes.record_session(session_data)  # failed index writes are queued for retry
+    # Ending is already slow (report generation), so apply the queued rollup events before invalidating
+    rollup_service.flush()
+
 @router.get("/{session_id}/transcript", response_model=TranscriptResponse)
 async def get_transcript(session_id: str):
     """Get full interview transcript"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await run_blocking(session_buffer.get_session, session_id, fields=("transcript",))
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -45,11 +60,20 @@ async def get_transcript(session_id: str):
 async def end_interview(session_id: str):
     """End interview session and generate performance report"""
     try:
-        session_data = s3_service.get_session(session_id)
+        # Durably flush buffered writes, then fold the transcript log into the session document
+        if not await run_blocking(session_buffer.flush, session_id):
+            raise HTTPException(status_code=503, detail="Could not persist buffered session updates")
+        session_data = await s3_service.aio.compact_transcript(session_id)
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
 
+        # Snapshot for retracting earlier analytics contributions if the session is ended again
+        previous_session = {
+            key: session_data.get(key)
+            for key in ("session_id", "created_at", "interview_type", "candidate_name", "status", "performance_report")
+        }
+
         # Update session status
         session_data["status"] = "completed"
         session_data["ended_at"] = datetime.utcnow().isoformat()
@@ -61,7 +85,7 @@ async def end_interview(session_id: str):
 
         # Generate performance report using Lambda
         try:
-            report = lambda_service.invoke_performance_evaluator(
+            report = await lambda_service.aio.invoke_performance_evaluator(
                 session_id=session_id,
                 conversation_history=session_data.get("transcript", []),
                 code_submissions=[],  # TODO: Track code submissions in session
@@ -79,12 +103,19 @@ async def end_interview(session_id: str):
             print(f"Error generating performance report: {e}")
             report_url = None
 
-        # Save session with report
-        success = s3_service.save_session(session_data)
+        # Save session with report; the transcript and other parts are unchanged since compaction
+        success = await s3_service.aio.update_session(session_id, {
+            key: session_data[key]
+            for key in ("status", "ended_at", "performance_report", "report_url")
+            if key in session_data
+        })
 
         if not success:
             raise HTTPException(status_code=500, detail="Failed to end session")
 
+        await run_blocking(record_session_completed, previous_session, session_data)
+        get_analytics_cache().invalidate("aggregate", "benchmarks", "trends", "candidate_history")
+
         return EndSessionResponse(
             session_id=session_id,
             status="completed",
@@ -101,7 +132,7 @@ async def end_interview(session_id: str):
 async def upload_cv(session_id: str, file: UploadFile = File(...)):
     """Upload and analyze candidate CV with PDF/DOCX support"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await s3_service.aio.get_session(session_id, fields=("interview_type",))
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -115,10 +146,10 @@ async def upload_cv(session_id: str, file: UploadFile = File(...)):
 
         if file_extension == 'pdf':
             # Use Textract for PDF
-            cv_text = textract_service.extract_text_from_pdf(content)
+            cv_text = await textract_service.aio.extract_text_from_pdf(content)
         elif file_extension in ['doc', 'docx']:
             # Use Textract for DOCX
-            cv_text = textract_service.extract_text_from_pdf(content)  # Textract handles both
+            cv_text = await textract_service.aio.extract_text_from_pdf(content)  # Textract handles both
         elif file_extension == 'txt':
             # Direct text extraction
             try:
@@ -135,7 +166,7 @@ async def upload_cv(session_id: str, file: UploadFile = File(...)):
             raise HTTPException(status_code=400, detail="No text extracted from file")
 
         # Analyze CV using Lambda
-        analysis = lambda_service.invoke_cv_analyzer(cv_text=cv_text)
+        analysis = await lambda_service.aio.invoke_cv_analyzer(cv_text=cv_text)
 
         # Extract industry-specific skills
         interview_type = session_data.get("interview_type", "")
@@ -154,11 +185,12 @@ async def upload_cv(session_id: str, file: UploadFile = File(...)):
         analysis['file_type'] = file_extension
 
         # Save CV analysis to session
-        session_data["cv_analysis"] = analysis
-        session_data["cv_uploaded"] = True
-        session_data["cv_filename"] = file.filename
-        session_data["cv_file_type"] = file_extension
-        s3_service.save_session(session_data)
+        await s3_service.aio.update_session(session_id, {
+            "cv_analysis": analysis,
+            "cv_uploaded": True,
+            "cv_filename": file.filename,
+            "cv_file_type": file_extension
+        })
 
         return JSONResponse(content={
             "success": True,
@@ -179,7 +211,9 @@ async def upload_cv(session_id: str, file: UploadFile = File(...)):
 async def get_cv_analysis(session_id: str):
     """Get CV analysis for a session"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await s3_service.aio.get_session(
+            session_id, fields=("cv_uploaded", "cv_analysis", "cv_filename")
+        )
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -203,7 +237,9 @@ async def get_cv_analysis(session_id: str):
 async def get_performance_report(session_id: str):
     """Get performance report for a completed interview"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await s3_service.aio.get_session(
+            session_id, fields=("status", "performance_report", "report_url")
+        )
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
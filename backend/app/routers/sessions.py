@@ -1,14 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 from app.models.session import CreateSessionRequest, SessionResponse, EndSessionResponse
 from app.services.s3_service import S3Service
+from app.services.analytics_rollup_service import get_rollup_service
+from app.services.session_index_writer import get_session_index_writer
+from app.services.response_cache import get_analytics_cache
+from app.services.aws_clients import run_blocking
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 s3_service = S3Service()
+rollup_service = get_rollup_service()
+session_indexes = get_session_index_writer()
+
+def record_session_created(session_data: dict):
+    """Update the analytics rollups, candidate index and session manifest for a new session"""
+    rollup_service.record_session_created(session_data)
+    session_indexes.record_session(session_data)  # failed index writes are queued for retry
+
+async def update_analytics_for_new_session(session_data: dict):
+    """Background task run after create_session has responded"""
+    await run_blocking(record_session_created, session_data)
+    get_analytics_cache().invalidate("aggregate", "candidate_history")
 
 @router.post("", response_model=SessionResponse)
-async def create_session(request: CreateSessionRequest):
+async def create_session(request: CreateSessionRequest, background_tasks: BackgroundTasks):
     """Create a new interview session"""
     try:
         session_id = str(uuid.uuid4())
@@ -24,11 +40,14 @@ async def create_session(request: CreateSessionRequest):
         }
 
         # Save to S3
-        success = s3_service.save_session(session_data)
+        success = await s3_service.aio.save_session(session_data)
 
         if not success:
             raise HTTPException(status_code=500, detail="Failed to create session")
 
+        # Analytics maintenance does not hold up the response
+        background_tasks.add_task(update_analytics_for_new_session, session_data)
+
         return SessionResponse(
             session_id=session_id,
             interview_type=request.interview_type,
@@ -44,7 +63,9 @@ async def create_session(request: CreateSessionRequest):
 async def get_session(session_id: str):
     """Get session details"""
     try:
-        session_data = s3_service.get_session(session_id)
+        session_data = await s3_service.aio.get_session(
+            session_id, fields=("interview_type", "candidate_name", "created_at", "status")
+        )
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
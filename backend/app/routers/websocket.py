@@ -1,24 +1,34 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from app.services.bedrock_service import BedrockService
 from app.services.s3_service import S3Service
-from faster_whisper import WhisperModel
-import edge_tts
-import torch
-import io
-import tempfile
-import os
+from app.models.session_context import SessionContext
+from app.services.session_write_buffer import get_session_write_buffer
+from app.services.aws_clients import run_blocking
+from app.services.bedrock_warmup import get_bedrock_warmer, prefetch_first_turn
+from app.services.transcription_service import (
+    StreamingTranscriber,
+    decode_audio_bytes,
+    get_whisper_model,
+    get_batch_scheduler,
+    PCM_S16LE_FORMAT
+)
+from app.services.tts_service import TTSPipeline
+from app.config import (
+    STREAMING_STT_ENABLED,
+    STREAMING_STT_INTERVAL,
+    TTS_MAX_IN_FLIGHT,
+    TTS_STREAM_CHUNKS,
+    BEDROCK_WARMUP_ENABLED,
+    BEDROCK_PREFETCH_ENABLED
+)
 import re
 import json
 import asyncio
+from contextlib import aclosing
 from datetime import datetime
 
 router = APIRouter()
 
-# Initialize models (lazy loading recommended for production)
-whisper_model = None
-# Edge TTS voice - Indian English female (fast and natural)
-EDGE_TTS_VOICE = "en-IN-NeerjaExpressiveNeural"
-
 
 def clean_agent_response(text: str) -> str:
     """
@@ -132,64 +142,39 @@ def validate_and_truncate_response(text: str) -> str:
 
     return result
 
-def get_whisper_model():
-    """
-    Initialize Whisper model with GPU support if available.
-    Supports: NVIDIA CUDA, Apple Silicon (MPS), CPU fallback.
-    """
-    global whisper_model
-    if whisper_model is None:
-        # Auto-detect best available device
-        if torch.cuda.is_available():
-            device = "cuda"
-            compute_type = "float16"
-            acceleration_info = "NVIDIA CUDA GPU"
-        elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-            # Apple Silicon (M1/M2/M3/M4) - Use CPU with optimized compute type
-            # Note: faster-whisper doesn't support MPS directly, but runs efficiently on Apple Silicon CPU
-            device = "cpu"
-            compute_type = "int8"
-            acceleration_info = "Apple Silicon (optimized)"
-        else:
-            device = "cpu"
-            compute_type = "int8"
-            acceleration_info = "CPU only"
-
-        print(f"[WHISPER] Initializing on {device.upper()} with {compute_type}")
-        print(f"[WHISPER] Hardware: {acceleration_info}")
-
-        whisper_model = WhisperModel(
-            "small",  # Use "small" for balance, or "tiny" for even faster processing
-            device=device,
-            compute_type=compute_type,
-            num_workers=4  # Utilize multiple cores on Apple Silicon
-        )
-
-        if device == "cuda":
-            print(f"[WHISPER] GPU acceleration enabled (expected 3-5x speedup)")
-        elif "Apple Silicon" in acceleration_info:
-            print(f"[WHISPER] Apple Silicon detected - optimized performance on Neural Engine")
-        else:
-            print(f"[WHISPER] Running on standard CPU")
-
-    return whisper_model
 
 @router.websocket("/ws/interview/{session_id}")
 async def voice_interview_websocket(websocket: WebSocket, session_id: str):
     """
     WebSocket endpoint for real-time voice interviews
     Handles: Audio streaming, Speech-to-Text, LLM interaction, Text-to-Speech
+
+    Audio is sent as binary messages between speech_start and speech_end.
+    By default each message is a MediaRecorder chunk (WebM/Opus or WAV).
+    Clients that capture PCM directly can send
+    {"type": "speech_start", "format": "pcm_s16le"} and then raw 16 kHz mono
+    little-endian int16 frames, which skips container decoding entirely.
+
+    Assistant audio is sent as one binary message per sentence by default.
+    Clients can send {"type": "audio_config", "stream_chunks": true} to receive
+    Edge TTS chunks as they are synthesized instead, each prefixed with a
+    9-byte header (see tts_service.frame_audio_chunk) carrying the reply,
+    sentence and sequence ids.
     """
     try:
         # Accept connection FIRST for faster perceived performance
         await websocket.accept()
 
-        # Initialize Whisper model (lazy loading)
+        # Shared Whisper worker pool (lazy loading) and cross-session batcher
         whisper = get_whisper_model()
+        stt_batcher = get_batch_scheduler()
 
         # Initialize services
         bedrock_service = BedrockService()
         s3_service = S3Service()
+
+        # Make sure Bedrock connections are warm before the first user turn
+        warmup_task = asyncio.create_task(get_bedrock_warmer().awarm()) if BEDROCK_WARMUP_ENABLED else None
     except Exception as e:
         print(f"Model initialization error: {e}")
         await websocket.close(code=1011, reason=f"Model init failed: {str(e)}")
@@ -198,70 +183,215 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
     # State management
     streaming_active = False
     streaming_audio_chunks = []
+    streaming_audio_format = None
+    streaming_transcriber = None
+    streaming_task = None
+    streaming_stop = asyncio.Event()
     accumulated_transcript = ""
     processing = False
     interview_started = False
+    tts_stream_chunks = False  # framed chunks only for clients that ask for them in audio_config
+    tts_reply_count = 0
+    session_context_task = None
+    first_turn_prefetch = None
+
+    def transcribe_sync(audio_data: bytes, audio_format: str = None) -> str:
+        """Decode and transcribe on a Whisper pool worker thread"""
+        audio = decode_audio_bytes(audio_data, audio_format)
+        segments, _ = whisper.transcribe(
+            audio,
+            beam_size=1,  # Reduced from 5 for speed
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=500)
+        )
+        return " ".join([segment.text for segment in segments]).strip()
 
-    async def transcribe_audio(audio_data: bytes) -> str:
-        """Convert audio to text using faster-whisper"""
+    async def transcribe_audio(audio_data: bytes, audio_format: str = None) -> str:
+        """Convert audio to text using faster-whisper, off the event loop"""
         import time
         start_time = time.time()
 
-        suffix = '.webm' if audio_data[:4] != b'RIFF' else '.wav'
-
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_audio:
-            temp_audio.write(audio_data)
-            temp_path = temp_audio.name
-
         try:
-            segments, _ = whisper.transcribe(
-                temp_path,
-                beam_size=1,  # Reduced from 5 for speed
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500)
-            )
-            text = " ".join([segment.text for segment in segments]).strip()
+            if stt_batcher:
+                audio = await asyncio.to_thread(decode_audio_bytes, audio_data, audio_format)
+                text = await stt_batcher.transcribe(audio, session_id)
+            else:
+                text = await whisper.submit(transcribe_sync, audio_data, audio_format)
             elapsed = time.time() - start_time
             print(f"[WHISPER] Transcription took {elapsed:.2f}s")
             return text
         except Exception as e:
             print(f"Transcription error: {e}")
             return ""
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
 
-    async def text_to_speech(text: str) -> bytes:
+    async def run_streaming_transcription(transcriber: StreamingTranscriber):
+        """Run interim Whisper passes while the candidate is speaking"""
+        last_chunk_count = 0
+        while not streaming_stop.is_set():
+            try:
+                await asyncio.wait_for(streaming_stop.wait(), timeout=STREAMING_STT_INTERVAL)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            if len(streaming_audio_chunks) == last_chunk_count:
+                continue
+            # Interim passes are best-effort: never queue behind other sessions' work
+            if whisper.queue_depth > 0:
+                continue
+            last_chunk_count = len(streaming_audio_chunks)
+
+            try:
+                interim_text = await whisper.submit(
+                    transcriber.update,
+                    b''.join(streaming_audio_chunks),
+                    timeout=STREAMING_STT_INTERVAL * 2
+                )
+            except Exception as e:
+                print(f"[STREAMING-STT] Interim pass error: {e}")
+                continue
+
+            if interim_text and not streaming_stop.is_set():
+                await websocket.send_json({
+                    "type": "transcript",
+                    "text": interim_text,
+                    "role": "user",
+                    "is_final": False
+                })
+
+    async def stop_streaming_transcription():
+        """Stop interim passes, waiting for any in-flight pass to finish"""
+        nonlocal streaming_task
+        streaming_stop.set()
+        if streaming_task:
+            await asyncio.gather(streaming_task, return_exceptions=True)
+            streaming_task = None
+
+    async def finalize_streaming_transcription(audio_data: bytes) -> str:
+        """Commit the final transcript from the streaming transcriber"""
+        nonlocal streaming_transcriber
+        transcriber = streaming_transcriber
+        streaming_transcriber = None
+        await stop_streaming_transcription()
+
+        try:
+            if stt_batcher:
+                tail = await asyncio.to_thread(transcriber.final_tail, audio_data)
+                tail_text = await stt_batcher.transcribe(tail, session_id) if len(tail) else ""
+                return transcriber.commit_final(tail_text)
+            return await whisper.submit(transcriber.finalize, audio_data)
+        except Exception as e:
+            print(f"[STREAMING-STT] Final pass failed, falling back to full transcription: {e}")
+            return await transcribe_audio(audio_data, transcriber.audio_format)
+
+    async def load_session_context() -> SessionContext:
+        """Load the session and resume its agent state from the shared session state store"""
+        context = await SessionContext.load(s3_service, session_id)
+        try:
+            agent_state = await bedrock_service.aio.resume_session(session_id, context.bedrock_session_state())
+            if context.restore_agent_state(agent_state):
+                print(f"[{session_id}] Agent state ahead of transcript, resumed at turn {context.turn_count}")
+        except Exception as e:
+            print(f"[{session_id}] Agent state resume failed: {e}")
+        return context
+
+    async def get_session_context() -> SessionContext:
+        """Load the session once per connection; later calls reuse it"""
+        nonlocal session_context_task
+        if session_context_task is None:
+            session_context_task = asyncio.create_task(load_session_context())
+        return await session_context_task
+
+    async def record_agent_turn(user_input, agent_response: str):
+        """Add the turn to the shared agent state, so a reconnect on any worker resumes from it"""
+        try:
+            if not await bedrock_service.aio.update_session_state(session_id, user_input, agent_response):
+                print(f"[{session_id}] Agent state not updated (missing or expired)")
+        except Exception as e:
+            print(f"[{session_id}] Agent state update failed: {e}")
+
+    async def persist_turn(context: SessionContext):
+        """Durably write the turn's buffered messages; a failed flush stays queued for retry"""
+        try:
+            flushed = await context.flush()
+        except Exception as e:
+            print(f"[{session_id}] Turn flush raised: {e}")
+            flushed = False
+        if not flushed:
+            print(f"[{session_id}] Turn flush failed; messages stay buffered for the next flush")
+
+    async def send_audio(audio_bytes: bytes):
+        await websocket.send_bytes(audio_bytes)
+
+    def new_tts_pipeline() -> TTSPipeline:
+        nonlocal tts_reply_count
+        tts_reply_count += 1
+        return TTSPipeline(
+            send_audio,
+            max_in_flight=TTS_MAX_IN_FLIGHT,
+            stream_chunks=tts_stream_chunks,
+            reply_id=tts_reply_count
+        )
+
+    async def stream_agent_response(agent_chunks, tts: TTSPipeline, request_start: float = None) -> str:
         """
-        Convert text to speech using Edge TTS (Microsoft Azure).
-        Fast, free, and high-quality neural voices.
+        Forward Bedrock chunks to the client and hand complete sentences to the TTS pipeline.
+
+        Args:
+            agent_chunks: Async iterator of text chunks from BedrockService.astream_agent_deadline
+            tts: Pipeline that synthesizes and sends sentence audio in order
+            request_start: If set, log time to first token relative to it
+
+        Returns:
+            Full raw response text
         """
         import time
-        start_time = time.time()
+        full_response = ""
+        text_buffer = ""
+        sentence_endings = re.compile(r'[.!?]\s*')
 
-        try:
-            # Create Edge TTS communication
-            communicate = edge_tts.Communicate(text, EDGE_TTS_VOICE)
+        # aclosing guarantees the Bedrock stream is closed if sending fails or the turn is cancelled
+        async with aclosing(agent_chunks):
+            async for chunk_text in agent_chunks:
+                # Track first token time
+                if request_start is not None and not full_response:
+                    print(f"[PERF] Step 2b (Bedrock first token): {time.time() - request_start:.2f}s")
 
-            # Generate audio and collect chunks
-            audio_buffer = io.BytesIO()
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_buffer.write(chunk["data"])
+                full_response += chunk_text
+                text_buffer += chunk_text
 
-            elapsed = time.time() - start_time
-            print(f"[EDGE-TTS] Generated {len(text)} chars in {elapsed:.2f}s (~{len(text)/elapsed:.0f} chars/s)")
+                # Send text chunk to frontend
+                await websocket.send_json({
+                    "type": "llm_chunk",
+                    "text": chunk_text
+                })
 
-            return audio_buffer.getvalue()
-        except Exception as e:
-            print(f"[EDGE-TTS] Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return b""
+                # Start TTS for complete sentences without waiting for it
+                sentences = sentence_endings.split(text_buffer)
+
+                for sentence in sentences[:-1]:
+                    sentence = sentence.strip()
+                    if sentence:
+                        # Clean stage directions before TTS
+                        cleaned_sentence = clean_agent_response(sentence)
+                        if cleaned_sentence:  # Only generate TTS if there's content after cleaning
+                            tts.add(cleaned_sentence)
+
+                # Keep incomplete fragment
+                text_buffer = sentences[-1] if sentences else ""
+
+        # Process remaining text
+        if text_buffer.strip():
+            # Clean stage directions before TTS
+            cleaned_text = clean_agent_response(text_buffer)
+            if cleaned_text:  # Only generate TTS if there's content after cleaning
+                tts.add(cleaned_text)
+
+        return full_response
 
     async def send_interviewer_introduction():
         """Send interviewer's initial introduction"""
-        nonlocal processing
+        nonlocal processing, first_turn_prefetch
 
         if processing:
             return
@@ -269,10 +399,10 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
         processing = True
 
         try:
-            # Fetch session data asynchronously to avoid blocking
-            session_data = await asyncio.to_thread(s3_service.get_session, session_id)
-            candidate_name = session_data.get("candidate_name", "candidate") if session_data else "candidate"
-            interview_type = session_data.get("interview_type", "Technical Interview") if session_data else "Technical Interview"
+            # Load the session context once for this connection
+            context = await get_session_context()
+            candidate_name = context.candidate_name
+            interview_type = context.interview_type
 
             # Use a simple, fast greeting without Bedrock for instant response
             # This eliminates the 2-5 second Bedrock cold start delay
@@ -286,10 +416,24 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                 "text": greeting_text
             })
 
-            # Generate TTS for the greeting
-            audio_bytes = await text_to_speech(greeting_text)
-            if len(audio_bytes) > 44:
-                await websocket.send_bytes(audio_bytes)
+            # Optionally take the agent's cold start now, while the greeting plays
+            if BEDROCK_PREFETCH_ENABLED:
+                prefetch_prompt = (context.context_prefix() +
+                                   f"[INSTRUCTION: You have just greeted the candidate with: \"{greeting_text}\" "
+                                   "Wait for their answer. Reply with only: OK]")
+                first_turn_prefetch = asyncio.create_task(prefetch_first_turn(
+                    bedrock_service, session_id, prefetch_prompt, context.bedrock_session_state()
+                ))
+
+            # Generate TTS for the greeting, sentence by sentence so the first one plays sooner
+            tts = new_tts_pipeline()
+            try:
+                for sentence in re.split(r'(?<=[.!?])\s+', greeting_text):
+                    if sentence.strip():
+                        tts.add(sentence.strip())
+                await tts.finish()
+            finally:
+                await tts.cancel()
 
             full_response = greeting_text
 
@@ -362,15 +506,8 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
             })
 
             # Save introduction to transcript in background (non-blocking)
-            asyncio.create_task(asyncio.to_thread(
-                s3_service.update_session_transcript,
-                session_id,
-                {
-                    "role": "assistant",
-                    "content": full_response,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            ))
+            context.append_message("assistant", full_response)
+            await record_agent_turn(None, full_response)
 
         except Exception as e:
             print(f"Error sending introduction: {e}")
@@ -381,8 +518,15 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
         finally:
             processing = False
 
-    async def process_voice_turn(audio_data: bytes):
-        """Process complete voice turn: STT -> Bedrock -> TTS"""
+    async def process_voice_turn(audio_data: bytes, transcript: str = None, audio_format: str = None):
+        """
+        Process complete voice turn: STT -> Bedrock -> TTS
+
+        Args:
+            audio_data: Complete utterance audio
+            transcript: Transcript already produced by streaming STT, if any
+            audio_format: "pcm_s16le" for raw frames, None for containers
+        """
         nonlocal processing, accumulated_transcript
 
         if processing:
@@ -395,11 +539,12 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
         overall_start = time.time()
 
         try:
-            # Step 1: Speech-to-Text
-            step_start = time.time()
-            transcript = await transcribe_audio(audio_data)
-            step_elapsed = time.time() - step_start
-            print(f"[PERF] Step 1 (Whisper STT): {step_elapsed:.2f}s")
+            # Step 1: Speech-to-Text (skipped when streaming STT already committed the text)
+            if transcript is None:
+                step_start = time.time()
+                transcript = await transcribe_audio(audio_data, audio_format)
+                step_elapsed = time.time() - step_start
+                print(f"[PERF] Step 1 (Whisper STT): {step_elapsed:.2f}s")
 
             if not transcript:
                 processing = False
@@ -415,151 +560,49 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
             await asyncio.sleep(0)  # Force context switch, let message send
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Transcript sent: {transcript}")
 
-            # Save to S3 in background (don't wait)
-            asyncio.create_task(asyncio.to_thread(
-                s3_service.update_session_transcript,
-                session_id,
-                {
-                    "role": "user",
-                    "content": transcript,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            ))
+            # Interview context comes from the per-connection session context, not S3
+            context = await get_session_context()
+            session_state_for_bedrock = context.bedrock_session_state()
+            context_prefix = context.context_prefix()
+
+            # Record locally and save to S3 in background (don't wait)
+            context.append_message("user", transcript)
 
             # Step 2: Get response from Bedrock Agent (streaming) - starts IMMEDIATELY
             step_start = time.time()
-            print(f"[{datetime.now()}] Calling Bedrock Agent...")
+            print(f"[{datetime.now()}] Calling Bedrock Agent (phase: {session_state_for_bedrock['currentPhase']})...")
             full_response = ""
-            text_buffer = ""
-            sentence_endings = re.compile(r'[.!?]\s*')
             coding_question_detected = False
-            bedrock_first_token_time = None
             bedrock_start = time.time()
+            tts = new_tts_pipeline()
 
             try:
-                # Get session state to pass interview configuration to Bedrock
-                session_state_start = time.time()
-                session_data = s3_service.get_session(session_id)
-                session_state_elapsed = time.time() - session_state_start
-                print(f"[PERF] Step 2a (S3 session fetch): {session_state_elapsed:.2f}s")
-
-                # Debug: Log session data
-                print(f"[{session_id}] Session data retrieved:")
-                print(f"  - candidate_name: {session_data.get('candidate_name') if session_data else 'NO SESSION DATA'}")
-                print(f"  - interview_type: {session_data.get('interview_type') if session_data else 'NO SESSION DATA'}")
-
-                # Count turns from transcript to determine current phase
-                transcript_history = session_data.get("transcript", []) if session_data else []
-                turn_count = len([msg for msg in transcript_history if msg.get("role") == "user"])
-
-                # Get interview configuration to determine phase progression
-                from app.config.interview_types import get_interview_config
-                interview_config = get_interview_config(session_data.get("interview_type", "Technical Interview") if session_data else "Technical Interview")
-
-                # Get custom phase flow for this interview type
-                phases = interview_config.get("phases", ["introduction", "background", "technical", "problem_solving", "closing"])
-
-                # Determine current phase based on turn count and phase progression
-                # Coding practice: ["introduction", "coding"] - 2 phases
-                # Regular interviews: ["introduction", "background", "technical", "problem_solving", "closing"] - 5 phases
-                if turn_count == 0:
-                    current_phase = phases[0]  # introduction
-                elif turn_count <= 1:
-                    current_phase = phases[1] if len(phases) > 1 else phases[0]  # coding or background
-                elif len(phases) == 2:
-                    # Coding practice - stay in coding phase
-                    current_phase = phases[1]  # coding
-                elif turn_count <= 3:
-                    current_phase = phases[2] if len(phases) > 2 else phases[-1]  # technical or behavioral
-                elif turn_count <= 8:
-                    current_phase = phases[3] if len(phases) > 3 else phases[-1]  # problem_solving or scenario_based
-                else:
-                    current_phase = phases[-1]  # closing
-
-                session_state_for_bedrock = {
-                    "interviewType": session_data.get("interview_type", "Technical Interview") if session_data else "Technical Interview",
-                    "candidateName": session_data.get("candidate_name", "candidate") if session_data else "candidate",
-                    "resumeSummary": session_data.get("resume_summary", "Not provided") if session_data else "Not provided",
-                    "turnCount": turn_count,
-                    "currentPhase": current_phase,
-                    "difficultyLevel": "medium"  # Adapt based on performance
-                }
-
                 # Add context and constraints to the prompt
                 # This ensures the agent knows all the interview details
-                candidate_name = session_data.get("candidate_name", "candidate") if session_data else "candidate"
-                interview_type = session_data.get("interview_type", "Technical Interview") if session_data else "Technical Interview"
-
-                # Get full interview configuration based on type
-                from app.config.interview_types import get_interview_config
-                interview_config = get_interview_config(interview_type)
-
-                # Build comprehensive context from config
-                display_name = interview_config.get("display_name", interview_type)
-                focus_areas = interview_config.get("focus_areas", "technical skills")
-                key_topics = interview_config.get("key_topics", "general topics")
-                difficulty = interview_config.get("difficulty_range", "medium")
-
-                context_prefix = f"[CONTEXT: Interviewing {candidate_name} for {display_name}. Focus: {focus_areas}. Topics: {key_topics}. Difficulty: {difficulty}. Current phase: {current_phase}.]\n"
                 constraint_reminder = "[REMINDER: Respond with MAXIMUM 2-3 sentences. Ask EXACTLY ONE question. NO bullet points, NO lists, NO asterisks.]\n\n"
                 enhanced_input = context_prefix + constraint_reminder + transcript
 
-                event_stream = bedrock_service.invoke_agent(
+                agent_chunks = bedrock_service.astream_agent_deadline(
                     session_id=session_id,
                     input_text=enhanced_input,
                     session_state=session_state_for_bedrock
                 )
-                print(f"[{datetime.now()}] Bedrock Agent invoked with session state")
-
-                for event in event_stream:
-                    if 'chunk' in event:
-                        chunk_data = event['chunk']
-                        if 'bytes' in chunk_data:
-                            # Track first token time
-                            if bedrock_first_token_time is None:
-                                bedrock_first_token_time = time.time() - bedrock_start
-                                print(f"[PERF] Step 2b (Bedrock first token): {bedrock_first_token_time:.2f}s")
-
-                            chunk_text = chunk_data['bytes'].decode('utf-8')
-                            full_response += chunk_text
-                            text_buffer += chunk_text
-
-                            # Send text chunk to frontend
-                            await websocket.send_json({
-                                "type": "llm_chunk",
-                                "text": chunk_text
-                            })
-
-                            # Generate TTS for complete sentences
-                            sentences = sentence_endings.split(text_buffer)
-
-                            for sentence in sentences[:-1]:
-                                sentence = sentence.strip()
-                                if sentence:
-                                    # Clean stage directions before TTS
-                                    cleaned_sentence = clean_agent_response(sentence)
-                                    if cleaned_sentence:  # Only generate TTS if there's content after cleaning
-                                        audio_bytes = await text_to_speech(cleaned_sentence)
-                                        if len(audio_bytes) > 44:  # More than WAV header
-                                            await websocket.send_bytes(audio_bytes)
+                print(f"[{datetime.now()}] Streaming Bedrock Agent response with session state")
 
-                            # Keep incomplete fragment
-                            text_buffer = sentences[-1] if sentences else ""
-
-                # Process remaining text
-                if text_buffer.strip():
-                    # Clean stage directions before TTS
-                    cleaned_text = clean_agent_response(text_buffer)
-                    if cleaned_text:  # Only generate TTS if there's content after cleaning
-                        audio_bytes = await text_to_speech(cleaned_text)
-                        if len(audio_bytes) > 44:
-                            await websocket.send_bytes(audio_bytes)
+                full_response = await stream_agent_response(agent_chunks, tts, request_start=bedrock_start)
 
                 # Log Bedrock total time
                 bedrock_total = time.time() - bedrock_start
                 print(f"[PERF] Step 2 (Bedrock complete): {bedrock_total:.2f}s")
 
+                # Let in-flight sentence audio finish before signalling completion
+                await tts.finish()
+                tts_total = time.time() - bedrock_start
+                print(f"[PERF] Step 3 (TTS {tts.sentences} sentences, first audio "
+                      f"{tts.first_audio_time or 0:.2f}s): {tts_total:.2f}s")
+
             except Exception as e:
+                await tts.cancel()
                 print(f"Bedrock Agent error: {e}")
                 # Fallback error message
                 await websocket.send_json({
@@ -591,6 +634,13 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
             full_response_lower = full_response.lower()
             coding_question_detected = any(keyword in full_response_lower for keyword in coding_keywords)
 
+            # Save the turn and write it through before signalling completion: the client may
+            # end the interview next, and that request can land on another worker whose
+            # write buffer does not hold this session's messages
+            context.append_message("assistant", full_response)
+            await persist_turn(context)
+            await record_agent_turn(transcript, full_response)
+
             # Signal completion
             await websocket.send_json({
                 "type": "assistant_complete",
@@ -613,13 +663,6 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                 })
                 print(f"[{session_id}] Code editor signal sent to frontend")
 
-            # Save assistant response to transcript
-            s3_service.update_session_transcript(session_id, {
-                "role": "assistant",
-                "content": full_response,
-                "timestamp": datetime.utcnow().isoformat()
-            })
-
             accumulated_transcript = ""
 
             # Final performance summary
@@ -637,6 +680,9 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
         finally:
             processing = False
 
+    # Start loading the session context while the client finishes setting up
+    session_context_task = asyncio.create_task(load_session_context())
+
     # Main WebSocket loop
     try:
         while True:
@@ -650,7 +696,12 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                 try:
                     data = json.loads(message['text'])
                     if isinstance(data, dict):
-                        if data.get('type') == 'interview_ready' and not interview_started:
+                        if data.get('type') == 'audio_config':
+                            # Clients that cannot parse frames never send this, so they keep whole-sentence audio
+                            tts_stream_chunks = TTS_STREAM_CHUNKS and data.get('stream_chunks') is True
+                            await websocket.send_json({"type": "audio_config", "stream_chunks": tts_stream_chunks})
+                            print(f"[{session_id}] Chunked TTS streaming: {tts_stream_chunks}")
+                        elif data.get('type') == 'interview_ready' and not interview_started:
                             print(f"[{session_id}] Client ready, sending introduction...")
                             interview_started = True
                             await send_interviewer_introduction()
@@ -658,14 +709,31 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                             print(f"[{session_id}] Speech started")
                             streaming_active = True
                             streaming_audio_chunks = []
+                            streaming_audio_format = PCM_S16LE_FORMAT if data.get('format') == PCM_S16LE_FORMAT else None
                             accumulated_transcript = ""
+                            if STREAMING_STT_ENABLED:
+                                await stop_streaming_transcription()
+                                streaming_stop.clear()
+                                streaming_transcriber = StreamingTranscriber(whisper, audio_format=streaming_audio_format)
+                                streaming_task = asyncio.create_task(
+                                    run_streaming_transcription(streaming_transcriber)
+                                )
                         elif data.get('type') == 'speech_end':
                             print(f"[{session_id}] Speech ended, processing...")
                             streaming_active = False
                             if streaming_audio_chunks:
                                 combined_audio = b''.join(streaming_audio_chunks)
                                 streaming_audio_chunks = []
-                                await process_voice_turn(combined_audio)
+                                transcript = None
+                                if streaming_transcriber:
+                                    step_start = datetime.now()
+                                    transcript = await finalize_streaming_transcription(combined_audio)
+                                    step_elapsed = (datetime.now() - step_start).total_seconds()
+                                    print(f"[PERF] Step 1 (Whisper STT, streaming finalize): {step_elapsed:.2f}s")
+                                await process_voice_turn(combined_audio, transcript=transcript, audio_format=streaming_audio_format)
+                            else:
+                                await stop_streaming_transcription()
+                                streaming_transcriber = None
                         elif data.get('type') == 'code_submission':
                             print(f"[{session_id}] Code submission received")
                             # Format code submission for conversation context
@@ -682,13 +750,8 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                             summary += f"{len([t for t in test_results if not t.get('passed')])} failed."
 
                             # Add to session transcript
-                            s3_service.update_session_transcript(session_id, {
-                                "role": "system",
-                                "content": summary,
-                                "timestamp": datetime.utcnow().isoformat(),
-                                "code": code,
-                                "testResults": test_results
-                            })
+                            context = await get_session_context()
+                            context.append_message("system", summary, code=code, testResults=test_results)
 
                             print(f"[{session_id}] Code submission logged: {summary}")
 
@@ -696,9 +759,7 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                             if not processing:
                                 processing = True
                                 try:
-                                    # Get session data
-                                    session_data = s3_service.get_session(session_id)
-                                    candidate_name = session_data.get("candidate_name", "candidate") if session_data else "candidate"
+                                    candidate_name = context.candidate_name
 
                                     # Build context for the agent about the code submission
                                     if all_passed:
@@ -718,57 +779,28 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                                     prompt += "\n[REMINDER: Respond with MAXIMUM 2-3 sentences. Ask EXACTLY ONE question. NO bullet points, NO lists, NO asterisks.]"
 
                                     # Get response from Bedrock Agent
-                                    full_response = ""
-                                    text_buffer = ""
-                                    sentence_endings = re.compile(r'[.!?]\s*')
-
-                                    event_stream = bedrock_service.invoke_agent(
+                                    agent_chunks = bedrock_service.astream_agent_deadline(
                                         session_id=session_id,
-                                        input_text=prompt
+                                        input_text=prompt,
+                                        session_state=context.bedrock_session_state()
                                     )
 
-                                    for event in event_stream:
-                                        if 'chunk' in event:
-                                            chunk_data = event['chunk']
-                                            if 'bytes' in chunk_data:
-                                                chunk_text = chunk_data['bytes'].decode('utf-8')
-                                                full_response += chunk_text
-                                                text_buffer += chunk_text
-
-                                                # Send text chunk to frontend
-                                                await websocket.send_json({
-                                                    "type": "llm_chunk",
-                                                    "text": chunk_text
-                                                })
-
-                                                # Generate TTS for complete sentences
-                                                sentences = sentence_endings.split(text_buffer)
-
-                                                for sentence in sentences[:-1]:
-                                                    sentence = sentence.strip()
-                                                    if sentence:
-                                                        # Clean stage directions before TTS
-                                                        cleaned_sentence = clean_agent_response(sentence)
-                                                        if cleaned_sentence:
-                                                            audio_bytes = await text_to_speech(cleaned_sentence)
-                                                            if len(audio_bytes) > 44:
-                                                                await websocket.send_bytes(audio_bytes)
-
-                                                # Keep incomplete fragment
-                                                text_buffer = sentences[-1] if sentences else ""
-
-                                    # Process remaining text
-                                    if text_buffer.strip():
-                                        cleaned_text = clean_agent_response(text_buffer)
-                                        if cleaned_text:
-                                            audio_bytes = await text_to_speech(cleaned_text)
-                                            if len(audio_bytes) > 44:
-                                                await websocket.send_bytes(audio_bytes)
+                                    tts = new_tts_pipeline()
+                                    try:
+                                        full_response = await stream_agent_response(agent_chunks, tts)
+                                        await tts.finish()
+                                    finally:
+                                        await tts.cancel()
 
                                     # Validate and truncate response
                                     validated_response = validate_and_truncate_response(full_response)
                                     full_response = validated_response
 
+                                    # Save and write through the turn before signalling completion
+                                    context.append_message("assistant", full_response)
+                                    await persist_turn(context)
+                                    await record_agent_turn(None, full_response)
+
                                     # Signal completion
                                     await websocket.send_json({
                                         "type": "assistant_complete",
@@ -776,13 +808,6 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
                                         "role": "assistant"
                                     })
 
-                                    # Save assistant response to transcript
-                                    s3_service.update_session_transcript(session_id, {
-                                        "role": "assistant",
-                                        "content": full_response,
-                                        "timestamp": datetime.utcnow().isoformat()
-                                    })
-
                                     print(f"[{session_id}] Chatbot response sent: {full_response}")
 
                                 except Exception as e:
@@ -800,8 +825,8 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
             if 'bytes' in message:
                 data = message['bytes']
 
-                # Skip small chunks (noise)
-                if len(data) < 1000:
+                # Skip small chunks (noise); raw PCM frames are legitimately small
+                if len(data) < 1000 and not (streaming_active and streaming_audio_format == PCM_S16LE_FORMAT):
                     continue
 
                 if streaming_active:
@@ -815,6 +840,11 @@ async def voice_interview_websocket(websocket: WebSocket, session_id: str):
     except Exception as e:
         print(f"[{session_id}] WebSocket error: {e}")
     finally:
+        await stop_streaming_transcription()
+        for task in (first_turn_prefetch, warmup_task):
+            if task is not None and not task.done():
+                task.cancel()
+        await run_blocking(get_session_write_buffer().flush, session_id)
         try:
             await websocket.close()
         except:
@@ -0,0 +1,341 @@
+"""
+Analytics Rollup Service
+Materialized analytics aggregates maintained incrementally as sessions are created and completed
+"""
+
+import json
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from botocore.exceptions import ClientError
+
+from app.config import ANALYTICS_ROLLUP_FLUSH_INTERVAL
+from app.services.candidate_index_service import SUMMARY_FIELDS, CandidateIndexService, candidate_key
+from app.services.quantile_sketch import TDigest
+from app.services.s3_service import S3Service
+
+ROLLUP_KEY = "analytics/rollups.json"
+ROLLUP_VERSION = 6
+UNDATED = "undated"
+
+# performance_report.scores field for each benchmark dimension
+BENCHMARK_DIMENSIONS = {
+    "overall": None,
+    "technical": "technicalKnowledge",
+    "problem_solving": "problemSolving",
+    "communication": "communication",
+    "code_quality": "codeQuality",
+    "cultural_fit": "culturalFit"
+}
+
+
+def empty_rollups() -> Dict[str, Any]:
+    return {
+        "version": ROLLUP_VERSION,
+        "updated_at": None,
+        "total_interviews": 0,
+        "completed_interviews": 0,
+        "interview_types": {},
+        "recommendations": {},
+        "score_sum": 0,
+        "score_count": 0,
+        "benchmarks": {},
+        "candidate_count": 0
+    }
+
+
+def _bump(counter: Dict[str, Any], key: str, delta) -> None:
+    value = counter.get(key, 0) + delta
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+def _benchmark_scores(report: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Per-dimension scores counted by /benchmarks (only reports with a non-zero overall score)"""
+    if not report or not report.get("overallScore"):
+        return None
+    scores = report.get("scores", {})
+    return {
+        dimension: report["overallScore"] if field is None else scores.get(field, 0)
+        for dimension, field in BENCHMARK_DIMENSIONS.items()
+    }
+
+
+def apply_session_created(rollups: Dict[str, Any], session_data: Dict[str, Any], sign: int = 1) -> None:
+    """Count a session in the totals (sign=-1 retracts it)"""
+    rollups["total_interviews"] += sign
+    _bump(rollups["interview_types"], session_data.get("interview_type", "Unknown"), sign)
+
+
+def apply_session_report(rollups: Dict[str, Any], session_data: Dict[str, Any], sign: int = 1) -> None:
+    """
+    Add (sign=1) or retract (sign=-1) the completion and report contributions of a session
+
+    Retracting with the previous snapshot before applying the new one keeps the
+    rollups correct if a session is ended more than once.
+    """
+    if session_data.get("status") == "completed":
+        rollups["completed_interviews"] += sign
+
+    report = session_data.get("performance_report")
+    if not report:
+        return
+
+    recommendation = report.get("recommendation")
+    if recommendation:
+        _bump(rollups["recommendations"], recommendation, sign)
+
+    score = report.get("overallScore", 0)
+    rollups["score_sum"] += sign * score
+    rollups["score_count"] += sign
+
+    benchmark_scores = _benchmark_scores(report)
+    if benchmark_scores is None:
+        return
+
+    created_at = session_data.get("created_at")
+    day = datetime.fromisoformat(created_at).date().isoformat() if created_at else UNDATED
+
+    # One t-digest per (interview_type, day, dimension); days are merged at query time
+    type_key = session_data.get("interview_type", "").lower()
+    day_sketches = rollups["benchmarks"].setdefault(type_key, {}).setdefault(day, {})
+    for dimension, value in benchmark_scores.items():
+        sketch = TDigest.from_dict(day_sketches[dimension]) if dimension in day_sketches else TDigest()
+        if sign > 0:
+            sketch.add(value)
+        else:
+            sketch.remove(value)
+        if sketch.count:
+            day_sketches[dimension] = sketch.to_dict()
+        else:
+            day_sketches.pop(dimension, None)
+    if not day_sketches:
+        del rollups["benchmarks"][type_key][day]
+
+
+def benchmark_sketches(
+    rollups: Dict[str, Any],
+    interview_type: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> Dict[str, TDigest]:
+    """
+    Merge the daily benchmark sketches of an interview type over a date range
+
+    Args:
+        rollups: Rollup document
+        interview_type: Interview type (case-insensitive)
+        since: First day to include (YYYY-MM-DD), inclusive
+        until: Last day to include (YYYY-MM-DD), inclusive
+
+    Returns:
+        Merged sketch per dimension
+    """
+    days = rollups["benchmarks"].get(interview_type.lower(), {})
+    dated_range = since is not None or until is not None
+    merged: Dict[str, TDigest] = {}
+    for day, sketches in days.items():
+        if dated_range and (day == UNDATED or (since and day < since) or (until and day > until)):
+            continue
+        for dimension, data in sketches.items():
+            merged.setdefault(dimension, TDigest()).merge(TDigest.from_dict(data))
+    return merged
+
+
+def sketch_percentiles(sketch: TDigest, percentiles: Iterable[float]) -> Dict[str, Any]:
+    """Requested percentiles plus min, max and mean of a sketch"""
+    stats = {f"p{p:g}": round(sketch.quantile(p / 100), 2) for p in percentiles}
+    stats.update({
+        "min": sketch.min if sketch.min is not None else 0,
+        "max": sketch.max if sketch.max is not None else 0,
+        "avg": sketch.mean()
+    })
+    return stats
+
+
+class AnalyticsRollupService:
+    """
+    Rollup document in S3 holding counts per interview type and recommendation,
+    score sums, daily benchmark sketches per interview type and the number of
+    distinct candidates.
+
+    Session events are queued in memory and applied in batches: one
+    conditional read-modify-write (S3Service.update_json) covers every event
+    queued since the last flush, so request handlers never wait on the shared
+    document. A background timer flushes the queue; a failed flush keeps the
+    events queued for the next one. The queue is per process, like the session
+    write buffer.
+    """
+
+    def __init__(self, s3_service: Optional[S3Service] = None, flush_interval: float = ANALYTICS_ROLLUP_FLUSH_INTERVAL):
+        self.s3_service = s3_service or S3Service()
+        self.flush_interval = flush_interval
+        self._pending: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        self.queued_events = 0
+        self.flushes = 0
+        self.flush_failures = 0
+
+    def get_rollups(self) -> Dict[str, Any]:
+        """Load the rollups, building them from the bucket on first use"""
+        rollups, _ = self.s3_service.get_json(ROLLUP_KEY)
+        if rollups is None or rollups.get("version") != ROLLUP_VERSION:
+            print("[ANALYTICS] No current rollups found, rebuilding from sessions")
+            rollups = self.rebuild()
+        return rollups
+
+    def record_session_created(self, session_data: Dict[str, Any]):
+        """Queue a newly created session for counting"""
+        self._enqueue(lambda rollups: apply_session_created(rollups, session_data))
+
+    def record_candidate_added(self):
+        """Queue one more distinct candidate (called when a backfilled candidate index gains a candidate)"""
+        def update(rollups):
+            rollups["candidate_count"] += 1
+        self._enqueue(update)
+
+    def record_session_completed(self, previous: Dict[str, Any], session_data: Dict[str, Any]):
+        """
+        Queue a session completion
+
+        Args:
+            previous: Session data as it was before end_interview modified it
+            session_data: Session data with status and performance_report set
+        """
+        def update(rollups):
+            apply_session_report(rollups, previous, sign=-1)
+            apply_session_report(rollups, session_data, sign=1)
+        self._enqueue(update)
+
+    def flush(self) -> bool:
+        """
+        Apply every queued event to the rollup document in one conditional write
+
+        Returns:
+            True if nothing was queued or the events were written
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return True
+
+            def apply(rollups):
+                if rollups.get("version") != ROLLUP_VERSION:
+                    # Stale layout; the next read rebuilds from the bucket, which already has these changes
+                    return False
+                for mutate in pending:
+                    mutate(rollups)
+                rollups["updated_at"] = datetime.utcnow().isoformat()
+
+            # Missing rollups are left alone for the same reason
+            if self.s3_service.update_json(ROLLUP_KEY, apply):
+                with self._lock:
+                    self.flushes += 1
+                return True
+
+            with self._lock:
+                self._pending[:0] = pending
+                self.flush_failures += 1
+            print(f"[ANALYTICS] Rollup flush failed, keeping {len(pending)} events queued")
+            return False
+
+    def stop(self):
+        """Stop the background timer and flush anything still queued"""
+        self._stopped.set()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending_events": len(self._pending),
+                "queued_events": self.queued_events,
+                "flushes": self.flushes,
+                "flush_failures": self.flush_failures
+            }
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Recompute the rollups from every session in the bucket and store them
+
+        The same scan backfills the candidate index, so candidate_count counts
+        every existing candidate once and later index creations are counted as
+        new candidates (see CandidateIndexService).
+
+        The write is conditional on the document being unchanged since the scan
+        started. If another worker wrote it meanwhile, the stored document is
+        kept and returned, so a rebuild never overwrites newer updates.
+        """
+        # Settle this process's queue first so none of its events are counted twice
+        self.flush()
+        _, etag = self.s3_service.get_json(ROLLUP_KEY)
+
+        rollups = empty_rollups()
+        sessions = []
+        for session_data in self.s3_service.iter_sessions(fields=SUMMARY_FIELDS):
+            apply_session_created(rollups, session_data)
+            apply_session_report(rollups, session_data)
+            sessions.append(session_data)
+        count = len(sessions)
+        rollups["candidate_count"] = len({candidate_key(session_data.get("candidate_name")) for session_data in sessions})
+        CandidateIndexService(self.s3_service).rebuild(sessions)
+        rollups["updated_at"] = datetime.utcnow().isoformat()
+
+        condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+        try:
+            self.s3_service.s3_client.put_object(
+                Bucket=self.s3_service.bucket_name,
+                Key=ROLLUP_KEY,
+                Body=json.dumps(rollups),
+                ContentType='application/json',
+                **condition
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                raise
+            current, _ = self.s3_service.get_json(ROLLUP_KEY)
+            if current is not None and current.get("version") == ROLLUP_VERSION:
+                print("[ANALYTICS] Rollups changed during rebuild, keeping the stored document")
+                return current
+            print("[ANALYTICS] Rollups changed during rebuild, serving the rebuilt copy without storing it")
+            return rollups
+
+        print(f"[ANALYTICS] Rebuilt rollups from {count} sessions")
+        return rollups
+
+    def _enqueue(self, mutate: Callable[[Dict[str, Any]], None]):
+        with self._lock:
+            self._pending.append(mutate)
+            self.queued_events += 1
+        self._ensure_timer()
+
+    def _ensure_timer(self):
+        if self._timer is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Thread(target=self._run_timer, name="analytics-rollups", daemon=True)
+                self._timer.start()
+
+    def _run_timer(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+
+# Process-wide rollup service shared by the routers, so every event goes through one queue
+rollup_service: Optional[AnalyticsRollupService] = None
+
+
+def get_rollup_service() -> AnalyticsRollupService:
+    """Get the process-wide analytics rollup service, creating it on first use"""
+    global rollup_service
+    if rollup_service is None:
+        rollup_service = AnalyticsRollupService()
+    return rollup_service
@@ -0,0 +1,358 @@
+"""
+Analytics Snapshot Service
+Columnar export of session metadata and report scores for vectorized ad-hoc analytics
+"""
+
+import io
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from botocore.exceptions import ClientError
+
+from app.services.s3_service import S3Service
+
+SNAPSHOT_KEY = "analytics/snapshot.npz"
+SNAPSHOT_VERSION = 1
+
+# Snapshot column -> performance_report.scores field (None means overallScore)
+SCORE_COLUMNS = {
+    "overall": None,
+    "technical": "technicalKnowledge",
+    "problem_solving": "problemSolving",
+    "communication": "communication",
+    "code_quality": "codeQuality",
+    "cultural_fit": "culturalFit"
+}
+
+GROUP_BY_COLUMNS = {
+    "interview_type": ("interview_type_code", "interview_types"),
+    "recommendation": ("recommendation_code", "recommendations"),
+    "candidate": ("candidate_code", "candidate_names"),
+    "status": ("status_code", "statuses"),
+    "day": ("created_day", None)
+}
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _day_number(iso_timestamp: Optional[str]) -> int:
+    if not iso_timestamp:
+        return -1
+    try:
+        return (datetime.fromisoformat(iso_timestamp) - EPOCH).days
+    except ValueError:
+        return -1
+
+
+def _day_string(day_number: int) -> str:
+    return (EPOCH + timedelta(days=int(day_number))).date().isoformat()
+
+
+class _Dictionary:
+    """Dictionary encoder: value -> dense integer code"""
+
+    def __init__(self, normalize=None):
+        self.normalize = normalize
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        key = self.normalize(value) if self.normalize else value
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def array(self) -> np.ndarray:
+        return np.array(self.values, dtype=str)
+
+
+class AnalyticsSnapshot:
+    """
+    One row per session, stored column-wise.
+
+    Interview types, candidate names, recommendations and statuses are
+    dictionary-encoded as integer codes (-1 for missing); scores are float32
+    with NaN for sessions without a report; days are integers since the epoch.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.size = len(columns["created_day"])
+        self.created_at = str(columns["snapshot_created_at"]) if "snapshot_created_at" in columns else None
+        self._candidate_lookup = {name.lower(): code for code, name in enumerate(columns["candidate_names"])}
+        self._type_lookup = {name.lower(): code for code, name in enumerate(columns["interview_types"])}
+
+    @classmethod
+    def from_sessions(cls, sessions) -> "AnalyticsSnapshot":
+        """Flatten session documents into columns"""
+        interview_types = _Dictionary(normalize=str.lower)
+        candidates = _Dictionary(normalize=str.lower)
+        recommendations = _Dictionary()
+        statuses = _Dictionary()
+
+        session_ids, days, type_codes, candidate_codes = [], [], [], []
+        recommendation_codes, status_codes = [], []
+        scores = {column: [] for column in SCORE_COLUMNS}
+
+        for session in sessions:
+            report = session.get("performance_report") or {}
+            report_scores = report.get("scores", {})
+
+            session_ids.append(session.get("session_id", ""))
+            days.append(_day_number(session.get("created_at")))
+            type_codes.append(interview_types.encode(session.get("interview_type", "Unknown")))
+            candidate_codes.append(candidates.encode(session.get("candidate_name")))
+            recommendation_codes.append(recommendations.encode(report.get("recommendation")))
+            status_codes.append(statuses.encode(session.get("status")))
+            for column, field in SCORE_COLUMNS.items():
+                value = report.get("overallScore") if field is None else report_scores.get(field)
+                scores[column].append(np.nan if not report or value is None else value)
+
+        columns = {
+            "version": np.array(SNAPSHOT_VERSION),
+            "snapshot_created_at": np.array(datetime.utcnow().isoformat()),
+            "session_id": np.array(session_ids, dtype=str),
+            "created_day": np.array(days, dtype=np.int32),
+            "interview_type_code": np.array(type_codes, dtype=np.int32),
+            "candidate_code": np.array(candidate_codes, dtype=np.int32),
+            "recommendation_code": np.array(recommendation_codes, dtype=np.int32),
+            "status_code": np.array(status_codes, dtype=np.int32),
+            "interview_types": interview_types.array(),
+            "candidate_names": candidates.array(),
+            "recommendations": recommendations.array(),
+            "statuses": statuses.array()
+        }
+        for column, values in scores.items():
+            columns[column] = np.array(values, dtype=np.float32)
+        return cls(columns)
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **self.columns)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AnalyticsSnapshot":
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            return cls({name: npz[name] for name in npz.files})
+
+    def mask(
+        self,
+        interview_type: Optional[str] = None,
+        candidate_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        completed_only: bool = False,
+        with_report: bool = False
+    ) -> np.ndarray:
+        """Boolean row filter"""
+        c = self.columns
+        mask = np.ones(self.size, dtype=bool)
+        if interview_type is not None:
+            mask &= c["interview_type_code"] == self._type_lookup.get(interview_type.lower(), -2)
+        if candidate_name is not None:
+            mask &= c["candidate_code"] == self._candidate_lookup.get(candidate_name.lower(), -2)
+        if since is not None:
+            mask &= c["created_day"] >= _day_number(since)
+        if until is not None:
+            mask &= (c["created_day"] >= 0) & (c["created_day"] <= _day_number(until))
+        if completed_only:
+            completed = np.flatnonzero(c["statuses"] == "completed")
+            mask &= np.isin(c["status_code"], completed)
+        if with_report:
+            mask &= ~np.isnan(c["overall"])
+        return mask
+
+    def group_by(
+        self,
+        key: str,
+        metric: str = "overall",
+        percentiles: Optional[List[float]] = None,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Count and score statistics per group
+
+        Args:
+            key: One of GROUP_BY_COLUMNS
+            metric: Score column to summarize (one of SCORE_COLUMNS)
+            percentiles: Percentiles (0-100) of the metric per group
+            mask: Row filter from mask()
+
+        Returns:
+            One dict per group with count, scored, mean and requested percentiles
+        """
+        code_column, vocabulary_column = GROUP_BY_COLUMNS[key]
+        rows = np.flatnonzero(mask) if mask is not None else np.arange(self.size)
+        codes = self.columns[code_column][rows]
+        values = self.columns[metric][rows]
+
+        valid = codes >= 0
+        codes, values = codes[valid], values[valid]
+        if codes.size == 0:
+            return []
+
+        groups, inverse = np.unique(codes, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(groups))
+        scored = ~np.isnan(values)
+        scored_counts = np.bincount(inverse[scored], minlength=len(groups))
+        sums = np.bincount(inverse[scored], weights=values[scored], minlength=len(groups))
+
+        if percentiles:
+            # Sort once by (group, value) so every group's scores are a contiguous slice
+            order = np.lexsort((values[scored], inverse[scored]))
+            sorted_values = values[scored][order]
+            bounds = np.concatenate(([0], np.cumsum(scored_counts)))
+
+        vocabulary = self.columns[vocabulary_column] if vocabulary_column else None
+        results = []
+        for index, code in enumerate(groups):
+            label = _day_string(code) if vocabulary is None else str(vocabulary[code])
+            group = {
+                key: label,
+                "count": int(counts[index]),
+                "scored": int(scored_counts[index]),
+                "mean": round(float(sums[index] / scored_counts[index]), 2) if scored_counts[index] else None
+            }
+            if percentiles:
+                group_values = sorted_values[bounds[index]:bounds[index + 1]]
+                for p in percentiles:
+                    group[f"p{p:g}"] = round(float(np.percentile(group_values, p)), 2) if group_values.size else None
+            results.append(group)
+        return results
+
+
+class AnalyticsSnapshotService:
+    """
+    Exports the snapshot to S3 and keeps the latest copy loaded in memory.
+
+    The in-memory copy is refreshed at most every `refresh_interval` seconds,
+    and only re-downloaded when the object's ETag changed. Exports are
+    single-flight within the process: callers that find an export running wait
+    for it and use its result instead of scanning the bucket again.
+    """
+
+    def __init__(self, s3_service: Optional[S3Service] = None, refresh_interval: float = 60):
+        self.s3_service = s3_service or S3Service()
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[AnalyticsSnapshot] = None
+        self._etag: Optional[str] = None
+        self._checked_at = 0.0
+        self._exported_at = 0.0
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def export(self) -> AnalyticsSnapshot:
+        """Scan all sessions, write a fresh snapshot to S3 and make it current"""
+        with self._export_lock:
+            return self._export()
+
+    def export_if_stale(self, max_age: float) -> Optional[AnalyticsSnapshot]:
+        """
+        Export unless the stored snapshot is younger than `max_age` seconds
+
+        Workers share the stored snapshot, so a periodic export skips the scan
+        when another worker exported recently.
+
+        Returns:
+            The new snapshot, or None if the stored one was fresh enough
+        """
+        with self._export_lock:
+            try:
+                head = self.s3_service.s3_client.head_object(Bucket=self.s3_service.bucket_name, Key=SNAPSHOT_KEY)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                    raise
+                head = None
+            if head is not None:
+                age = (datetime.now(timezone.utc) - head['LastModified']).total_seconds()
+                if age < max_age:
+                    return None
+            return self._export()
+
+    def _export(self) -> AnalyticsSnapshot:
+        start = time.time()
+        snapshot = AnalyticsSnapshot.from_sessions(self.s3_service.iter_sessions(
+            fields=("created_at", "interview_type", "candidate_name", "status", "performance_report")
+        ))
+        response = self.s3_service.s3_client.put_object(
+            Bucket=self.s3_service.bucket_name,
+            Key=SNAPSHOT_KEY,
+            Body=snapshot.to_bytes(),
+            ContentType='application/octet-stream'
+        )
+        with self._lock:
+            self._snapshot = snapshot
+            self._etag = response.get('ETag')
+            self._checked_at = self._exported_at = time.monotonic()
+        print(f"[ANALYTICS] Exported snapshot of {snapshot.size} sessions in {time.time() - start:.2f}s")
+        return snapshot
+
+    def get_snapshot(self) -> AnalyticsSnapshot:
+        """Current snapshot, exporting one if none exists yet"""
+        requested_at = time.monotonic()
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+                return self._snapshot
+
+            try:
+                head = self.s3_service.s3_client.head_object(Bucket=self.s3_service.bucket_name, Key=SNAPSHOT_KEY)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                    raise
+                head = None
+
+            if head is not None:
+                if head.get('ETag') != self._etag or self._snapshot is None:
+                    response = self.s3_service.s3_client.get_object(Bucket=self.s3_service.bucket_name, Key=SNAPSHOT_KEY)
+                    snapshot = AnalyticsSnapshot.from_bytes(response['Body'].read())
+                    if int(snapshot.columns["version"]) == SNAPSHOT_VERSION:
+                        self._snapshot = snapshot
+                        self._etag = response.get('ETag')
+                    else:
+                        head = None
+                self._checked_at = time.monotonic()
+
+        if head is None:
+            return self._export_missing(requested_at)
+        return self._snapshot
+
+    def _export_missing(self, requested_at: float) -> AnalyticsSnapshot:
+        """Export for a reader that found no snapshot, unless an export finished since it asked"""
+        with self._export_lock:
+            with self._lock:
+                if self._snapshot is not None and self._exported_at >= requested_at:
+                    return self._snapshot
+            print("[ANALYTICS] No current snapshot found, exporting")
+            return self._export()
+
+    def start_periodic_export(self, interval: float):
+        """Re-export the snapshot every `interval` seconds in a daemon thread (skipped if another worker just did)"""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.export_if_stale(interval)
+                except Exception as e:
+                    print(f"[ANALYTICS] Snapshot export failed: {e}")
+
+        threading.Thread(target=run, name="analytics-snapshot-export", daemon=True).start()
+
+
+# Process-wide snapshot service shared by the analytics router and the export job
+snapshot_service: Optional[AnalyticsSnapshotService] = None
+
+
+def get_snapshot_service() -> AnalyticsSnapshotService:
+    """Get the process-wide snapshot service, creating it on first use"""
+    global snapshot_service
+    if snapshot_service is None:
+        snapshot_service = AnalyticsSnapshotService()
+    return snapshot_service
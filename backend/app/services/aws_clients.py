@@ -0,0 +1,107 @@
+"""
+AWS Client Registry
+Shared, pooled boto3 clients and executor-backed async wrappers for the service classes
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import boto3
+from botocore.config import Config
+
+from app.config import AWS_REGION, AWS_ACCESS_KEY, AWS_SECRET_ACCESS_KEY, AWS_MAX_POOL_CONNECTIONS
+
+# Per-service timeouts; everything else is shared
+CLIENT_TIMEOUTS = {
+    "s3": {"connect_timeout": 5, "read_timeout": 60},
+    "lambda": {"connect_timeout": 5, "read_timeout": 300},  # performance evaluator runs long
+    "textract": {"connect_timeout": 5, "read_timeout": 120},
+    "bedrock-agent-runtime": {"connect_timeout": 5, "read_timeout": 60},
+}
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+_session = None
+
+# Dedicated pool for blocking AWS calls made from async code, sized to the connection pool
+aws_executor = ThreadPoolExecutor(max_workers=AWS_MAX_POOL_CONNECTIONS, thread_name_prefix="aws-io")
+
+
+def get_client(service_name: str, region_name: Optional[str] = None):
+    """
+    Get the process-wide boto3 client for a service
+
+    Clients are created once with a tuned connection pool, TCP keep-alive and
+    adaptive retries, and shared by every service instance. boto3 clients are
+    thread-safe, so the same client serves the request handlers and the
+    executor threads.
+
+    Args:
+        service_name: boto3 service name
+        region_name: Region other than AWS_REGION (e.g. a failover region)
+    """
+    region_name = region_name or AWS_REGION
+    key = service_name if region_name == AWS_REGION else f"{service_name}@{region_name}"
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            global _session
+            if _session is None:
+                # Client creation on the default session is not thread-safe; use our own under the lock
+                _session = boto3.session.Session(
+                    region_name=AWS_REGION,
+                    aws_access_key_id=AWS_ACCESS_KEY or None,
+                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY or None
+                )
+            config = Config(
+                region_name=region_name,
+                retries={'max_attempts': 3, 'mode': 'adaptive'},
+                max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+                **CLIENT_TIMEOUTS.get(service_name, {})
+            )
+            client = _clients[key] = _session.client(service_name, region_name=region_name, config=config)
+            print(f"[AWS] Created shared {service_name} client in {region_name} (pool={AWS_MAX_POOL_CONNECTIONS})")
+    return client
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call (boto3 or anything built on it) on the AWS executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(aws_executor, functools.partial(fn, *args, **kwargs))
+
+
+class AsyncServiceWrapper:
+    """
+    Awaitable view of a synchronous service: `await service.aio.method(...)`
+    runs `service.method(...)` on the AWS executor.
+    """
+
+    def __init__(self, target: Any):
+        self._target = target
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args, **kwargs):
+            return await run_blocking(attribute, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+
+class AsyncServiceMixin:
+    """Adds the `aio` async view to a service class"""
+
+    @functools.cached_property
+    def aio(self) -> AsyncServiceWrapper:
+        return AsyncServiceWrapper(self)
@@ -1,46 +1,137 @@
-import boto3
 import time
 import json
-from typing import Dict, Any, Optional, List, Generator
-from botocore.config import Config
+import asyncio
+import threading
+from typing import Dict, Any, Optional, List, Generator, AsyncIterator
 from botocore.exceptions import ClientError
-from app.config import AWS_REGION, AWS_ACCESS_KEY, AWS_SECRET_ACCESS_KEY, BEDROCK_AGENT_ID, BEDROCK_AGENT_ALIAS_ID
+from app.config import (
+    BEDROCK_AGENT_ID,
+    BEDROCK_AGENT_ALIAS_ID,
+    BEDROCK_STATE_MAX_HISTORY,
+    BEDROCK_TURN_BUDGET,
+    BEDROCK_TURN_TOTAL_BUDGET,
+    BEDROCK_HEDGE_ENABLED,
+    BEDROCK_HEDGE_PERCENTILE,
+    BEDROCK_HEDGE_MIN_DELAY,
+    BEDROCK_FALLBACK_REGION,
+    BEDROCK_FALLBACK_AGENT_ID,
+    BEDROCK_FALLBACK_AGENT_ALIAS_ID
+)
 from app.config.interview_types import get_interview_config, INTERVIEW_PHASES
+from app.services.aws_clients import AsyncServiceMixin, aws_executor, get_client, run_blocking
+from app.services.latency_histogram import LatencyHistogram
+from app.services.session_state_store import SessionStateStore, get_session_state_store
 
-class BedrockService:
-    def __init__(self):
-        # Configure boto3 with connection reuse and faster settings
-        config = Config(
-            region_name=AWS_REGION,
-            retries={
-                'max_attempts': 3,
-                'mode': 'adaptive'
-            },
-            connect_timeout=5,  # Faster initial connection
-            read_timeout=60,
-            max_pool_connections=50,  # Connection pooling
-            tcp_keepalive=True  # Keep connections alive
-        )
+# First-token samples needed before the hedge delay follows the observed percentile
+HEDGE_MIN_SAMPLES = 20
 
-        self.bedrock_agent_client = boto3.client(
-            'bedrock-agent-runtime',
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            config=config
-        )
+# Process-wide latency metrics (BedrockService is created per connection)
+first_token_latency = LatencyHistogram()
+total_latency = LatencyHistogram()
+invocation_counters = {"invocations": 0, "hedges": 0, "fallback_wins": 0, "failovers": 0, "timeouts": 0}
+
+
+def invocation_stats() -> Dict[str, Any]:
+    """Bedrock latency histograms and hedging counters for monitoring"""
+    return {
+        **invocation_counters,
+        "first_token": first_token_latency.snapshot(),
+        "total": total_latency.snapshot()
+    }
+
+
+def event_text(event: Dict[str, Any]) -> str:
+    """Text carried by one completion stream event ('' for trace and other events)"""
+    chunk_data = event.get('chunk', {})
+    return chunk_data['bytes'].decode('utf-8') if 'bytes' in chunk_data else ""
+
+
+class AgentTarget:
+    """Where an agent turn can be sent: a regional client plus agent and alias ids"""
+
+    def __init__(self, name: str, client, agent_id: str, agent_alias_id: str):
+        self.name = name
+        self.client = client
+        self.agent_id = agent_id
+        self.agent_alias_id = agent_alias_id
+
+
+class OpenedStream:
+    """A completion stream that has produced its first text (or ended without any)"""
+
+    def __init__(self, target: AgentTarget, first_text: str, events, event_stream):
+        self.target = target
+        self.first_text = first_text
+        self.events = events
+        self.event_stream = event_stream
+
+    def close(self):
+        if hasattr(self.event_stream, 'close'):
+            self.event_stream.close()
+
+
+class StreamAttempt:
+    """
+    One in-flight invocation racing for the first token.
+
+    The blocking open registers its event stream here as soon as invoke_agent
+    returns, so abandoning the attempt closes the HTTP stream immediately
+    instead of leaving it to read until its first text arrives.
+    """
+
+    def __init__(self, target: AgentTarget):
+        self.target = target
+        self.event_stream = None
+        self.abandoned = False
+        self._lock = threading.Lock()
+
+    def attach(self, event_stream) -> bool:
+        """Register the opened stream; False if the attempt was already abandoned"""
+        with self._lock:
+            if self.abandoned:
+                return False
+            self.event_stream = event_stream
+            return True
+
+    def abandon(self):
+        with self._lock:
+            self.abandoned = True
+            event_stream = self.event_stream
+        if event_stream is not None and hasattr(event_stream, 'close'):
+            event_stream.close()
+
+
+class BedrockService(AsyncServiceMixin):
+    def __init__(self, session_states: Optional[SessionStateStore] = None):
+        # Shared client: pooled connections with keep-alive and adaptive retries
+        self.bedrock_agent_client = get_client('bedrock-agent-runtime')
         self.agent_id = BEDROCK_AGENT_ID
         self.agent_alias_id = BEDROCK_AGENT_ALIAS_ID
 
-        # Session state cache (in production, use Redis or DynamoDB)
-        self.session_states: Dict[str, Dict[str, Any]] = {}
+        # Primary target, plus an optional fallback alias/region for hedging and failover
+        self.targets: List[AgentTarget] = [
+            AgentTarget("primary", self.bedrock_agent_client, self.agent_id, self.agent_alias_id)
+        ]
+        if BEDROCK_FALLBACK_REGION or BEDROCK_FALLBACK_AGENT_ALIAS_ID:
+            self.targets.append(AgentTarget(
+                "fallback",
+                get_client('bedrock-agent-runtime', BEDROCK_FALLBACK_REGION or None),
+                BEDROCK_FALLBACK_AGENT_ID or self.agent_id,
+                BEDROCK_FALLBACK_AGENT_ALIAS_ID or self.agent_alias_id
+            ))
+
+        # Bounded store shared across connections (LRU+TTL in process, or an external backend)
+        self.session_states = session_states or get_session_state_store()
+        self.max_history = BEDROCK_STATE_MAX_HISTORY
 
     def initialize_session(
         self,
         session_id: str,
         interview_type: str,
         candidate_name: str,
-        resume_summary: Optional[str] = None
+        resume_summary: Optional[str] = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        turn_count: int = 0
     ) -> Dict[str, Any]:
         """
         Initialize session state for a new interview session
@@ -50,22 +141,29 @@ class BedrockService:
             interview_type: Type of interview (e.g., "Google SDE", "AWS SA")
             candidate_name: Name of the candidate
             resume_summary: Optional summary of candidate's resume
+            conversation_history: Earlier {"role", "content"} messages, for sessions already under way
+            turn_count: Candidate turns already taken
 
         Returns:
             Session state dictionary
         """
+        now = round(time.time(), 3)
+        history = [
+            [message["role"], message["content"], message.get("timestamp", now)]
+            for message in conversation_history or []
+        ]
         session_state = {
             "sessionId": session_id,
             "interviewType": interview_type,
             "candidateName": candidate_name,
             "resumeSummary": resume_summary or "Not provided",
-            "conversationHistory": [],
+            "conversationHistory": history[-self.max_history:] if self.max_history > 0 else [],
             "startTime": time.time(),
-            "turnCount": 0
+            "turnCount": turn_count
         }
 
-        self.session_states[session_id] = session_state
-        return session_state
+        self.session_states.put(session_id, session_state)
+        return self._expand_state(session_state)
 
     def get_session_state(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -77,59 +175,96 @@ class BedrockService:
         Returns:
             Session state dictionary or None if not found
         """
-        return self.session_states.get(session_id)
+        session_state = self.session_states.get(session_id)
+        return self._expand_state(session_state) if session_state is not None else None
+
+    def resume_session(self, session_id: str, session_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Stored state for a connecting session, created from session_state if missing
+
+        A reconnect (possibly to another worker) gets the state recorded by
+        earlier connections, which may be ahead of a transcript whose last
+        writes are still buffered elsewhere.
+
+        Args:
+            session_id: Unique session identifier
+            session_state: Current state from SessionContext.bedrock_session_state()
+
+        Returns:
+            Session state dictionary
+        """
+        stored = self.session_states.get(session_id)
+        if stored is not None:
+            return self._expand_state(stored)
+        return self.initialize_session(
+            session_id,
+            session_state.get("interviewType", ""),
+            session_state.get("candidateName", ""),
+            session_state.get("resumeSummary"),
+            conversation_history=session_state.get("conversationHistory"),
+            turn_count=session_state.get("turnCount", 0)
+        )
 
     def update_session_state(
         self,
         session_id: str,
-        user_input: str,
+        user_input: Optional[str],
         agent_response: str
-    ) -> None:
+    ) -> bool:
         """
         Update session state with latest conversation turn
 
         Args:
             session_id: Unique session identifier
-            user_input: User's input text
+            user_input: User's input text (None for turns the agent opens, e.g. the greeting)
             agent_response: Agent's response text
+
+        Returns:
+            False if the session has no stored state or the update failed
         """
-        if session_id in self.session_states:
-            self.session_states[session_id]["conversationHistory"].append({
-                "role": "user",
-                "content": user_input,
-                "timestamp": time.time()
-            })
-            self.session_states[session_id]["conversationHistory"].append({
-                "role": "assistant",
-                "content": agent_response,
-                "timestamp": time.time()
-            })
-            self.session_states[session_id]["turnCount"] += 1
+        now = round(time.time(), 3)
+
+        def update(session_state):
+            # History is kept as compact [role, content, timestamp] rows, newest max_history only
+            history = session_state["conversationHistory"]
+            if user_input:
+                history.append(["user", user_input, now])
+                session_state["turnCount"] += 1
+            history.append(["assistant", agent_response, now])
+            del history[:-self.max_history]
+
+        return self.session_states.update(session_id, update)
+
+    @staticmethod
+    def _expand_state(session_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a stored state with history rows expanded to message dicts"""
+        return {
+            **session_state,
+            "conversationHistory": [
+                {"role": role, "content": content, "timestamp": timestamp}
+                for role, content, timestamp in session_state.get("conversationHistory", [])
+            ]
+        }
 
-    def invoke_agent(
+    def _build_invoke_params(
         self,
         session_id: str,
         input_text: str,
         enable_trace: bool = False,
-        max_retries: int = 2,
         session_state: Optional[Dict[str, Any]] = None
-    ):
+    ) -> Dict[str, Any]:
         """
-        Invoke Bedrock Agent with streaming response and retry logic
+        Build invoke_agent parameters, expanding session state into session attributes
 
         Args:
             session_id: Unique session identifier
             input_text: User input text
             enable_trace: Enable agent trace for debugging
-            max_retries: Maximum number of retry attempts
             session_state: Optional session state attributes to pass to agent
 
         Returns:
-            Generator yielding response chunks
+            Keyword arguments for bedrock-agent-runtime invoke_agent
         """
-        retry_count = 0
-        base_delay = 0.5  # Start with 500ms delay
-
         # Build enhanced session state for Bedrock Agent
         session_attributes = {}
         if session_state:
@@ -167,23 +302,52 @@ class BedrockService:
             print(f"  - current_phase: {session_attributes.get('current_phase')}")
             print(f"  - focus_areas: {session_attributes.get('focus_areas')}")
 
+        # Prepare invocation parameters
+        invoke_params = {
+            "agentId": self.agent_id,
+            "agentAliasId": self.agent_alias_id,
+            "sessionId": session_id,
+            "inputText": input_text,
+            "enableTrace": enable_trace
+        }
+
+        # Add session state if provided
+        if session_attributes:
+            invoke_params["sessionState"] = {
+                "sessionAttributes": session_attributes
+            }
+
+        return invoke_params
+
+    def invoke_agent(
+        self,
+        session_id: str,
+        input_text: str,
+        enable_trace: bool = False,
+        max_retries: int = 2,
+        session_state: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Invoke Bedrock Agent with streaming response and retry logic
+
+        Blocking; async callers should use astream_agent instead.
+
+        Args:
+            session_id: Unique session identifier
+            input_text: User input text
+            enable_trace: Enable agent trace for debugging
+            max_retries: Maximum number of retry attempts
+            session_state: Optional session state attributes to pass to agent
+
+        Returns:
+            Generator yielding response chunks
+        """
+        retry_count = 0
+        base_delay = 0.5  # Start with 500ms delay
+        invoke_params = self._build_invoke_params(session_id, input_text, enable_trace, session_state)
+
         while retry_count <= max_retries:
             try:
-                # Prepare invocation parameters
-                invoke_params = {
-                    "agentId": self.agent_id,
-                    "agentAliasId": self.agent_alias_id,
-                    "sessionId": session_id,
-                    "inputText": input_text,
-                    "enableTrace": enable_trace
-                }
-
-                # Add session state if provided
-                if session_attributes:
-                    invoke_params["sessionState"] = {
-                        "sessionAttributes": session_attributes
-                    }
-
                 response = self.bedrock_agent_client.invoke_agent(**invoke_params)
 
                 # Return the streaming event stream
@@ -210,6 +374,337 @@ class BedrockService:
         # If all retries exhausted
         raise Exception("Max retries exceeded for Bedrock Agent invocation")
 
+    async def ainvoke_agent(
+        self,
+        session_id: str,
+        input_text: str,
+        enable_trace: bool = False,
+        max_retries: int = 2,
+        session_state: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Async variant of invoke_agent: the request runs on the AWS executor and
+        throttling backoff uses asyncio.sleep, so the event loop is never blocked
+
+        Args:
+            session_id: Unique session identifier
+            input_text: User input text
+            enable_trace: Enable agent trace for debugging
+            max_retries: Maximum number of retry attempts
+            session_state: Optional session state attributes to pass to agent
+
+        Returns:
+            Bedrock completion event stream (blocking iterator)
+        """
+        retry_count = 0
+        base_delay = 0.5  # Start with 500ms delay
+        invoke_params = self._build_invoke_params(session_id, input_text, enable_trace, session_state)
+
+        while retry_count <= max_retries:
+            try:
+                response = await run_blocking(self.bedrock_agent_client.invoke_agent, **invoke_params)
+                return response.get('completion', [])
+
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code', '')
+
+                if error_code == 'ThrottlingException' and retry_count < max_retries:
+                    # Exponential backoff
+                    delay = base_delay * (2 ** retry_count)
+                    print(f"Throttling detected. Retrying in {delay}s... (attempt {retry_count + 1}/{max_retries})")
+                    await asyncio.sleep(delay)
+                    retry_count += 1
+                else:
+                    print(f"Error invoking Bedrock Agent: {e}")
+                    raise
+
+            except Exception as e:
+                print(f"Error invoking Bedrock Agent: {e}")
+                raise
+
+        # If all retries exhausted
+        raise Exception("Max retries exceeded for Bedrock Agent invocation")
+
+    async def astream_agent(
+        self,
+        session_id: str,
+        input_text: str,
+        enable_trace: bool = False,
+        max_retries: int = 2,
+        session_state: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Invoke Bedrock Agent and yield response text chunks without blocking the event loop
+
+        Each read from the completion stream runs on the AWS executor. Closing or
+        cancelling the generator (e.g. when the WebSocket goes away) closes the
+        underlying HTTP stream so Bedrock stops sending.
+
+        Args:
+            session_id: Unique session identifier
+            input_text: User input text
+            enable_trace: Enable agent trace for debugging
+            max_retries: Maximum number of retry attempts
+            session_state: Optional session state attributes to pass to agent
+
+        Yields:
+            Text chunks from the agent response
+        """
+        start = time.monotonic()
+        invocation_counters["invocations"] += 1
+        event_stream = await self.ainvoke_agent(
+            session_id=session_id,
+            input_text=input_text,
+            enable_trace=enable_trace,
+            max_retries=max_retries,
+            session_state=session_state
+        )
+        events = iter(event_stream)
+        end_of_stream = object()
+        first_token = True
+
+        try:
+            while True:
+                event = await run_blocking(next, events, end_of_stream)
+                if event is end_of_stream:
+                    break
+                text = event_text(event)
+                if text:
+                    if first_token:
+                        first_token_latency.observe(time.monotonic() - start)
+                        first_token = False
+                    yield text
+            total_latency.observe(time.monotonic() - start)
+        finally:
+            if hasattr(event_stream, 'close'):
+                event_stream.close()
+
+    async def astream_agent_deadline(
+        self,
+        session_id: str,
+        input_text: str,
+        enable_trace: bool = False,
+        max_retries: int = 2,
+        session_state: Optional[Dict[str, Any]] = None,
+        budget: float = BEDROCK_TURN_BUDGET,
+        hedge: bool = BEDROCK_HEDGE_ENABLED,
+        total_budget: float = BEDROCK_TURN_TOTAL_BUDGET,
+        record_latency: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Deadline-aware astream_agent with optional hedging
+
+        The first token must arrive within `budget` seconds and the whole
+        response within `total_budget` seconds, otherwise the turn fails with
+        TimeoutError and the stream is closed instead of stalling. With hedging
+        on and a fallback target configured, a second request goes to the
+        fallback when the first token is slower than the hedge delay
+        (BEDROCK_HEDGE_PERCENTILE of recent first-token latency), or at once if
+        the primary fails. The first stream to produce text wins and the others
+        are closed.
+
+        Hedges never go to the same alias twice, since concurrent invocations of
+        one agent session conflict. The fallback alias/region keeps its own
+        agent session memory, so requests to it replay the conversation history
+        from session_state; the primary's memory does not see turns answered by
+        the fallback beyond what later replays carry.
+
+        Args:
+            session_id: Unique session identifier
+            input_text: User input text
+            enable_trace: Enable agent trace for debugging
+            max_retries: Throttling retries when no other target is left
+            session_state: Optional session state attributes to pass to agent
+            budget: Seconds allowed until the first token (0 for no deadline)
+            hedge: Allow a hedged request to the fallback target
+            total_budget: Seconds allowed for the whole response (0 for no deadline)
+            record_latency: Record into the latency histograms that drive the
+                hedge delay; off for warm-only calls such as the first-turn prefetch
+
+        Yields:
+            Text chunks from the winning agent response
+        """
+        start = time.monotonic()
+        invocation_counters["invocations"] += 1
+        invoke_params = self._build_invoke_params(session_id, input_text, enable_trace, session_state)
+        replay_params = self._with_history_replay(invoke_params, session_state)
+        opened = await self._open_first_stream(invoke_params, replay_params, start, budget, hedge, max_retries)
+        if opened.first_text and record_latency:
+            first_token_latency.observe(time.monotonic() - start)
+        deadline = start + total_budget if total_budget > 0 else None
+        end_of_stream = object()
+
+        try:
+            if opened.first_text:
+                yield opened.first_text
+            while True:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                try:
+                    event = await asyncio.wait_for(
+                        run_blocking(next, opened.events, end_of_stream),
+                        timeout=max(0.0, remaining) if remaining is not None else None
+                    )
+                except asyncio.TimeoutError:
+                    invocation_counters["timeouts"] += 1
+                    raise TimeoutError(f"Bedrock response exceeded the {total_budget:.1f}s turn budget")
+                if event is end_of_stream:
+                    break
+                text = event_text(event)
+                if text:
+                    yield text
+            if record_latency:
+                total_latency.observe(time.monotonic() - start)
+        finally:
+            opened.close()
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the first token before sending a hedged request"""
+        observed = None
+        if first_token_latency.count >= HEDGE_MIN_SAMPLES:
+            observed = first_token_latency.percentile(BEDROCK_HEDGE_PERCENTILE)
+        return max(BEDROCK_HEDGE_MIN_DELAY, observed or 0)
+
+    @staticmethod
+    def _with_history_replay(invoke_params: Dict[str, Any], session_state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Invoke parameters for a target that does not share the primary's agent memory
+
+        The recorded conversation history is passed as sessionState
+        conversationHistory, so the fallback answers with the interview's
+        context instead of starting from a blank session. The replay starts at
+        the first user message and joins consecutive messages of one role, as
+        the history must alternate between user and assistant.
+        """
+        history = (session_state or {}).get("conversationHistory") or []
+        messages = []
+        for message in history:
+            role, content = message.get("role"), message.get("content")
+            if role not in ("user", "assistant") or not content:
+                continue
+            if not messages and role != "user":
+                continue  # the replayed conversation must open with a user message
+            if messages and messages[-1]["role"] == role:
+                # Roles must alternate; consecutive messages of one role are joined
+                messages[-1]["content"][0]["text"] += "\n" + content
+            else:
+                messages.append({"role": role, "content": [{"text": content}]})
+        if not messages:
+            return invoke_params
+        return {
+            **invoke_params,
+            "sessionState": {
+                **invoke_params.get("sessionState", {}),
+                "conversationHistory": {"messages": messages}
+            }
+        }
+
+    def _open_stream(self, attempt: StreamAttempt, invoke_params: Dict[str, Any]) -> OpenedStream:
+        """Invoke one target and read until its first text chunk (blocking)"""
+        target = attempt.target
+        response = target.client.invoke_agent(**{
+            **invoke_params,
+            "agentId": target.agent_id,
+            "agentAliasId": target.agent_alias_id
+        })
+        event_stream = response.get('completion', [])
+        if not attempt.attach(event_stream):
+            if hasattr(event_stream, 'close'):
+                event_stream.close()
+            raise RuntimeError(f"{target.name} invocation abandoned")
+        events = iter(event_stream)
+        try:
+            for event in events:
+                text = event_text(event)
+                if text:
+                    return OpenedStream(target, text, events, event_stream)
+        except Exception:
+            if hasattr(event_stream, 'close'):
+                event_stream.close()
+            raise
+        return OpenedStream(target, "", events, event_stream)
+
+    async def _open_first_stream(
+        self,
+        invoke_params: Dict[str, Any],
+        replay_params: Dict[str, Any],
+        start: float,
+        budget: float,
+        hedge: bool,
+        max_retries: int
+    ) -> OpenedStream:
+        """Race the primary (and possibly a hedge) to the first token within the budget"""
+        loop = asyncio.get_running_loop()
+        deadline = start + budget if budget > 0 else None
+        waiting_targets = list(self.targets if hedge else self.targets[:1])
+        attempts: Dict[asyncio.Future, StreamAttempt] = {}
+        retries = 0
+        last_error: Optional[Exception] = None
+
+        def launch():
+            attempt = StreamAttempt(waiting_targets.pop(0))
+            params = invoke_params if attempt.target is self.targets[0] else replay_params
+            attempts[loop.run_in_executor(aws_executor, self._open_stream, attempt, params)] = attempt
+
+        launch()
+        hedge_at = start + self.hedge_delay() if waiting_targets else None
+
+        try:
+            while attempts:
+                now = time.monotonic()
+                wake_times = [t - now for t in (hedge_at, deadline) if t is not None]
+                timeout = max(0.0, min(wake_times)) if wake_times else None
+                done, _ = await asyncio.wait(set(attempts), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for future in done:
+                    target = attempts.pop(future).target
+                    if future.exception() is None:
+                        if target is not self.targets[0]:
+                            invocation_counters["fallback_wins"] += 1
+                        return future.result()
+                    last_error = future.exception()
+                    print(f"[BEDROCK] {target.name} invocation failed: {last_error}")
+                    if waiting_targets:
+                        # Fail over now rather than waiting for the hedge delay
+                        invocation_counters["failovers"] += 1
+                        hedge_at = None
+                        launch()
+                    elif not attempts and retries < max_retries and self._is_throttle(last_error):
+                        delay = 0.5 * (2 ** retries)
+                        if deadline is None or time.monotonic() + delay < deadline:
+                            print(f"Throttling detected. Retrying in {delay}s... (attempt {retries + 1}/{max_retries})")
+                            await asyncio.sleep(delay)
+                            retries += 1
+                            waiting_targets.append(target)
+                            launch()
+
+                if done:
+                    continue
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    invocation_counters["timeouts"] += 1
+                    raise TimeoutError(f"No Bedrock token within the {budget:.1f}s turn budget")
+                if hedge_at is not None and now >= hedge_at and waiting_targets:
+                    invocation_counters["hedges"] += 1
+                    print(f"[BEDROCK] First token slower than {hedge_at - start:.2f}s, hedging to {waiting_targets[0].name}")
+                    hedge_at = None
+                    launch()
+
+            raise last_error or Exception("Bedrock Agent invocation failed")
+        finally:
+            # Losers and timed-out attempts are closed now; ones still connecting close as soon as they open
+            for future, attempt in attempts.items():
+                attempt.abandon()
+                future.add_done_callback(self._close_abandoned)
+
+    @staticmethod
+    def _close_abandoned(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+
+    @staticmethod
+    def _is_throttle(error: Exception) -> bool:
+        return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code', '') == 'ThrottlingException'
+
     def extract_text_from_stream(self, event_stream):
         """
         Extract text chunks from Bedrock Agent event stream
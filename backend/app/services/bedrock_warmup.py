@@ -0,0 +1,200 @@
+"""
+Bedrock Warm-up
+Pre-establishes and keeps alive bedrock-agent-runtime connections so turns never pay the cold start
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import wait
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+from app.config import BEDROCK_WARM_CONNECTIONS, BEDROCK_KEEPALIVE_INTERVAL
+from app.services.aws_clients import aws_executor, run_blocking
+from app.services.bedrock_service import AgentTarget, BedrockService
+
+# Memory id used by warm-up pings; it never exists, so the call is a cheap lookup
+WARMUP_MEMORY_ID = "prepai-warmup"
+
+
+class BedrockWarmer:
+    """
+    Keeps the shared Bedrock clients' connection pools warm.
+
+    A warm-up sends a few concurrent lightweight requests (an agent memory
+    lookup that returns nothing) to every configured agent target. That
+    resolves credentials, opens and TLS-handshakes pooled connections, and
+    leaves them idle in the pool for the next agent turn. A background
+    thread repeats this every keepalive interval so idle connections are not
+    dropped between interviews.
+    """
+
+    def __init__(
+        self,
+        targets: Optional[List[AgentTarget]] = None,
+        connections: int = BEDROCK_WARM_CONNECTIONS,
+        keepalive_interval: float = BEDROCK_KEEPALIVE_INTERVAL
+    ):
+        self.targets = targets if targets is not None else BedrockService().targets
+        self.connections = max(1, connections)
+        self.keepalive_interval = keepalive_interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        self.warmups = 0
+        self.pings = 0
+        self.failures = 0
+        self.last_warm_at: Optional[float] = None
+        self.last_ping_ms: Optional[float] = None
+
+    def warm(self) -> bool:
+        """
+        Open `connections` pooled connections to every target (blocking)
+
+        Returns:
+            True if at least one target answered
+        """
+        targets = [target for target in self.targets if target.agent_id and target.agent_alias_id]
+        if not targets:
+            return False
+
+        futures = [
+            aws_executor.submit(self._ping, target)
+            for target in targets
+            for _ in range(self.connections)
+        ]
+        wait(futures)
+        latencies = [future.result() for future in futures if future.result() is not None]
+
+        with self._lock:
+            self.warmups += 1
+            self.pings += len(futures)
+            self.failures += len(futures) - len(latencies)
+            if latencies:
+                self.last_warm_at = time.monotonic()
+                self.last_ping_ms = round(min(latencies) * 1000, 1)
+        return bool(latencies)
+
+    async def awarm(self, max_age: Optional[float] = None) -> bool:
+        """
+        Warm from async code, skipping it if the pool was warmed recently
+
+        Args:
+            max_age: Seconds a previous warm-up counts as fresh (defaults to
+                half the keepalive interval)
+        """
+        max_age = self.keepalive_interval / 2 if max_age is None else max_age
+        with self._lock:
+            last_warm_at = self.last_warm_at
+        if last_warm_at is not None and time.monotonic() - last_warm_at < max_age:
+            return True
+        return await run_blocking(self.warm)
+
+    def start(self):
+        """Warm now and keep warming every keepalive interval, on a daemon thread"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="bedrock-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "targets": [target.name for target in self.targets],
+                "connections_per_target": self.connections,
+                "keepalive_interval": self.keepalive_interval,
+                "warmups": self.warmups,
+                "pings": self.pings,
+                "failures": self.failures,
+                "last_warm_age_s": round(time.monotonic() - self.last_warm_at, 1) if self.last_warm_at else None,
+                "last_ping_ms": self.last_ping_ms
+            }
+
+    def _run(self):
+        while True:
+            try:
+                self.warm()
+            except Exception as e:
+                print(f"[BEDROCK WARMUP] Warm-up failed: {e}")
+            if self.keepalive_interval <= 0 or self._stopped.wait(self.keepalive_interval):
+                return
+
+    @staticmethod
+    def _ping(target: AgentTarget) -> Optional[float]:
+        """One lightweight request; returns its latency, or None if the service was not reached"""
+        start = time.monotonic()
+        try:
+            target.client.get_agent_memory(
+                agentId=target.agent_id,
+                agentAliasId=target.agent_alias_id,
+                memoryId=WARMUP_MEMORY_ID,
+                memoryType='SESSION_SUMMARY',
+                maxItems=1
+            )
+        except ClientError:
+            pass  # Any service response means credentials, TLS and the pooled connection are ready
+        except Exception as e:
+            print(f"[BEDROCK WARMUP] {target.name} ping failed: {e}")
+            return None
+        return time.monotonic() - start
+
+
+async def prefetch_first_turn(
+    bedrock_service: BedrockService,
+    session_id: str,
+    prompt: str,
+    session_state: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Speculatively run one agent turn and discard its output
+
+    Used while the greeting plays, so the agent, model and action groups are
+    already warm when the candidate's first answer arrives. The turn runs on a
+    throwaway agent session, so the candidate's agent memory never records the
+    prefetch and real turns never conflict with it. Its output is never reused,
+    and it stays out of the latency histograms so a cold-start turn does not
+    inflate the hedge delay.
+
+    Args:
+        session_id: Interview session the prefetch is for (used for logging only)
+
+    Returns:
+        True if the turn completed
+    """
+    start = time.monotonic()
+    try:
+        async for _ in bedrock_service.astream_agent_deadline(
+            session_id=f"{WARMUP_MEMORY_ID}-{uuid.uuid4().hex}",
+            input_text=prompt,
+            session_state=session_state,
+            hedge=False,
+            record_latency=False
+        ):
+            pass
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[BEDROCK WARMUP] First-turn prefetch failed for {session_id}: {e}")
+        return False
+    print(f"[BEDROCK WARMUP] First-turn prefetch for {session_id} took {time.monotonic() - start:.2f}s")
+    return True
+
+
+# Process-wide warmer, started at app startup
+bedrock_warmer: Optional[BedrockWarmer] = None
+
+
+def get_bedrock_warmer() -> BedrockWarmer:
+    """Get the process-wide Bedrock warmer, creating it on first use"""
+    global bedrock_warmer
+    if bedrock_warmer is None:
+        bedrock_warmer = BedrockWarmer()
+    return bedrock_warmer
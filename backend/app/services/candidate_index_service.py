@@ -0,0 +1,238 @@
+"""
+Candidate Index Service
+Secondary index from candidate name to that candidate's sessions
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from app.services.s3_service import S3Service
+
+CANDIDATE_INDEX_PREFIX = "indexes/candidates"
+# Written once rebuild() has indexed every existing session
+BACKFILL_MARKER_KEY = "indexes/candidates-backfill.json"
+SUMMARY_FIELDS = ("created_at", "updated_at", "ended_at", "interview_type", "candidate_name", "status", "performance_report")
+
+
+def candidate_key(candidate_name: str) -> str:
+    """Normalized candidate key: case-insensitive, whitespace-collapsed"""
+    return " ".join((candidate_name or "").split()).lower()
+
+
+def parse_since(since: Optional[str]) -> Optional[str]:
+    """
+    Normalize a since filter to the naive UTC ISO format session dates are stored in
+
+    Raises:
+        ValueError: If since is not an ISO date or date-time
+    """
+    if since is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(since)
+    except ValueError:
+        raise ValueError(f"since must be an ISO date (YYYY-MM-DD) or date-time, got {since!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def session_summary(session_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Index entry for one session"""
+    report = session_data.get("performance_report") or {}
+    return {
+        "date": session_data.get("created_at"),
+        # Version of the session this entry reflects; merges keep the newer one
+        "updated_at": session_data.get("ended_at") or session_data.get("updated_at") or session_data.get("created_at"),
+        "interview_type": session_data.get("interview_type"),
+        "status": session_data.get("status", "active"),
+        "has_report": bool(report),
+        "score": report.get("overallScore"),
+        "recommendation": report.get("recommendation")
+    }
+
+
+class CandidateIndexService:
+    """
+    One small JSON object per candidate under indexes/candidates/, mapping
+    session ids to summary fields. It is written when a session is created or
+    ended, so a history lookup reads a single object instead of scanning the
+    bucket.
+
+    Until rebuild() has backfilled the sessions that predate the index, a
+    missing index does not mean a candidate has no sessions: history lookups
+    then fall back to a scan (and store what they find), and creating an index
+    is not reported as a new candidate. Once backfilled, on_new_candidate, if
+    given, is called when a candidate's index is first created, which keeps
+    the distinct-candidate count in the rollups exact.
+    """
+
+    def __init__(
+        self,
+        s3_service: Optional[S3Service] = None,
+        on_new_candidate: Optional[Callable[[], None]] = None
+    ):
+        self.s3_service = s3_service or S3Service()
+        self.on_new_candidate = on_new_candidate
+        self._backfilled = False
+
+    def _index_key(self, candidate_name: str) -> str:
+        return f"{CANDIDATE_INDEX_PREFIX}/{quote(candidate_key(candidate_name), safe='')}.json"
+
+    def is_backfilled(self) -> bool:
+        """Whether every session that predates the index has been indexed (cached once true)"""
+        if not self._backfilled:
+            marker, _ = self.s3_service.get_json(BACKFILL_MARKER_KEY)
+            self._backfilled = marker is not None
+        return self._backfilled
+
+    def record_session(self, session_data: Dict[str, Any]) -> bool:
+        """
+        Insert or replace a session's entry in its candidate's index
+
+        An entry for a newer version of the session is kept, so retried and
+        out-of-order writes never roll an entry back.
+
+        Returns:
+            True if the entry was written (or is already newer)
+        """
+        candidate_name = session_data.get("candidate_name") or ""
+        session_id = session_data.get("session_id")
+        if not session_id:
+            return False
+        entry = session_summary(session_data)
+        created = False
+
+        def update(index):
+            nonlocal created
+            current = index["sessions"].get(session_id)
+            if current is not None and (current.get("updated_at") or "") > (entry.get("updated_at") or ""):
+                created = False
+                return False
+            created = not index["sessions"]  # decided by the attempt that is finally written
+            index["sessions"][session_id] = entry
+            index["updated_at"] = datetime.utcnow().isoformat()
+
+        written = self.s3_service.update_json(
+            self._index_key(candidate_name),
+            update,
+            default_factory=lambda: {"candidate_name": candidate_name, "sessions": {}}
+        )
+        if written and created and self.on_new_candidate and self.is_backfilled():
+            self.on_new_candidate()
+        return written
+
+    def get_history(
+        self,
+        candidate_name: str,
+        since: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read a candidate's sessions, newest first
+
+        Args:
+            candidate_name: Candidate name (matched case-insensitively)
+            since: Only sessions created on or after this date/time (ISO format)
+            limit: Page size for scored sessions (None for all)
+            offset: Number of scored sessions to skip
+
+        Returns:
+            Dict with counts and one page of scored sessions, or None if the
+            candidate has no sessions
+
+        Raises:
+            ValueError: If since is not a valid ISO date/time
+        """
+        since = parse_since(since)
+        index, _ = self.s3_service.get_json(self._index_key(candidate_name))
+        if not (index and index.get("complete")) and not self.is_backfilled():
+            # The index may lack sessions that predate it
+            index = {"sessions": self._scan_candidate(candidate_name)}
+        if not index:
+            return None
+
+        entries: List[Dict[str, Any]] = [
+            {"session_id": session_id, **entry}
+            for session_id, entry in index.get("sessions", {}).items()
+            if since is None or (entry.get("date") or "") >= since
+        ]
+        entries.sort(key=lambda entry: entry.get("date") or "", reverse=True)
+
+        scored = [entry for entry in entries if entry.get("has_report")]
+        page = scored[offset:offset + limit] if limit is not None else scored[offset:]
+
+        return {
+            "total_interviews": len(entries),
+            "completed_interviews": sum(1 for entry in entries if entry.get("status") == "completed"),
+            "total_scored": len(scored),
+            "latest_score": scored[0]["score"] if scored else None,
+            "page": page
+        }
+
+    def _scan_candidate(self, candidate_name: str) -> Dict[str, Dict[str, Any]]:
+        """Index entries for one candidate found by scanning the bucket, merged into their index"""
+        key = candidate_key(candidate_name)
+        sessions = {
+            session_data["session_id"]: session_summary(session_data)
+            for session_data in self.s3_service.iter_sessions(fields=SUMMARY_FIELDS)
+            if candidate_key(session_data.get("candidate_name")) == key
+        }
+        if sessions:
+            self._merge(candidate_name, sessions)
+        return sessions
+
+    def _merge(self, candidate_name: str, entries: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Merge scanned entries into a candidate's index
+
+        Entries are merged per session id, and an entry already in the index is
+        replaced only if the scanned session is newer, so sessions the
+        application records during a scan are kept. The index is then marked
+        complete: it holds every session that predates it.
+        """
+        def merge(data):
+            sessions = data["sessions"]
+            for session_id, entry in entries.items():
+                current = sessions.get(session_id)
+                if current is None or (current.get("updated_at") or "") < (entry.get("updated_at") or ""):
+                    sessions[session_id] = entry
+            data["complete"] = True
+            data["updated_at"] = datetime.utcnow().isoformat()
+
+        return self.s3_service.update_json(
+            self._index_key(candidate_name),
+            merge,
+            default_factory=lambda: {"candidate_name": candidate_name, "sessions": {}},
+            max_attempts=8
+        )
+
+    def rebuild(self, sessions: Optional[Iterable[Dict[str, Any]]] = None) -> int:
+        """
+        Merge every session in the bucket into the candidate indexes
+
+        Marks the index as backfilled once every candidate was written.
+
+        Args:
+            sessions: Sessions (with at least SUMMARY_FIELDS) already scanned by
+                the caller; the bucket is scanned if omitted
+
+        Returns:
+            Number of candidates
+        """
+        if sessions is None:
+            sessions = self.s3_service.iter_sessions(fields=SUMMARY_FIELDS)
+        indexes: Dict[str, Dict[str, Any]] = {}
+        for session_data in sessions:
+            candidate_name = session_data.get("candidate_name") or ""
+            index = indexes.setdefault(candidate_key(candidate_name), {"candidate_name": candidate_name, "sessions": {}})
+            index["sessions"][session_data["session_id"]] = session_summary(session_data)
+
+        failed = sum(1 for index in indexes.values() if not self._merge(index["candidate_name"], index["sessions"]))
+        marker = {"backfilled_at": datetime.utcnow().isoformat(), "candidates": len(indexes)}
+        if not failed and self.s3_service.update_json(BACKFILL_MARKER_KEY, lambda data: data.update(marker), default_factory=dict):
+            self._backfilled = True
+        print(f"[ANALYTICS] Rebuilt candidate index for {len(indexes)} candidates ({failed} failed)")
+        return len(indexes)
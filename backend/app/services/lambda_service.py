@@ -3,19 +3,13 @@ Lambda Service - Direct invocation of Lambda functions
 Used for explicit tool calls outside of Bedrock Agent orchestration
 """
 
-import boto3
 import json
 from typing import Dict, Any, Optional
-from app.config import AWS_REGION, AWS_ACCESS_KEY, AWS_SECRET_ACCESS_KEY
+from app.services.aws_clients import AsyncServiceMixin, get_client
 
-class LambdaService:
+class LambdaService(AsyncServiceMixin):
     def __init__(self):
-        self.lambda_client = boto3.client(
-            'lambda',
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-        )
+        self.lambda_client = get_client('lambda')
 
     def invoke_code_executor(
         self,
@@ -0,0 +1,84 @@
+"""
+Latency Histogram
+Fixed-bucket, log-spaced latency histogram with percentile estimates for monitoring and hedging
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional
+
+
+def log_buckets(start: float = 0.025, end: float = 120.0, factor: float = 1.25) -> List[float]:
+    """Bucket upper bounds in seconds, each `factor` times the previous"""
+    bounds = [start]
+    while bounds[-1] < end:
+        bounds.append(round(bounds[-1] * factor, 4))
+    return bounds
+
+
+class LatencyHistogram:
+    """
+    Thread-safe latency histogram.
+
+    Observations are counted in log-spaced buckets, so memory is constant and
+    percentile estimates are accurate to one bucket width (~25%). Percentiles
+    report the bucket's upper bound, i.e. they never under-estimate.
+    """
+
+    def __init__(self, bounds: Optional[List[float]] = None):
+        self.bounds = bounds or log_buckets()
+        self._counts = [0] * (len(self.bounds) + 1)  # last bucket is overflow
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Latency below which p percent of observations fall
+
+        Args:
+            p: Percentile, 0-100
+
+        Returns:
+            Seconds, or None if nothing was observed
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = p / 100 * self.count
+            cumulative = 0
+            for index, bucket_count in enumerate(self._counts):
+                cumulative += bucket_count
+                if cumulative >= rank and bucket_count:
+                    return self.bounds[index] if index < len(self.bounds) else self.max
+            return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total, maximum = self.count, self.total, self.max
+            buckets = [
+                [self.bounds[index] if index < len(self.bounds) else None, bucket_count]
+                for index, bucket_count in enumerate(self._counts) if bucket_count
+            ]
+        return {
+            "count": count,
+            "mean_ms": round(total / count * 1000, 1) if count else None,
+            "p50_ms": self._ms(self.percentile(50)),
+            "p90_ms": self._ms(self.percentile(90)),
+            "p99_ms": self._ms(self.percentile(99)),
+            "max_ms": round(maximum * 1000, 1) if count else None,
+            "buckets": buckets  # [upper bound seconds (None = overflow), count]
+        }
+
+    @staticmethod
+    def _ms(seconds: Optional[float]) -> Optional[float]:
+        return round(seconds * 1000, 1) if seconds is not None else None
@@ -0,0 +1,162 @@
+"""
+Quantile Sketch
+Mergeable t-digest for streaming percentile estimates over interview scores
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning & Ertl) with the k1 (arcsine) scale function.
+
+    Values are added one at a time or merged from other digests (other days,
+    other nodes); the result is the same as if every value had been added to a
+    single digest, up to the sketch's accuracy. Size is bounded by roughly
+    `compression` centroids regardless of how many values were added, and the
+    serialized form is a short list of [mean, weight] pairs.
+    """
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.centroids: List[List[float]] = []  # [mean, weight], sorted by mean
+        self._buffer: List[List[float]] = []
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, weight: float = 1):
+        """Add a value"""
+        self._buffer.append([value, weight])
+        self.count += weight
+        self.total += value * weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) > 5 * self.compression:
+            self._compress()
+
+    def remove(self, value: float, weight: float = 1):
+        """
+        Approximately retract a value previously added
+
+        Takes the weight from the centroid closest to the value, so the error is
+        bounded by that centroid's width. min and max are left unchanged.
+        """
+        self._compress()
+        if not self.centroids:
+            return
+        index = min(range(len(self.centroids)), key=lambda i: abs(self.centroids[i][0] - value))
+        centroid = self.centroids[index]
+        centroid[1] -= weight
+        if centroid[1] <= 0:
+            del self.centroids[index]
+        self.count = max(0, self.count - weight)
+        self.total -= value * weight
+        if self.count == 0:
+            self.centroids = []
+            self.total = 0.0
+            self.min = self.max = None
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one"""
+        other._compress()
+        if not other.count:
+            return self
+        self._buffer.extend([mean, weight] for mean, weight in other.centroids)
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    @classmethod
+    def merged(cls, digests: Iterable["TDigest"], compression: float = 100) -> "TDigest":
+        """Merge several digests into a new one"""
+        result = cls(compression)
+        for digest in digests:
+            result.merge(digest)
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimate the value at quantile q (0..1)"""
+        self._compress()
+        if not self.centroids:
+            return 0
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+
+        q = min(max(q, 0.0), 1.0)
+        target = q * self.count
+
+        # Tails interpolate between the extreme values and the outer centroids
+        first_mean, first_weight = self.centroids[0]
+        if target < first_weight / 2:
+            return self.min + (first_mean - self.min) * target / (first_weight / 2)
+
+        cumulative = 0.0
+        for (mean, weight), (next_mean, next_weight) in zip(self.centroids, self.centroids[1:]):
+            left = cumulative + weight / 2
+            right = cumulative + weight + next_weight / 2
+            if target < right:
+                return mean + (next_mean - mean) * (target - left) / (right - left)
+            cumulative += weight
+
+        last_mean, last_weight = self.centroids[-1]
+        remaining = self.count - target
+        return self.max - (self.max - last_mean) * remaining / (last_weight / 2)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON-serializable form"""
+        self._compress()
+        return {
+            "c": self.compression,
+            "n": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "m": [[round(mean, 4), weight] for mean, weight in self.centroids]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        digest = cls(data.get("c", 100))
+        digest.centroids = [[mean, weight] for mean, weight in data.get("m", [])]
+        digest.count = data.get("n", 0)
+        digest.total = data.get("sum", 0.0)
+        digest.min = data.get("min")
+        digest.max = data.get("max")
+        return digest
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer, key=lambda c: c[0])
+        self._buffer = []
+        total_weight = sum(weight for _, weight in points)
+
+        merged = [list(points[0])]
+        weight_so_far = 0.0
+        q_limit = self._k_inverse(self._k(0) + 1)
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            if (weight_so_far + current[1] + weight) / total_weight <= q_limit:
+                combined = current[1] + weight
+                current[0] += (mean - current[0]) * weight / combined
+                current[1] = combined
+            else:
+                weight_so_far += current[1]
+                q_limit = self._k_inverse(self._k(weight_so_far / total_weight) + 1)
+                merged.append([mean, weight])
+        self.centroids = merged
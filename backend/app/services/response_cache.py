@@ -0,0 +1,177 @@
+"""
+Response Cache
+In-process TTL cache with single-flight and stale-while-revalidate for read-heavy endpoints
+"""
+
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.responses import Response
+
+from app.config import ANALYTICS_CACHE_ENABLED
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "generation")
+
+    def __init__(self, value: Any, ttl: float, stale_ttl: float, generation: int):
+        now = time.monotonic()
+        self.value = value
+        self.fresh_until = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+        self.generation = generation
+
+
+class ResponseCache:
+    """
+    TTL cache keyed by (tag, parameters).
+
+    - Concurrent misses for the same key share one computation (single-flight).
+    - Within `stale_ttl` after expiry the old value is served immediately while
+      one background refresh runs (stale-while-revalidate).
+    - invalidate() drops entries by tag. Computations that started before the
+      invalidation are neither stored nor shared with later requests: each
+      in-flight computation is tagged with the generation it started in.
+
+    The cache is per process; other workers converge within their TTLs.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._entries: Dict[Tuple, _Entry] = {}
+        self._in_flight: Dict[Tuple, Tuple[int, asyncio.Future]] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    async def get_or_compute(
+        self,
+        tag: str,
+        params: Tuple,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0
+    ) -> Tuple[Any, str]:
+        """
+        Get a cached value or compute it
+
+        Args:
+            tag: Cache namespace used for invalidation (e.g. endpoint name)
+            params: Hashable key parameters
+            compute: Coroutine factory producing the value
+            ttl: Seconds the value is fresh
+            stale_ttl: Extra seconds the value may be served while refreshing
+
+        Returns:
+            (value, status) with status "HIT", "STALE", "SHARED", "MISS" or "BYPASS"
+        """
+        if not self.enabled:
+            return await compute(), "BYPASS"
+
+        key = (tag, params)
+        generation = self._generations.get(tag, 0)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        flight = self._in_flight.get(key)
+        if flight is not None and flight[0] != generation:
+            flight = None  # started before an invalidation; its result is outdated
+
+        if entry is not None and entry.generation == generation:
+            if now < entry.fresh_until:
+                self.hits += 1
+                return entry.value, "HIT"
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                if flight is None:
+                    self._start(key, tag, compute, ttl, stale_ttl).add_done_callback(self._log_refresh_error)
+                return entry.value, "STALE"
+
+        if flight is not None:
+            self.shared += 1
+            return await asyncio.shield(flight[1]), "SHARED"
+
+        self.misses += 1
+        return await asyncio.shield(self._start(key, tag, compute, ttl, stale_ttl)), "MISS"
+
+    def invalidate(self, *tags: str):
+        """Drop cached values for the given tags (all tags if none given)"""
+        targets = tags or tuple({key[0] for key in self._entries} | set(self._generations))
+        for tag in targets:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        self._entries = {key: entry for key, entry in self._entries.items() if key[0] not in targets}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "shared": self.shared,
+            "misses": self.misses
+        }
+
+    def _start(self, key, tag, compute, ttl, stale_ttl) -> asyncio.Future:
+        generation = self._generations.get(tag, 0)
+
+        async def run():
+            try:
+                value = await compute()
+                if self._generations.get(tag, 0) == generation:
+                    self._entries[key] = _Entry(value, ttl, stale_ttl, generation)
+                return value
+            finally:
+                # A newer computation may have replaced this one after an invalidation
+                if self._in_flight.get(key, (None, None))[1] is future:
+                    del self._in_flight[key]
+
+        future = asyncio.ensure_future(run())
+        self._in_flight[key] = (generation, future)
+        return future
+
+    @staticmethod
+    def _log_refresh_error(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[CACHE] Background refresh failed: {future.exception()}")
+
+
+def cached_response(cache: ResponseCache, tag: str, ttl: float, stale_ttl: float = 0):
+    """
+    Cache a FastAPI endpoint's response by its keyword arguments
+
+    Successful responses are stored as (body, status, media type) and a fresh
+    Response is built for every request, with an X-Cache header. Exceptions
+    (including HTTPException) are never cached.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            params = tuple(sorted(kwargs.items()))
+
+            async def compute():
+                response = await endpoint(**kwargs)
+                return response.body, response.status_code, response.media_type
+
+            (body, status_code, media_type), status = await cache.get_or_compute(
+                tag, params, compute, ttl, stale_ttl
+            )
+            return Response(content=body, status_code=status_code, media_type=media_type,
+                            headers={"X-Cache": status})
+        return wrapper
+    return decorator
+
+
+# Shared by the analytics router and the session lifecycle endpoints that invalidate it
+analytics_cache: Optional[ResponseCache] = None
+
+
+def get_analytics_cache() -> ResponseCache:
+    """Get the process-wide analytics response cache"""
+    global analytics_cache
+    if analytics_cache is None:
+        analytics_cache = ResponseCache(enabled=ANALYTICS_CACHE_ENABLED)
+    return analytics_cache
@@ -1,67 +1,446 @@
-import boto3
+import copy
+import hashlib
 import json
-from datetime import datetime
-from app.config import AWS_REGION, AWS_ACCESS_KEY, AWS_SECRET_ACCESS_KEY, S3_BUCKET_USER_DATA
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Optional
+from botocore.exceptions import ClientError
+from app.config import S3_BUCKET_USER_DATA, SESSION_CODEC
+from app.services.aws_clients import AsyncServiceMixin, get_client
+from app.services.session_codec import codec_for_object, get_codec
 
-class S3Service:
+# Transcript messages are stored as segment objects under transcripts/{session_id}/,
+# named so that lexical order is (roughly) write order. The session document records
+# the exact names of the segments folded into its transcript, so readers never count
+# a message twice, and compaction deletes only those segments: a segment that lands
+# late (an in-flight PUT, or a writer with a skewed clock) is merged on the next read
+# instead of being skipped or deleted.
+TRANSCRIPT_PREFIX = "transcripts"
+FOLDED_SEGMENTS_FIELD = "transcript_folded_segments"
+# Written by earlier versions: everything at or before this segment name was folded
+COMPACTION_MARKER = "transcript_compacted_through"
+COMPACT_AFTER_SEGMENTS = 50
+
+# Fields that grow with the interview are stored as separate objects under
+# sessions/{session_id}/, and the session document itself stays a small header
+# listing which of them exist. Reads fetch only the parts they ask for.
+# Parts are content-addressed (sessions/{session_id}/{field}.{version}.json) and
+# the header names the version of each, so a save writes new parts first and
+# then swaps the header: a reader always sees a header together with exactly
+# the parts it references, never a new part with an old header.
+SESSION_PARTS = ("transcript", "code_submissions", "cv_analysis")
+PARTS_FIELD = "session_parts"
+PART_VERSIONS_FIELD = "session_part_versions"
+MISSING_PART = object()
+
+class S3Service(AsyncServiceMixin):
     def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-        )
+        self.s3_client = get_client('s3')
         self.bucket_name = S3_BUCKET_USER_DATA
+        self.session_codec = get_codec(SESSION_CODEC)
 
     def save_session(self, session_data: dict) -> bool:
-        """Save session data to S3"""
+        """
+        Save session data to S3
+
+        Heavy fields (SESSION_PARTS) present in session_data are written as
+        new part versions, then the header document pointing at them; the
+        versions it replaced are deleted afterwards. Parts missing from
+        session_data are left as stored, so a caller may save a header with
+        only the parts it changed.
+        """
         try:
             session_id = session_data.get('session_id')
-            key = f"sessions/{session_id}.json"
+            stored = set(session_data.get(PARTS_FIELD, []))
+            previous_versions = dict(session_data.get(PART_VERSIONS_FIELD, {}))
+            parts = {
+                field: session_data[field] for field in SESSION_PARTS
+                if field in session_data and (session_data[field] or field in stored)
+            }
+            versions = self._write_session_parts(session_id, parts)
 
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=json.dumps(session_data, indent=2),
-                ContentType='application/json'
-            )
-            return True
+            header = {key: value for key, value in session_data.items() if key not in SESSION_PARTS}
+            header[PARTS_FIELD] = sorted(stored | set(parts))
+            header[PART_VERSIONS_FIELD] = {**previous_versions, **versions}
+            self._write_session_object(f"sessions/{session_id}.json", header)
         except Exception as e:
             print(f"Error saving session to S3: {e}")
             return False
 
-    def get_session(self, session_id: str) -> dict:
-        """Retrieve session data from S3"""
+        superseded = [
+            self._part_key(session_id, field, previous_versions.get(field))
+            for field in parts
+            if previous_versions.get(field) != versions[field]
+            and (field in previous_versions or field in stored)
+        ]
+        self._delete_objects(superseded)
+        return True
+
+    def update_session(self, session_id: str, updates: dict) -> bool:
+        """
+        Set top-level fields of a stored session without rewriting the rest
+
+        Only the header and the parts named in updates are written.
+
+        Returns:
+            False if the session does not exist or the write failed
+        """
+        try:
+            header = self._read_session_object(f"sessions/{session_id}.json")
+        except Exception as e:
+            print(f"Error updating session {session_id}: {e}")
+            return False
+        return self.save_session({**header, **updates})
+
+    def get_session(self, session_id: str, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Retrieve session data from S3, including transcript messages not yet compacted
+
+        Args:
+            session_id: Session identifier
+            fields: If given, only these top-level fields are returned and only
+                the parts among them are fetched, so metadata reads cost one
+                small GET however long the interview ran. session_id and
+                session_parts are always included.
+
+        Returns:
+            Session data, or {} if the session does not exist
+        """
         try:
-            key = f"sessions/{session_id}.json"
-            response = self.s3_client.get_object(
-                Bucket=self.bucket_name,
-                Key=key
-            )
-            session_data = json.loads(response['Body'].read().decode('utf-8'))
-            return session_data
+            return self._load_session(f"sessions/{session_id}.json", fields, merge_transcript=True)
         except Exception as e:
             print(f"Error retrieving session from S3: {e}")
             return {}
 
-    def update_session_transcript(self, session_id: str, message: dict) -> bool:
-        """Add a message to the session transcript"""
+    def get_json(self, key: str):
+        """
+        Read a JSON object
+
+        Returns:
+            (data, etag), or (None, None) if the object does not exist
+        """
         try:
-            session_data = self.get_session(session_id)
-            if not session_data:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None, None
+            raise
+        return json.loads(response['Body'].read().decode('utf-8')), response.get('ETag')
+
+    def update_json(
+        self,
+        key: str,
+        mutate: Callable[[dict], Optional[bool]],
+        default_factory: Optional[Callable[[], dict]] = None,
+        max_attempts: int = 5
+    ) -> bool:
+        """
+        Optimistic read-modify-write of a JSON object
+
+        Writes are conditional on the ETag that was read (or on the object not
+        existing yet), and retried on conflict, so concurrent writers never lose
+        an update.
+
+        Args:
+            key: Object key
+            mutate: Modifies the data in place; returning False skips the write
+            default_factory: Initial data if the object does not exist; without it
+                a missing object is left alone
+            max_attempts: Conflict retries before giving up
+
+        Returns:
+            True if the update was written or intentionally skipped
+        """
+        for attempt in range(max_attempts):
+            try:
+                data, etag = self.get_json(key)
+                if data is None:
+                    if default_factory is None:
+                        return True
+                    data = default_factory()
+                else:
+                    data = copy.deepcopy(data)
+
+                if mutate(data) is False:
+                    return True
+
+                condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=json.dumps(data),
+                    ContentType='application/json',
+                    **condition
+                )
+                return True
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code in ("PreconditionFailed", "ConditionalRequestConflict"):
+                    print(f"[S3] Conditional write conflict on {key}, retrying (attempt {attempt + 1})")
+                    continue
+                print(f"Error updating {key}: {e}")
                 return False
+            except Exception as e:
+                print(f"Error updating {key}: {e}")
+                return False
+
+        print(f"[S3] Gave up updating {key} after {max_attempts} conflicts")
+        return False
 
-            if 'transcript' not in session_data:
-                session_data['transcript'] = []
+    def get_transcript(self, session_id: str) -> list:
+        """Retrieve the full transcript for a session"""
+        return self.get_session(session_id, fields=('transcript',)).get('transcript', [])
 
-            session_data['transcript'].append(message)
-            session_data['updated_at'] = datetime.utcnow().isoformat()
+    def update_session_transcript(self, session_id: str, message: dict) -> bool:
+        """Append a message to the session transcript"""
+        return self.append_transcript_messages(session_id, [message])
 
-            return self.save_session(session_data)
+    def append_transcript_messages(self, session_id: str, messages: list) -> bool:
+        """
+        Append messages to the session transcript
+
+        Writes one small segment object instead of rewriting the session document,
+        so the cost is O(1) and concurrent appends never overwrite each other.
+        """
+        if not messages:
+            return True
+        try:
+            segment_name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=f"{TRANSCRIPT_PREFIX}/{session_id}/{segment_name}.json",
+                Body=json.dumps(messages),
+                ContentType='application/json'
+            )
+            return True
         except Exception as e:
             print(f"Error updating transcript: {e}")
             return False
 
+    def compact_transcript(self, session_id: str) -> dict:
+        """
+        Fold pending transcript segments into the session document and delete them
+
+        Returns:
+            The compacted session data ({} if the session does not exist)
+        """
+        session_data = self.get_session(session_id)
+        if not session_data:
+            return {}
+
+        # Only the header and the transcript part change
+        compacted = {key: value for key, value in session_data.items() if key not in SESSION_PARTS}
+        compacted['transcript'] = session_data.get('transcript', [])
+        if not self.save_session(compacted):
+            return session_data
+        if compacted['transcript']:
+            session_data[PARTS_FIELD] = sorted(set(session_data.get(PARTS_FIELD, [])) | {'transcript'})
+
+        # Delete exactly the segments now stored in the transcript part, nothing else
+        folded = set(session_data.get(FOLDED_SEGMENTS_FIELD, []))
+        if folded:
+            deleted = self._delete_transcript_segments(session_id, sorted(folded))
+            if deleted:
+                self._forget_folded_segments(session_id, deleted)
+                session_data[FOLDED_SEGMENTS_FIELD] = sorted(folded - deleted)
+            print(f"[S3] Compacted {len(deleted)} transcript segments for {session_id}")
+
+        return session_data
+
+    def _delete_transcript_segments(self, session_id: str, segment_names: list) -> set:
+        """Delete segment objects by name; returns the names actually deleted"""
+        deleted = set()
+        for start in range(0, len(segment_names), 1000):
+            batch = segment_names[start:start + 1000]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={
+                    'Objects': [{'Key': f"{TRANSCRIPT_PREFIX}/{session_id}/{name}.json"} for name in batch],
+                    'Quiet': True
+                }
+            )
+            failed = {self._segment_name(error['Key']) for error in (response or {}).get('Errors', [])}
+            deleted.update(name for name in batch if name not in failed)
+        return deleted
+
+    def _forget_folded_segments(self, session_id: str, deleted: set) -> None:
+        """Drop deleted segment names from the stored header so the folded list stays small"""
+        key = f"sessions/{session_id}.json"
+        try:
+            header = self._read_session_object(key)
+            header[FOLDED_SEGMENTS_FIELD] = [
+                name for name in header.get(FOLDED_SEGMENTS_FIELD, []) if name not in deleted
+            ]
+            self._write_session_object(key, header)
+        except Exception as e:
+            # Harmless: names of deleted segments are never listed again
+            print(f"[S3] Could not prune folded segment names for {session_id}: {e}")
+
+    @staticmethod
+    def _segment_name(key: str) -> str:
+        return key.rsplit('/', 1)[-1][:-len('.json')]
+
+    def _list_transcript_segment_keys(self, session_id: str) -> list:
+        keys = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=f"{TRANSCRIPT_PREFIX}/{session_id}/"):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.json'))
+        return sorted(keys)
+
+    def _read_json(self, key: str) -> dict:
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        return json.loads(response['Body'].read().decode('utf-8'))
+
+    def _read_session_object(self, key: str):
+        """Read a session document or part with whichever codec wrote it"""
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        codec = codec_for_object(response.get('Metadata'), response.get('ContentEncoding'))
+        return codec.decode(response['Body'].read())
+
+    def _write_session_object(self, key: str, data) -> None:
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=self.session_codec.encode(data),
+            **self.session_codec.put_kwargs()
+        )
+
+    @staticmethod
+    def _part_key(session_id: str, field: str, version: Optional[str] = None) -> str:
+        """Key of a part version (unversioned parts were written by earlier versions)"""
+        if version is None:
+            return f"sessions/{session_id}/{field}.json"
+        return f"sessions/{session_id}/{field}.{version}.json"
+
+    @staticmethod
+    def _part_version(value) -> str:
+        """Content address of a part value"""
+        canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    def _write_session_parts(self, session_id: str, parts: dict) -> dict:
+        """Write parts under their content-addressed keys; returns {field: version}"""
+        versions = {field: self._part_version(value) for field, value in parts.items()}
+
+        def write(field: str):
+            self._write_session_object(self._part_key(session_id, field, versions[field]), parts[field])
+
+        if len(parts) <= 1:
+            for field in parts:
+                write(field)
+        else:
+            with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+                list(executor.map(write, parts))
+        return versions
+
+    def _delete_objects(self, keys: list) -> None:
+        """Best-effort delete of superseded part versions"""
+        if not keys:
+            return
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+            )
+            for error in (response or {}).get('Errors', []):
+                print(f"[S3] Could not delete superseded part {error.get('Key')}: {error.get('Code')}")
+        except Exception as e:
+            print(f"[S3] Could not delete superseded parts {keys}: {e}")
+
+    def _read_session_part(self, session_id: str, field: str, version: Optional[str] = None):
+        """
+        Read one part
+
+        Returns:
+            The part value, or MISSING_PART if the object does not exist
+        """
+        try:
+            return self._read_session_object(self._part_key(session_id, field, version))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return MISSING_PART
+            raise
+
+    def _load_session(self, key: str, fields: Optional[Iterable[str]], merge_transcript: bool) -> dict:
+        """
+        Read a session header and the requested parts
+
+        Documents written before parts existed hold every field inline; they
+        are read in full and projected, and are split on their next save.
+        """
+        projection = None
+        if fields is not None:
+            projection = set(fields) | {'session_id', PARTS_FIELD, PART_VERSIONS_FIELD}
+
+        for attempt in range(2):
+            session_data = self._read_session_object(key)
+            session_id = session_data.get('session_id')
+            versions = session_data.get(PART_VERSIONS_FIELD, {})
+            wanted = [
+                field for field in session_data.get(PARTS_FIELD, [])
+                if projection is None or field in projection
+            ]
+
+            def read(field: str):
+                return self._read_session_part(session_id, field, versions.get(field))
+
+            if len(wanted) == 1:
+                values = [read(wanted[0])]
+            elif wanted:
+                with ThreadPoolExecutor(max_workers=len(wanted)) as executor:
+                    values = list(executor.map(read, wanted))
+            else:
+                values = []
+
+            missing = [field for field, value in zip(wanted, values) if value is MISSING_PART]
+            if missing and attempt == 0 and any(field in versions for field in missing):
+                # A newer save replaced the header and deleted these versions; read the new header
+                continue
+            for field in missing:
+                print(f"[S3] Session {session_id} lists part {field} but it is missing")
+            for field, value in zip(wanted, values):
+                if value is not MISSING_PART:
+                    session_data[field] = value
+            break
+
+        if merge_transcript and (projection is None or 'transcript' in projection):
+            self._merge_transcript_segments(session_data)
+        if projection is not None:
+            session_data = {k: v for k, v in session_data.items() if k in projection}
+        return session_data
+
+    def _merge_transcript_segments(self, session_data: dict) -> None:
+        """Append segments not yet folded into session_data['transcript'] and record their names"""
+        session_id = session_data.get('session_id')
+        if not session_id:
+            return
+
+        folded = set(session_data.get(FOLDED_SEGMENTS_FIELD, []))
+        legacy_marker = session_data.get(COMPACTION_MARKER, "")
+        pending_keys = [
+            key for key in self._list_transcript_segment_keys(session_id)
+            if self._segment_name(key) not in folded and self._segment_name(key) > legacy_marker
+        ]
+        if not pending_keys:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(16, len(pending_keys))) as executor:
+            segments = list(executor.map(self._read_json, pending_keys))
+
+        transcript = session_data.setdefault('transcript', [])
+        for segment in segments:
+            # A segment holds either a single message or a flushed batch
+            if isinstance(segment, list):
+                transcript.extend(segment)
+            else:
+                transcript.append(segment)
+        session_data[FOLDED_SEGMENTS_FIELD] = sorted(folded | {self._segment_name(key) for key in pending_keys})
+
+        if len(pending_keys) >= COMPACT_AFTER_SEGMENTS:
+            print(f"[S3] {len(pending_keys)} uncompacted transcript segments for {session_id}; compact_transcript recommended")
+
     def save_audio_recording(self, session_id: str, audio_data: bytes) -> str:
         """Save audio recording to S3"""
         try:
@@ -98,20 +477,94 @@ class S3Service:
     def list_all_sessions(self) -> list:
         """List all sessions from S3"""
         try:
-            sessions = []
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix='sessions/'
-            )
-
-            for obj in response.get('Contents', []):
-                key = obj['Key']
-                if key.endswith('.json'):
-                    session_data = self.get_session(key.split('/')[-1].replace('.json', ''))
-                    if session_data:
-                        sessions.append(session_data)
-
-            return sessions
+            return list(self.iter_sessions(include_transcript=True))
         except Exception as e:
             print(f"Error listing sessions: {e}")
             return []
+
+    def iter_sessions(
+        self,
+        prefix: str = "",
+        modified_since: Optional[datetime] = None,
+        fields: Optional[Iterable[str]] = None,
+        include_transcript: bool = False,
+        max_workers: int = 16
+    ) -> Iterator[dict]:
+        """
+        Stream sessions from S3
+
+        Paginates the listing with continuation tokens and fetches documents
+        through a bounded thread pool, yielding each session as soon as it is
+        parsed (completion order, not key order).
+
+        Args:
+            prefix: Only sessions whose id starts with this prefix
+            modified_since: Skip objects last modified before this time (naive UTC).
+                Safe for created_at filters, since a session is never modified
+                before it is created.
+            fields: If given, only these top-level fields are kept, and only the
+                parts among them are fetched
+            include_transcript: Merge uncompacted transcript segments (one extra
+                LIST per session); analytics callers normally leave this off
+            max_workers: Concurrent GETs
+
+        Yields:
+            Parsed session dicts
+        """
+        if modified_since is not None and modified_since.tzinfo is None:
+            modified_since = modified_since.replace(tzinfo=timezone.utc)
+        fields = tuple(fields) if fields is not None else None
+
+        def load(key: str) -> Optional[dict]:
+            try:
+                return self._load_session(key, fields, merge_transcript=include_transcript)
+            except Exception as e:
+                print(f"Error retrieving session {key} from S3: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = set()
+            for key in self._iter_session_keys(prefix, modified_since):
+                in_flight.add(executor.submit(load, key))
+                if len(in_flight) >= max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future.result():
+                            yield future.result()
+            for future in as_completed(in_flight):
+                if future.result():
+                    yield future.result()
+
+    def _iter_session_keys(self, prefix: str = "", modified_since: Optional[datetime] = None) -> Iterator[str]:
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=f"sessions/{prefix}"):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                # Only top-level session documents
+                if not key.endswith('.json') or key.count('/') != 1:
+                    continue
+                if modified_since is not None and obj['LastModified'] < modified_since:
+                    continue
+                yield key
+
+    def split_legacy_sessions(self, max_workers: int = 16) -> int:
+        """
+        Rewrite sessions stored as one document into header + parts
+
+        Sessions already split are skipped, so this is safe to re-run.
+        Returns the number of sessions rewritten.
+        """
+        def split(key: str) -> bool:
+            try:
+                session_data = self._read_session_object(key)
+                if PARTS_FIELD in session_data or not any(field in session_data for field in SESSION_PARTS):
+                    return False
+                return self.save_session(session_data)
+            except Exception as e:
+                print(f"Error splitting session {key}: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            count = sum(1 for rewritten in executor.map(split, self._iter_session_keys()) if rewritten)
+        print(f"[S3] Split {count} legacy session documents into header and parts")
+        return count
@@ -0,0 +1,109 @@
+"""
+Session Codec
+Pluggable encodings for session documents stored in S3
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# S3 user metadata key recording which codec wrote an object
+CODEC_METADATA_KEY = "session-codec"
+
+
+class SessionCodec:
+    """Compact JSON (no whitespace); the base for the other codecs"""
+
+    name = "json"
+    content_type = "application/json"
+    content_encoding: Optional[str] = None
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return json.loads(body.decode("utf-8"))
+
+    def put_kwargs(self) -> Dict[str, Any]:
+        """Extra put_object arguments describing the encoding"""
+        kwargs = {"ContentType": self.content_type, "Metadata": {CODEC_METADATA_KEY: self.name}}
+        if self.content_encoding:
+            kwargs["ContentEncoding"] = self.content_encoding
+        return kwargs
+
+
+class GzipJsonCodec(SessionCodec):
+    name = "gzip"
+    content_encoding = "gzip"
+
+    def encode(self, data):
+        return gzip.compress(super().encode(data), compresslevel=6)
+
+    def decode(self, body):
+        return super().decode(gzip.decompress(body))
+
+
+class ZstdJsonCodec(SessionCodec):
+    name = "zstd"
+    content_encoding = "zstd"
+
+    def encode(self, data):
+        return zstandard.ZstdCompressor(level=3).compress(super().encode(data))
+
+    def decode(self, body):
+        return super().decode(zstandard.ZstdDecompressor().decompress(body))
+
+
+class MsgpackCodec(SessionCodec):
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def encode(self, data):
+        return msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, body):
+        return msgpack.unpackb(body, raw=False)
+
+
+CODECS: Dict[str, SessionCodec] = {"json": SessionCodec(), "gzip": GzipJsonCodec()}
+if zstandard is not None:
+    CODECS["zstd"] = ZstdJsonCodec()
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec()
+
+
+def get_codec(name: str) -> SessionCodec:
+    """
+    Codec used for writing
+
+    Falls back to compact JSON when the configured codec's package is not installed.
+    """
+    codec = CODECS.get(name)
+    if codec is None:
+        print(f"[S3] Session codec '{name}' unavailable, using json")
+        return CODECS["json"]
+    return codec
+
+
+def codec_for_object(metadata: Optional[Dict[str, str]], content_encoding: Optional[str] = None) -> SessionCodec:
+    """
+    Codec for reading an object, from its metadata
+
+    Objects written before codecs existed carry no metadata and are plain
+    (possibly indented) JSON, which the json codec reads as-is.
+    """
+    name = (metadata or {}).get(CODEC_METADATA_KEY) or content_encoding or "json"
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Session object encoded with '{name}', which is not installed")
+    return codec
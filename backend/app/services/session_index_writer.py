@@ -0,0 +1,140 @@
+"""
+Session Index Writer
+Candidate index and session manifest writes, with retries for the ones that fail
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import ANALYTICS_INDEX_RETRY_INTERVAL
+from app.services.analytics_rollup_service import get_rollup_service
+from app.services.candidate_index_service import CandidateIndexService
+from app.services.s3_service import S3Service
+from app.services.session_manifest_service import SessionManifestService
+
+
+class SessionIndexWriter:
+    """
+    Records sessions in the candidate index and the session manifest.
+
+    Both are conditional read-modify-writes that can fail, most often by
+    losing ETag races on a busy day's manifest partition. A failed write is
+    queued and retried by a background timer instead of silently dropping the
+    session from history or trends until a manual rebuild. The queue keeps
+    only the latest version of each session per index, and the indexes never
+    replace an entry with an older version, so retries can land in any order.
+    The queue is per process, like the rollup event queue.
+    """
+
+    def __init__(
+        self,
+        s3_service: Optional[S3Service] = None,
+        on_new_candidate: Optional[Callable[[], None]] = None,
+        retry_interval: float = ANALYTICS_INDEX_RETRY_INTERVAL
+    ):
+        s3_service = s3_service or S3Service()
+        self.writers: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+            "candidate_index": CandidateIndexService(s3_service, on_new_candidate=on_new_candidate).record_session,
+            "session_manifest": SessionManifestService(s3_service).record_session
+        }
+        self.retry_interval = retry_interval
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._retry_lock = threading.Lock()
+        self._timer: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        self.writes = 0
+        self.failures = 0
+        self.retried = 0
+
+    def record_session(self, session_data: Dict[str, Any]) -> bool:
+        """
+        Write a session's entries to every index, queueing the ones that fail
+
+        Returns:
+            True if every index was written
+        """
+        ok = True
+        for name in self.writers:
+            ok = self._write(name, session_data) and ok
+        return ok
+
+    def retry(self) -> bool:
+        """
+        Retry every queued write once
+
+        Returns:
+            True if nothing is left queued
+        """
+        with self._retry_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for (name, _), session_data in pending.items():
+                with self._lock:
+                    self.retried += 1
+                self._write(name, session_data, newer_first=True)
+            with self._lock:
+                return not self._pending
+
+    def stop(self):
+        """Stop the background timer and retry anything still queued"""
+        self._stopped.set()
+        self.retry()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending_writes": len(self._pending),
+                "writes": self.writes,
+                "failures": self.failures,
+                "retried": self.retried
+            }
+
+    def _write(self, name: str, session_data: Dict[str, Any], newer_first: bool = False) -> bool:
+        try:
+            written = self.writers[name](session_data)
+        except Exception as e:
+            print(f"[ANALYTICS] {name} write raised for session {session_data.get('session_id')}: {e}")
+            written = False
+
+        key = (name, session_data.get("session_id"))
+        with self._lock:
+            self.writes += 1
+            if written:
+                if self._pending.get(key) is session_data:
+                    del self._pending[key]
+                return True
+            self.failures += 1
+            if newer_first:
+                # A version queued while this retry ran is newer; keep it
+                self._pending.setdefault(key, session_data)
+            else:
+                self._pending[key] = session_data
+        print(f"[ANALYTICS] {name} write failed for session {session_data.get('session_id')}, queued for retry")
+        self._ensure_timer()
+        return False
+
+    def _ensure_timer(self):
+        if self._timer is not None or self.retry_interval <= 0:
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Thread(target=self._run_timer, name="analytics-index-retry", daemon=True)
+                self._timer.start()
+
+    def _run_timer(self):
+        while not self._stopped.wait(self.retry_interval):
+            self.retry()
+
+
+# Process-wide writer shared by the routers, so every failed write goes through one queue
+session_index_writer: Optional[SessionIndexWriter] = None
+
+
+def get_session_index_writer() -> SessionIndexWriter:
+    """Get the process-wide session index writer, creating it on first use"""
+    global session_index_writer
+    if session_index_writer is None:
+        session_index_writer = SessionIndexWriter(on_new_candidate=get_rollup_service().record_candidate_added)
+    return session_index_writer
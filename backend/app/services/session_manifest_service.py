@@ -0,0 +1,185 @@
+"""
+Session Manifest Service
+Date-partitioned manifest of lightweight session summaries for time-range queries
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.s3_service import S3Service
+
+MANIFEST_PREFIX = "manifests/sessions"
+
+
+def partition_day(created_at: Optional[str]) -> Optional[date]:
+    if not created_at:
+        return None
+    try:
+        return datetime.fromisoformat(created_at).date()
+    except ValueError:
+        return None
+
+
+def manifest_entry(session_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary fields kept in the manifest for one session"""
+    report = session_data.get("performance_report") or {}
+    return {
+        "created_at": session_data.get("created_at"),
+        # Version of the session this entry reflects; record_session keeps the newer one
+        "updated_at": session_data.get("ended_at") or session_data.get("updated_at") or session_data.get("created_at"),
+        "interview_type": session_data.get("interview_type"),
+        "candidate_name": session_data.get("candidate_name"),
+        "status": session_data.get("status", "active"),
+        "has_report": bool(report),
+        "score": report.get("overallScore"),
+        "recommendation": report.get("recommendation")
+    }
+
+
+class SessionManifestService:
+    """
+    One manifest object per creation day at manifests/sessions/YYYY/MM/DD.json,
+    mapping session ids to summary fields.
+
+    Queries over a date window read one object per day in the window, in
+    parallel, so their cost scales with the window rather than with the total
+    number of sessions ever created.
+    """
+
+    def __init__(self, s3_service: Optional[S3Service] = None, max_workers: int = 16):
+        self.s3_service = s3_service or S3Service()
+        self.max_workers = max_workers
+
+    @staticmethod
+    def partition_key(day: date) -> str:
+        return f"{MANIFEST_PREFIX}/{day:%Y/%m/%d}.json"
+
+    def record_session(self, session_data: Dict[str, Any]) -> bool:
+        """
+        Insert or replace a session's entry in its day partition
+
+        An entry for a newer version of the session is kept, so retried and
+        out-of-order writes never roll an entry back.
+
+        Returns:
+            True if the entry was written (or is already newer), False if the
+            write failed or the session has no id
+        """
+        day = partition_day(session_data.get("created_at"))
+        session_id = session_data.get("session_id")
+        if not session_id:
+            return False
+        if day is None:
+            return True  # undated sessions have no partition
+        entry = manifest_entry(session_data)
+
+        def update(partition):
+            current = partition["sessions"].get(session_id)
+            if current is not None and (current.get("updated_at") or "") > (entry.get("updated_at") or ""):
+                return False
+            partition["sessions"][session_id] = entry
+
+        return self.s3_service.update_json(
+            self.partition_key(day),
+            update,
+            default_factory=lambda: {"day": day.isoformat(), "sessions": {}},
+            max_attempts=8
+        )
+
+    def iter_range(self, start: date, end: date) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Entries of every session created between start and end (inclusive)
+
+        Yields:
+            (session_id, entry) pairs, partitions in day order
+        """
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        if not days:
+            return
+
+        def load(day: date) -> Dict[str, Any]:
+            partition, _ = self.s3_service.get_json(self.partition_key(day))
+            return (partition or {}).get("sessions", {})
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(days))) as executor:
+            for sessions in executor.map(load, days):
+                yield from sessions.items()
+
+    def daily_scores(
+        self,
+        since: datetime,
+        until: Optional[datetime] = None,
+        interview_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Daily average overall score for sessions created in [since, until]
+
+        Args:
+            since: Earliest created_at to include
+            until: Latest created_at to include (defaults to now)
+            interview_type: Optional interview type filter (case-insensitive)
+
+        Returns:
+            [{"date", "average_score", "num_interviews"}] in date order, only days with scores
+        """
+        until = until or datetime.utcnow()
+        daily: Dict[str, List[float]] = {}
+        for _, entry in self.iter_range(since.date(), until.date()):
+            score = entry.get("score")
+            created_at = entry.get("created_at")
+            if not score or not created_at:
+                continue
+            if interview_type is not None and (entry.get("interview_type") or "").lower() != interview_type.lower():
+                continue
+            created = datetime.fromisoformat(created_at)
+            if since <= created <= until:
+                daily.setdefault(created.date().isoformat(), []).append(score)
+
+        return [
+            {
+                "date": day,
+                "average_score": round(sum(scores) / len(scores), 2),
+                "num_interviews": len(scores)
+            }
+            for day, scores in sorted(daily.items())
+        ]
+
+    def migrate(self) -> int:
+        """
+        Backfill the manifest from existing sessions/{id}.json objects
+
+        Entries already in a partition are kept (they were written by the
+        application and are at least as fresh as this scan), so this is safe to
+        re-run while the application keeps writing. Returns the number of sessions scanned.
+        """
+        partitions: Dict[date, Dict[str, Any]] = {}
+        count = 0
+        for session_data in self.s3_service.iter_sessions(
+            fields=("created_at", "updated_at", "ended_at", "interview_type", "candidate_name", "status", "performance_report")
+        ):
+            day = partition_day(session_data.get("created_at"))
+            if day is None:
+                continue
+            partitions.setdefault(day, {})[session_data["session_id"]] = manifest_entry(session_data)
+            count += 1
+
+        def write(item):
+            day, entries = item
+
+            def merge(partition):
+                for session_id, entry in entries.items():
+                    partition["sessions"].setdefault(session_id, entry)
+
+            return self.s3_service.update_json(
+                self.partition_key(day),
+                merge,
+                default_factory=lambda: {"day": day.isoformat(), "sessions": {}},
+                max_attempts=8
+            )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            failed = sum(1 for ok in executor.map(write, partitions.items()) if not ok)
+
+        print(f"[MANIFEST] Migrated {count} sessions into {len(partitions)} day partitions ({failed} failed)")
+        return count
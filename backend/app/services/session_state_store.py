@@ -0,0 +1,349 @@
+"""
+Session State Store
+Bounded, pluggable storage for per-session Bedrock agent state
+"""
+
+import json
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from app.config import (
+    BEDROCK_STATE_BACKEND,
+    BEDROCK_STATE_MAX_SESSIONS,
+    BEDROCK_STATE_TTL,
+    REDIS_URL
+)
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Optimistic transaction attempts before an external update gives up
+UPDATE_MAX_ATTEMPTS = 5
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """Compact wire format for external backends: minified JSON, zlib-compressed"""
+    return zlib.compress(json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def decode_state(data: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class SessionStateStore:
+    """Interface for session state storage; states are plain JSON-compatible dicts"""
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def update(self, session_id: str, mutate: Callable[[Dict[str, Any]], None]) -> bool:
+        """
+        Read, modify and write back one session's state
+
+        This default is not atomic; stores shared by several writers override
+        it so concurrent updates of one session are never lost.
+
+        Returns:
+            False if the session has no state (or the update failed)
+        """
+        state = self.get(session_id)
+        if state is None:
+            return False
+        mutate(state)
+        self.put(session_id, state)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class LRUSessionStateStore(SessionStateStore):
+    """
+    In-process store bounded by session count, with idle expiry.
+
+    The least recently used session is evicted when the store is full, and a
+    session not read or written for `ttl` seconds is dropped on next access.
+    States survive reconnects to the same worker, not across workers.
+    """
+
+    def __init__(self, max_sessions: int = BEDROCK_STATE_MAX_SESSIONS, ttl: float = BEDROCK_STATE_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._states: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Live state for session_id, refreshing its recency and expiry (caller holds the lock)"""
+        now = time.monotonic()
+        entry = self._states.get(session_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        state, touched = entry
+        if self.ttl > 0 and now - touched > self.ttl:
+            del self._states[session_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._states[session_id] = (state, now)
+        self._states.move_to_end(session_id)
+        self.hits += 1
+        return state
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._touch(session_id)
+
+    def update(self, session_id: str, mutate: Callable[[Dict[str, Any]], None]) -> bool:
+        with self._lock:
+            state = self._touch(session_id)
+            if state is None:
+                return False
+            mutate(state)
+            return True
+
+    def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._states[session_id] = (state, time.monotonic())
+            self._states.move_to_end(session_id)
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = len(self._states)
+        return {
+            "backend": "memory",
+            "sessions": sessions,
+            "max_sessions": self.max_sessions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class KeyValueBackend:
+    """Minimal external key-value interface: bytes values with a per-key TTL"""
+
+    def get(self, key: str, ttl: float = 0) -> Optional[bytes]:
+        """Read a value; a positive ttl also resets the key's expiry (sliding expiration)"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def update(self, key: str, transform: Callable[[Optional[bytes]], Optional[bytes]], ttl: float) -> bool:
+        """
+        Atomically replace a value with transform(current value)
+
+        Returns:
+            False if transform returned None (nothing is written)
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalKeyValueBackend(KeyValueBackend):
+    """In-process stand-in for an external key-value service (development and tests)"""
+
+    def __init__(self):
+        self._items: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, ttl: float = 0) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and now >= expires_at:
+                del self._items[key]
+                return None
+            if ttl > 0:
+                self._items[key] = (value, now + ttl)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        expires_at = time.monotonic() + ttl if ttl > 0 else None
+        with self._lock:
+            self._items[key] = (value, expires_at)
+
+    def update(self, key: str, transform: Callable[[Optional[bytes]], Optional[bytes]], ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            current = item[0] if item is not None and (item[1] is None or now < item[1]) else None
+            value = transform(current)
+            if value is None:
+                return False
+            self._items[key] = (value, now + ttl if ttl > 0 else None)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class RedisKeyValueBackend(KeyValueBackend):
+    """Redis (or any Redis-protocol service, e.g. ElastiCache/Valkey) backend"""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str, ttl: float = 0) -> Optional[bytes]:
+        if ttl > 0:
+            return self.client.getex(key, ex=self._seconds(ttl))
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(key, value, ex=self._seconds(ttl) if ttl > 0 else None)
+
+    def update(self, key: str, transform: Callable[[Optional[bytes]], Optional[bytes]], ttl: float) -> bool:
+        """WATCH/MULTI transaction, retried when another writer changes the key first"""
+        with self.client.pipeline() as pipe:
+            for _ in range(UPDATE_MAX_ATTEMPTS):
+                try:
+                    pipe.watch(key)
+                    value = transform(pipe.get(key))
+                    if value is None:
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    pipe.set(key, value, ex=self._seconds(ttl) if ttl > 0 else None)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+        raise RuntimeError(f"{key} changed concurrently {UPDATE_MAX_ATTEMPTS} times")
+
+    @staticmethod
+    def _seconds(ttl: float) -> int:
+        """Redis expiries are whole seconds; never round a positive TTL down to 0 (an error)"""
+        return max(1, math.ceil(ttl))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+
+class ExternalSessionStateStore(SessionStateStore):
+    """
+    Store backed by an external key-value service, so state is shared by all
+    workers and survives reconnects and restarts. States are written in the
+    compact encode_state format and expire after `ttl` seconds idle: reads
+    refresh the expiry as well as writes. Updates are atomic in the backend,
+    so two workers updating one session never lose a turn.
+    """
+
+    def __init__(self, backend: KeyValueBackend, ttl: float = BEDROCK_STATE_TTL, prefix: str = "bedrock-state:"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self.backend.get(self.prefix + session_id, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"[STATE] Read failed for {session_id}: {e}")
+            return None
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode_state(data)
+
+    def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        try:
+            self.backend.set(self.prefix + session_id, encode_state(state), self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"[STATE] Write failed for {session_id}: {e}")
+
+    def update(self, session_id: str, mutate: Callable[[Dict[str, Any]], None]) -> bool:
+        def transform(data: Optional[bytes]) -> Optional[bytes]:
+            if data is None:
+                return None
+            state = decode_state(data)
+            mutate(state)
+            return encode_state(state)
+
+        try:
+            updated = self.backend.update(self.prefix + session_id, transform, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"[STATE] Update failed for {session_id}: {e}")
+            return False
+        if updated:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return updated
+
+    def delete(self, session_id: str) -> None:
+        try:
+            self.backend.delete(self.prefix + session_id)
+        except Exception as e:
+            self.errors += 1
+            print(f"[STATE] Delete failed for {session_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors
+        }
+
+
+# Process-wide store shared by every BedrockService instance
+session_state_store: Optional[SessionStateStore] = None
+
+
+def get_session_state_store() -> SessionStateStore:
+    """
+    Get the process-wide session state store, chosen by BEDROCK_STATE_BACKEND:
+    "memory" (LRU+TTL, default), "redis" (REDIS_URL) or "local" (in-process
+    stand-in for the external backend).
+    """
+    global session_state_store
+    if session_state_store is None:
+        if BEDROCK_STATE_BACKEND == "redis":
+            try:
+                session_state_store = ExternalSessionStateStore(RedisKeyValueBackend(REDIS_URL))
+            except Exception as e:
+                print(f"[STATE] Redis backend unavailable ({e}), using in-process store")
+        elif BEDROCK_STATE_BACKEND == "local":
+            session_state_store = ExternalSessionStateStore(LocalKeyValueBackend())
+        if session_state_store is None:
+            session_state_store = LRUSessionStateStore()
+    return session_state_store
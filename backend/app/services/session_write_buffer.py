@@ -0,0 +1,212 @@
+"""
+Session Write Buffer
+Write-behind layer in front of S3Service that coalesces small session updates
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import SESSION_FLUSH_INTERVAL
+from app.services.s3_service import S3Service
+
+
+class _PendingWrites:
+    """Dirty state for one session since its last flush"""
+
+    def __init__(self):
+        self.transcript: List[dict] = []
+        self.list_appends: Dict[str, List[dict]] = {}
+        self.since = time.monotonic()
+
+    def is_empty(self) -> bool:
+        return not self.transcript and not self.list_appends
+
+
+class SessionWriteBuffer:
+    """
+    Per-session dirty buffer for transcript messages and list-field appends.
+
+    Updates are held in memory and flushed together: all pending transcript
+    messages become one append-log segment, and all pending list appends become
+    one read-modify-write of the affected session parts. Flushes happen on a
+    background timer, at turn boundaries, on disconnect, and explicitly before
+    anything that needs durable state (end_interview).
+
+    Reads through get_session overlay pending writes, so callers see their own
+    updates before they reach S3. The buffer is per process: anything another
+    worker must see (e.g. end_interview) has to be flushed by the owning
+    worker first, which the WebSocket handler does at the end of every turn.
+    """
+
+    def __init__(self, s3_service: Optional[S3Service] = None, flush_interval: float = SESSION_FLUSH_INTERVAL):
+        self.s3_service = s3_service or S3Service()
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, _PendingWrites] = {}
+        self._lock = threading.Lock()
+        self._flush_locks: Dict[str, threading.Lock] = {}
+        self._timer: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        self.buffered_writes = 0
+        self.flushes = 0
+        self.s3_writes = 0
+        self.flush_failures = 0
+
+    def append_transcript(self, session_id: str, message: dict):
+        """Buffer a transcript message"""
+        with self._lock:
+            self._pending_for(session_id).transcript.append(message)
+            self.buffered_writes += 1
+        self._ensure_timer()
+
+    def append_to_list(self, session_id: str, field: str, item: dict):
+        """Buffer an append to a list field of the session document (e.g. code_submissions)"""
+        with self._lock:
+            self._pending_for(session_id).list_appends.setdefault(field, []).append(item)
+            self.buffered_writes += 1
+        self._ensure_timer()
+
+    def get_session(self, session_id: str, fields: Optional[Iterable[str]] = None) -> dict:
+        """Read the session from S3 (optionally only some fields) with any pending writes applied on top"""
+        fields = tuple(fields) if fields is not None else None
+        session_data = self.s3_service.get_session(session_id, fields=fields)
+        if not session_data:
+            return session_data
+
+        with self._lock:
+            pending = self._pending.get(session_id)
+            if pending:
+                if fields is None or 'transcript' in fields:
+                    session_data.setdefault('transcript', []).extend(pending.transcript)
+                for field, items in pending.list_appends.items():
+                    if fields is None or field in fields:
+                        session_data.setdefault(field, []).extend(items)
+        return session_data
+
+    def flush(self, session_id: str) -> bool:
+        """
+        Write all pending updates for a session to S3
+
+        Returns:
+            True if nothing was pending or everything was written
+        """
+        with self._flush_lock_for(session_id):
+            with self._lock:
+                pending = self._pending.pop(session_id, None)
+            if pending is None or pending.is_empty():
+                return True
+
+            transcript_written = False
+            try:
+                if pending.transcript:
+                    if not self.s3_service.append_transcript_messages(session_id, pending.transcript):
+                        raise RuntimeError("transcript append failed")
+                    transcript_written = True
+                    with self._lock:
+                        self.s3_writes += 1
+
+                if pending.list_appends:
+                    # Only the appended fields are read and rewritten, not the whole session
+                    session_data = self.s3_service.get_session(session_id, fields=pending.list_appends.keys())
+                    if not session_data:
+                        print(f"[SESSION BUFFER] Session {session_id} not found, dropping "
+                              f"{sum(len(items) for items in pending.list_appends.values())} buffered updates")
+                    else:
+                        updates = {
+                            field: session_data.get(field, []) + items
+                            for field, items in pending.list_appends.items()
+                        }
+                        if not self.s3_service.update_session(session_id, updates):
+                            raise RuntimeError("session save failed")
+                        with self._lock:
+                            self.s3_writes += 1
+
+                with self._lock:
+                    self.flushes += 1
+                return True
+            except Exception as e:
+                with self._lock:
+                    self.flush_failures += 1
+                print(f"[SESSION BUFFER] Flush failed for {session_id}, will retry: {e}")
+                self._requeue(session_id, pending, transcript_written)
+                return False
+
+    def flush_all(self) -> bool:
+        """Flush every dirty session; returns False if any flush failed"""
+        with self._lock:
+            session_ids = list(self._pending.keys())
+        results = [self.flush(session_id) for session_id in session_ids]
+        return all(results)
+
+    def stop(self):
+        """Stop the background timer and flush everything still pending"""
+        self._stopped.set()
+        self.flush_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            dirty_sessions = len(self._pending)
+            pending_updates = sum(
+                len(p.transcript) + sum(len(items) for items in p.list_appends.values())
+                for p in self._pending.values()
+            )
+        return {
+            "dirty_sessions": dirty_sessions,
+            "pending_updates": pending_updates,
+            "buffered_writes": self.buffered_writes,
+            "flushes": self.flushes,
+            "s3_writes": self.s3_writes,
+            "flush_failures": self.flush_failures
+        }
+
+    def _pending_for(self, session_id: str) -> _PendingWrites:
+        pending = self._pending.get(session_id)
+        if pending is None:
+            pending = self._pending[session_id] = _PendingWrites()
+        return pending
+
+    def _flush_lock_for(self, session_id: str) -> threading.Lock:
+        with self._lock:
+            return self._flush_locks.setdefault(session_id, threading.Lock())
+
+    def _requeue(self, session_id: str, pending: _PendingWrites, transcript_written: bool):
+        """Put a failed flush back in front of anything buffered since"""
+        with self._lock:
+            current = self._pending.get(session_id)
+            if not transcript_written:
+                pending.transcript.extend(current.transcript if current else [])
+            else:
+                pending.transcript = list(current.transcript) if current else []
+            if current:
+                for field, items in current.list_appends.items():
+                    pending.list_appends.setdefault(field, []).extend(items)
+            self._pending[session_id] = pending
+
+    def _ensure_timer(self):
+        if self._timer is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Thread(target=self._run_timer, name="session-write-buffer", daemon=True)
+                self._timer.start()
+
+    def _run_timer(self):
+        while not self._stopped.wait(self.flush_interval):
+            now = time.monotonic()
+            with self._lock:
+                due = [sid for sid, p in self._pending.items() if now - p.since >= self.flush_interval]
+            for session_id in due:
+                self.flush(session_id)
+
+
+# Process-wide buffer shared by the WebSocket handler and the REST routers
+session_write_buffer: Optional[SessionWriteBuffer] = None
+
+
+def get_session_write_buffer() -> SessionWriteBuffer:
+    """Get the process-wide session write buffer, creating it on first use"""
+    global session_write_buffer
+    if session_write_buffer is None:
+        session_write_buffer = SessionWriteBuffer()
+    return session_write_buffer
@@ -3,20 +3,14 @@ AWS Textract Service
 Advanced document parsing for PDF and DOCX files
 """
 
-import boto3
 import io
 import re
 from typing import Dict, Any, List, Optional
-from app.config import AWS_REGION, AWS_ACCESS_KEY, AWS_SECRET_ACCESS_KEY
+from app.services.aws_clients import AsyncServiceMixin, get_client
 
-class TextractService:
+class TextractService(AsyncServiceMixin):
     def __init__(self):
-        self.textract_client = boto3.client(
-            'textract',
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-        )
+        self.textract_client = get_client('textract')
 
     def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
         """
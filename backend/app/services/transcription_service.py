@@ -0,0 +1,669 @@
+"""
+Transcription Service - Whisper worker pool, cross-session batching, in-memory audio decoding
+and incremental speech-to-text
+Keeps Whisper inference off the event loop, batches utterances from concurrent
+interviews through the encoder, and decodes rolling windows of the candidate's
+audio while they are still speaking
+"""
+
+import io
+import time
+import wave
+import zlib
+import queue
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import torch
+from faster_whisper import WhisperModel, decode_audio
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.vad import VadOptions, collect_chunks, get_speech_timestamps
+from app.config import (
+    WHISPER_MODEL,
+    WHISPER_POOL_SIZE,
+    WHISPER_MAX_QUEUE,
+    WHISPER_REQUEST_TIMEOUT,
+    WHISPER_BATCH_MAX_SIZE,
+    WHISPER_BATCH_MAX_WAIT_MS
+)
+
+SAMPLE_RATE = 16000
+
+# Whisper's encoder always sees a 30 second window
+MAX_BATCH_SAMPLES = 30 * SAMPLE_RATE
+
+# Same decoding thresholds as WhisperModel.transcribe, so batched and single results agree
+VAD_MIN_SILENCE_MS = 500
+NO_SPEECH_THRESHOLD = 0.6
+LOG_PROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4
+
+# Shared pool and batch scheduler, created on first use
+whisper_pool = None
+batch_scheduler = None
+
+# Raw 16 kHz mono little-endian int16 frames sent by clients that capture PCM directly
+PCM_S16LE_FORMAT = "pcm_s16le"
+
+
+def decode_audio_bytes(audio_data: bytes, audio_format: Optional[str] = None) -> np.ndarray:
+    """
+    Decode an utterance to a float32 PCM buffer at 16 kHz without touching disk.
+
+    Args:
+        audio_data: Raw PCM frames, WAV bytes or a WebM/Opus container
+        audio_format: "pcm_s16le" for raw frames; container formats are auto-detected
+
+    Returns:
+        Mono float32 samples in [-1, 1] ready for WhisperModel.transcribe
+    """
+    if audio_format == PCM_S16LE_FORMAT:
+        # Drop a trailing odd byte if a frame was split mid-sample
+        usable = len(audio_data) - (len(audio_data) % 2)
+        return np.frombuffer(audio_data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+
+    if audio_data[:4] == b'RIFF':
+        # Fast path for 16 kHz mono 16-bit WAV: just strip the header
+        try:
+            with wave.open(io.BytesIO(audio_data), 'rb') as wav:
+                if (wav.getframerate() == SAMPLE_RATE and wav.getnchannels() == 1
+                        and wav.getsampwidth() == 2):
+                    frames = wav.readframes(wav.getnframes())
+                    return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+        except wave.Error:
+            pass
+
+    # WebM/Opus and other containers: demux and resample in memory via PyAV
+    return decode_audio(io.BytesIO(audio_data), sampling_rate=SAMPLE_RATE)
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription of a single utterance.
+
+    Audio arrives as MediaRecorder chunks; the concatenation of all chunks
+    received so far is always a valid container, so each pass decodes the
+    full buffer but only runs Whisper on the uncommitted tail. Segments that
+    end well before the tail boundary are committed and never re-decoded,
+    which keeps the work done after speech_end bounded to the last few
+    seconds of speech regardless of how long the answer was.
+    """
+
+    def __init__(
+        self,
+        whisper_model,
+        audio_format: Optional[str] = None,
+        commit_margin: float = 1.5,
+        min_tail_seconds: float = 1.0
+    ):
+        """
+        Args:
+            whisper_model: WhisperPool (or anything with a WhisperModel-style transcribe)
+            audio_format: "pcm_s16le" for raw frames, None for containers
+            commit_margin: Seconds before the end of the tail that a segment
+                must finish by to be considered stable
+            min_tail_seconds: Skip interim passes on tails shorter than this
+        """
+        self.whisper_model = whisper_model
+        self.audio_format = audio_format
+        self.commit_margin = commit_margin
+        self.min_tail_samples = int(min_tail_seconds * SAMPLE_RATE)
+
+        self.committed_segments: List[str] = []
+        self.committed_samples = 0
+        self.tentative_text = ""
+        self.total_samples = 0
+        self.passes = 0
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(self.committed_segments).strip()
+
+    @property
+    def text(self) -> str:
+        """Committed text followed by the current tentative tail"""
+        return " ".join(t for t in (self.committed_text, self.tentative_text) if t).strip()
+
+    def _decode(self, audio_data: bytes) -> np.ndarray:
+        return decode_audio_bytes(audio_data, self.audio_format)
+
+    def _transcribe_tail(self, audio: np.ndarray) -> list:
+        tail = audio[self.committed_samples:]
+        segments, _ = self.whisper_model.transcribe(
+            tail,
+            beam_size=1,
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=500),
+            initial_prompt=self.committed_text[-200:] or None,
+            condition_on_previous_text=False
+        )
+        return list(segments)
+
+    def update(self, audio_data: bytes) -> Optional[str]:
+        """
+        Run one interim pass over everything received so far.
+
+        Args:
+            audio_data: All audio bytes received for this utterance
+
+        Returns:
+            Current best transcript, or None if there was not enough new audio
+        """
+        try:
+            audio = self._decode(audio_data)
+        except Exception as e:
+            # A chunk boundary can cut through a frame; the next pass will catch up
+            print(f"[STREAMING-STT] Decode skipped: {e}")
+            return None
+
+        tail_samples = len(audio) - self.committed_samples
+        if tail_samples < self.min_tail_samples:
+            return None
+
+        start_time = time.time()
+        segments = self._transcribe_tail(audio)
+        self.passes += 1
+
+        stable_until = tail_samples / SAMPLE_RATE - self.commit_margin
+        committed_end = 0.0
+        pending = []
+        for segment in segments:
+            if not pending and segment.end <= stable_until:
+                self.committed_segments.append(segment.text.strip())
+                committed_end = segment.end
+            else:
+                pending.append(segment.text.strip())
+
+        self.committed_samples += int(committed_end * SAMPLE_RATE)
+        self.tentative_text = " ".join(pending).strip()
+
+        elapsed = time.time() - start_time
+        print(f"[STREAMING-STT] Pass {self.passes}: {tail_samples / SAMPLE_RATE:.1f}s tail in {elapsed:.2f}s, "
+              f"committed {self.committed_samples / SAMPLE_RATE:.1f}s")
+        return self.text
+
+    def finalize(self, audio_data: bytes) -> str:
+        """
+        Transcribe the remaining tail and return the full utterance text.
+
+        Args:
+            audio_data: All audio bytes received for this utterance
+
+        Returns:
+            Final transcript
+        """
+        start_time = time.time()
+        audio = self._decode(audio_data)
+        segments = self._transcribe_tail(audio)
+        text = self.commit_final(" ".join(segment.text.strip() for segment in segments), len(audio))
+
+        elapsed = time.time() - start_time
+        print(f"[STREAMING-STT] Final pass took {elapsed:.2f}s after {self.passes} interim passes")
+        return text
+
+    def final_tail(self, audio_data: bytes) -> np.ndarray:
+        """
+        Decode the utterance and return only the uncommitted tail, so the final
+        pass can be transcribed elsewhere (e.g. by the batch scheduler).
+
+        Args:
+            audio_data: All audio bytes received for this utterance
+
+        Returns:
+            Float32 samples not yet covered by committed segments
+        """
+        audio = self._decode(audio_data)
+        self.total_samples = len(audio)
+        return audio[self.committed_samples:]
+
+    def commit_final(self, tail_text: str, total_samples: Optional[int] = None) -> str:
+        """
+        Commit the transcript of the final tail.
+
+        Args:
+            tail_text: Transcript of the uncommitted tail
+            total_samples: Length of the full utterance in samples
+
+        Returns:
+            Final transcript of the whole utterance
+        """
+        if tail_text.strip():
+            self.committed_segments.append(tail_text.strip())
+        self.committed_samples = total_samples if total_samples is not None else self.total_samples
+        self.tentative_text = ""
+        return self.committed_text
+
+
+def speech_only(audio: np.ndarray) -> np.ndarray:
+    """Keep only the voiced parts of an utterance, using the same Silero VAD settings as vad_filter=True"""
+    speech_chunks = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS))
+    if not speech_chunks:
+        return np.zeros(0, dtype=np.float32)
+    collected = collect_chunks(audio, speech_chunks)
+    if isinstance(collected, tuple):
+        collected = collected[0]  # faster-whisper >= 1.1 returns (chunks, metadata)
+    if isinstance(collected, list):
+        collected = np.concatenate(collected) if collected else np.zeros(0, dtype=np.float32)
+    return collected
+
+
+def compression_ratio(text: str) -> float:
+    """gzip-style compression ratio Whisper uses to detect repetition loops"""
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
+
+
+class WhisperPool:
+    """
+    Bounded pool of WhisperModel instances served by dedicated worker threads.
+
+    CTranslate2 releases the GIL during inference, so each worker thread runs
+    one model concurrently with the event loop. Requests beyond the queue limit
+    are rejected, and requests still queued when their deadline passes are
+    dropped rather than run late.
+    """
+
+    def __init__(
+        self,
+        model_factory: Callable[[], WhisperModel],
+        size: int = 2,
+        max_queue: int = 32,
+        default_timeout: float = 30.0
+    ):
+        """
+        Args:
+            model_factory: Callable that loads one WhisperModel instance
+            size: Number of model instances / worker threads
+            max_queue: Maximum requests waiting for a worker
+            default_timeout: Seconds a request may wait before it is dropped
+        """
+        self.size = size
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+
+        self._models: "queue.Queue[WhisperModel]" = queue.Queue()
+        for _ in range(size):
+            self._models.put(model_factory())
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="whisper")
+
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.failed = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def transcribe(self, audio, **kwargs):
+        """
+        WhisperModel-compatible transcribe for use on a pool worker thread.
+
+        Checks out an idle model and materializes the segment generator so no
+        lazy decoding leaks back to the caller's thread.
+
+        Returns:
+            Tuple of (list of segments, transcription info)
+        """
+        model = self._models.get()
+        try:
+            segments, info = model.transcribe(audio, **kwargs)
+            return list(segments), info
+        finally:
+            self._models.put(model)
+
+    def transcribe_batch(self, audios: List[np.ndarray], beam_size: int = 1) -> List[str]:
+        """
+        Transcribe several short utterances with a single encoder pass.
+
+        Each utterance must fit in one 30 second window. Utterances go through
+        the same VAD and the same no-speech, log-probability and compression
+        thresholds as WhisperModel.transcribe: silence returns "", and results
+        that would trigger transcribe's temperature fallback are transcribed
+        again on their own. Language is detected per utterance.
+
+        Args:
+            audios: Float32 16 kHz buffers, one per utterance
+            beam_size: Decoder beam size
+
+        Returns:
+            Transcripts in the same order as audios
+        """
+        model = self._models.get()
+        try:
+            texts = [""] * len(audios)
+            voiced = [(index, speech_only(audio)) for index, audio in enumerate(audios)]
+            voiced = [(index, audio) for index, audio in voiced if audio.size]
+            if not voiced:
+                return texts
+
+            features = np.stack([
+                pad_or_trim(model.feature_extractor(audio)[..., :-1]) for _, audio in voiced
+            ])
+            encoder_output = model.encode(features)
+
+            multilingual = model.model.is_multilingual
+            tokenizer = Tokenizer(
+                model.hf_tokenizer,
+                multilingual,
+                task="transcribe",
+                language="en" if multilingual else None
+            )
+            prompt = model.get_prompt(tokenizer, previous_tokens=[], without_timestamps=True)
+            prompts = [list(prompt) for _ in voiced]
+
+            if multilingual:
+                language_index = prompt.index(tokenizer.language)
+                for i, langs in enumerate(model.model.detect_language(encoder_output)):
+                    prompts[i][language_index] = tokenizer.tokenizer.token_to_id(langs[0][0])
+
+            results = model.model.generate(
+                encoder_output,
+                prompts,
+                beam_size=beam_size,
+                max_length=model.max_length,
+                suppress_blank=True,
+                suppress_tokens=[-1],
+                return_scores=True,
+                return_no_speech_prob=True
+            )
+
+            for (index, _), result in zip(voiced, results):
+                tokens = result.sequences_ids[0]
+                # Length-normalized score back to transcribe's avg_logprob (length_penalty=1)
+                avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+                if result.no_speech_prob > NO_SPEECH_THRESHOLD and avg_logprob < LOG_PROB_THRESHOLD:
+                    continue
+                text = tokenizer.decode(tokens).strip()
+                if avg_logprob < LOG_PROB_THRESHOLD or compression_ratio(text) > COMPRESSION_RATIO_THRESHOLD:
+                    segments, _ = model.transcribe(
+                        audios[index],
+                        beam_size=beam_size,
+                        vad_filter=True,
+                        vad_parameters=dict(min_silence_duration_ms=VAD_MIN_SILENCE_MS)
+                    )
+                    text = " ".join(segment.text for segment in segments).strip()
+                texts[index] = text
+            return texts
+        finally:
+            self._models.put(model)
+
+    def _run(self, fn: Callable, args: tuple, enqueued_at: float, deadline: float):
+        started_at = time.monotonic()
+        with self._lock:
+            self.queue_depth -= 1
+            if started_at > deadline:
+                self.expired += 1
+                raise TimeoutError(f"STT request expired after {started_at - enqueued_at:.2f}s in queue")
+            self.in_flight += 1
+            self._total_wait += started_at - enqueued_at
+
+        try:
+            result = fn(*args)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self._total_run += time.monotonic() - started_at
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    async def submit(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run fn(*args) on a Whisper worker thread without blocking the event loop.
+
+        Args:
+            fn: Blocking callable that uses this pool's transcribe()
+            timeout: Seconds the request may wait in the queue before it is dropped
+
+        Returns:
+            The callable's return value
+        """
+        with self._lock:
+            if self.queue_depth >= self.max_queue:
+                self.rejected += 1
+                raise RuntimeError(f"STT queue full ({self.queue_depth} waiting)")
+            self.queue_depth += 1
+
+        enqueued_at = time.monotonic()
+        deadline = enqueued_at + (timeout if timeout is not None else self.default_timeout)
+        future = self._executor.submit(self._run, fn, args, enqueued_at, deadline)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue-depth and latency metrics for monitoring"""
+        with self._lock:
+            started = self.completed + self.failed
+            return {
+                "pool_size": self.size,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "avg_queue_wait_ms": round(self._total_wait / max(started + self.in_flight, 1) * 1000, 1),
+                "avg_run_ms": round(self._total_run / max(started, 1) * 1000, 1)
+            }
+
+
+class WhisperBatchScheduler:
+    """
+    Micro-batching front end for the Whisper pool.
+
+    Utterances submitted by different sessions within max_wait_ms of each
+    other are run through the encoder together, up to max_batch_size at a
+    time. Utterances longer than one encoder window are transcribed on their
+    own. Results for the same session are always returned in submission order.
+    """
+
+    def __init__(self, pool: WhisperPool, max_batch_size: int = 8, max_wait_ms: float = 30):
+        """
+        Args:
+            pool: Whisper pool that runs the batches
+            max_batch_size: Maximum utterances per encoder pass
+            max_wait_ms: How long the first utterance waits for others to join
+        """
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._last_request: Dict[str, asyncio.Future] = {}
+        self._tasks: set = set()
+        self.batches = 0
+        self.batched_utterances = 0
+
+    async def transcribe(self, audio: np.ndarray, session_key: str) -> str:
+        """
+        Queue one utterance for batched transcription.
+
+        Args:
+            audio: Float32 16 kHz buffer
+            session_key: Results for the same key are returned in order
+
+        Returns:
+            Transcript text
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect_batches())
+
+        previous = self._last_request.get(session_key)
+        done = loop.create_future()
+        self._last_request[session_key] = done
+
+        try:
+            result = loop.create_future()
+            await self._queue.put((audio, result))
+            text = await result
+            if previous is not None:
+                await previous
+            return text
+        finally:
+            done.set_result(None)
+            if self._last_request.get(session_key) is done:
+                del self._last_request[session_key]
+
+    async def _collect_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without waiting so the next batch can start collecting
+            self._spawn(self._dispatch(batch))
+
+    async def _dispatch(self, batch: list):
+        short = [(audio, result) for audio, result in batch if len(audio) <= MAX_BATCH_SAMPLES]
+        long = [(audio, result) for audio, result in batch if len(audio) > MAX_BATCH_SAMPLES]
+
+        for audio, result in long:
+            self._spawn(self._transcribe_single(audio, result))
+
+        if not short:
+            return
+
+        self.batches += 1
+        self.batched_utterances += len(short)
+        print(f"[WHISPER-BATCH] Running batch of {len(short)} utterance(s)")
+
+        try:
+            texts = await self.pool.submit(self.pool.transcribe_batch, [audio for audio, _ in short])
+        except Exception as e:
+            for _, result in short:
+                if not result.done():
+                    result.set_exception(e)
+            return
+
+        for (_, result), text in zip(short, texts):
+            if not result.done():
+                result.set_result(text)
+
+    async def _transcribe_single(self, audio: np.ndarray, result: asyncio.Future):
+        def run():
+            segments, _ = self.pool.transcribe(
+                audio,
+                beam_size=1,
+                vad_filter=True,
+                vad_parameters=dict(min_silence_duration_ms=VAD_MIN_SILENCE_MS)
+            )
+            return " ".join(segment.text for segment in segments).strip()
+
+        try:
+            text = await self.pool.submit(run)
+        except Exception as e:
+            if not result.done():
+                result.set_exception(e)
+            return
+        if not result.done():
+            result.set_result(text)
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        """Start a background task and hold a reference until it finishes, so it is not garbage-collected"""
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def stats(self) -> Dict[str, Any]:
+        """Batching efficiency metrics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_utterances / max(self.batches, 1), 2)
+        }
+
+
+def _load_whisper_model() -> WhisperModel:
+    """
+    Initialize one Whisper model with GPU support if available.
+    Supports: NVIDIA CUDA, Apple Silicon (MPS), CPU fallback.
+    """
+    # Auto-detect best available device
+    if torch.cuda.is_available():
+        device = "cuda"
+        compute_type = "float16"
+        acceleration_info = "NVIDIA CUDA GPU"
+    elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+        # Apple Silicon (M1/M2/M3/M4) - Use CPU with optimized compute type
+        # Note: faster-whisper doesn't support MPS directly, but runs efficiently on Apple Silicon CPU
+        device = "cpu"
+        compute_type = "int8"
+        acceleration_info = "Apple Silicon (optimized)"
+    else:
+        device = "cpu"
+        compute_type = "int8"
+        acceleration_info = "CPU only"
+
+    print(f"[WHISPER] Initializing on {device.upper()} with {compute_type}")
+    print(f"[WHISPER] Hardware: {acceleration_info}")
+
+    return WhisperModel(
+        WHISPER_MODEL,  # "small" for balance, or "tiny" for even faster processing
+        device=device,
+        compute_type=compute_type,
+        num_workers=1  # Concurrency comes from the pool, one request per instance
+    )
+
+
+def get_whisper_model() -> WhisperPool:
+    """
+    Get the shared Whisper worker pool, loading the models on first use.
+
+    Returns:
+        WhisperPool serving all WebSocket connections in this process
+    """
+    global whisper_pool
+    if whisper_pool is None:
+        whisper_pool = WhisperPool(
+            _load_whisper_model,
+            size=WHISPER_POOL_SIZE,
+            max_queue=WHISPER_MAX_QUEUE,
+            default_timeout=WHISPER_REQUEST_TIMEOUT
+        )
+        print(f"[WHISPER] Pool ready: {WHISPER_POOL_SIZE} model(s), queue limit {WHISPER_MAX_QUEUE}")
+
+    return whisper_pool
+
+
+def get_batch_scheduler() -> Optional[WhisperBatchScheduler]:
+    """
+    Get the shared cross-session batch scheduler.
+
+    Returns:
+        WhisperBatchScheduler, or None when WHISPER_BATCH_MAX_SIZE disables batching
+    """
+    global batch_scheduler
+    if WHISPER_BATCH_MAX_SIZE <= 1:
+        return None
+    if batch_scheduler is None:
+        batch_scheduler = WhisperBatchScheduler(
+            get_whisper_model(),
+            max_batch_size=WHISPER_BATCH_MAX_SIZE,
+            max_wait_ms=WHISPER_BATCH_MAX_WAIT_MS
+        )
+    return batch_scheduler
@@ -0,0 +1,444 @@
+"""
+TTS Service - Edge TTS synthesis, content-addressed audio cache and sentence-level pipelining
+Lets several sentences synthesize concurrently while audio is still delivered in order,
+either as whole-sentence buffers or as framed chunks forwarded as they arrive.
+Repeated interviewer phrases are served from cache instead of calling Edge TTS.
+"""
+
+import io
+import os
+import re
+import time
+import struct
+import asyncio
+import hashlib
+import threading
+import traceback
+import unicodedata
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import edge_tts
+from app.config import (
+    S3_BUCKET_USER_DATA,
+    TTS_CACHE_MAX_MB,
+    TTS_CACHE_DIR,
+    TTS_CACHE_DISK_MAX_MB,
+    TTS_CACHE_S3_ENABLED
+)
+from app.services.aws_clients import get_client, run_blocking
+
+# Edge TTS voice - Indian English female (fast and natural)
+EDGE_TTS_VOICE = "en-IN-NeerjaExpressiveNeural"
+
+# Chunked audio frame: magic, reply id, sentence id, sequence, flags, then MP3 bytes.
+# A zero-length frame with FRAME_FLAG_END_OF_SENTENCE closes each sentence.
+AUDIO_FRAME_MAGIC = b"TT"
+AUDIO_FRAME_HEADER = struct.Struct(">2sHHHB")
+FRAME_FLAG_END_OF_SENTENCE = 0x01
+
+# Shared audio cache, created on first use
+tts_cache = None
+
+# Background cache stores, referenced until they finish
+_pending_cache_puts: set = set()
+
+
+def frame_audio_chunk(reply_id: int, sentence_id: int, sequence: int, data: bytes, end_of_sentence: bool = False) -> bytes:
+    """
+    Wrap one TTS audio chunk in a binary frame header.
+
+    Args:
+        reply_id: Assistant reply this chunk belongs to (wraps at 65536)
+        sentence_id: Sentence index within the reply
+        sequence: Chunk index within the sentence
+        data: Raw MP3 bytes from Edge TTS
+        end_of_sentence: Marks the closing frame of a sentence
+
+    Returns:
+        Header followed by data
+    """
+    flags = FRAME_FLAG_END_OF_SENTENCE if end_of_sentence else 0
+    header = AUDIO_FRAME_HEADER.pack(AUDIO_FRAME_MAGIC, reply_id & 0xFFFF, sentence_id & 0xFFFF, sequence & 0xFFFF, flags)
+    return header + data
+
+
+async def stream_text_to_speech(text: str, voice: str = EDGE_TTS_VOICE) -> AsyncIterator[bytes]:
+    """
+    Yield Edge TTS audio chunks as soon as the service produces them.
+    """
+    start_time = time.time()
+    first_chunk_time = None
+
+    # Create Edge TTS communication
+    communicate = edge_tts.Communicate(text, voice)
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            if first_chunk_time is None:
+                first_chunk_time = time.time() - start_time
+            yield chunk["data"]
+
+    elapsed = time.time() - start_time
+    print(f"[EDGE-TTS] Generated {len(text)} chars in {elapsed:.2f}s (~{len(text)/elapsed:.0f} chars/s), "
+          f"first chunk {first_chunk_time or 0:.2f}s")
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized audio keyed by (voice, normalized text).
+
+    Tiers, checked in order:
+    - In-memory LRU bounded by total bytes
+    - Optional local directory bounded by total bytes (oldest files evicted first)
+    - Optional S3 prefix shared across instances (expire with a bucket lifecycle rule)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+        s3_client=None,
+        s3_bucket: Optional[str] = None,
+        s3_prefix: str = "tts-cache/"
+    ):
+        """
+        Args:
+            max_bytes: Memory tier capacity
+            disk_dir: Directory for the disk tier, or None to disable it
+            disk_max_bytes: Disk tier capacity
+            s3_client: boto3 S3 client for the shared tier, or None to disable it
+            s3_bucket: Bucket for the shared tier
+            s3_prefix: Key prefix for cached audio objects
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.s3_client = s3_client
+        self.s3_bucket = s3_bucket
+        self.s3_prefix = s3_prefix
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "s3_hits": 0, "misses": 0, "evictions": 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(
+                entry.stat().st_size for entry in os.scandir(self.disk_dir) if entry.is_file()
+            )
+
+    @property
+    def has_slow_tiers(self) -> bool:
+        """Whether lookups and stores touch disk or S3"""
+        return bool(self.disk_dir) or self.s3_client is not None
+
+    @staticmethod
+    def make_key(voice: str, text: str) -> str:
+        """Hash of the voice and text with whitespace and Unicode form normalized"""
+        normalized = re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+        return hashlib.sha256(f"{voice}\n{normalized}".encode('utf-8')).hexdigest()
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        """Memory-tier lookup, safe to call on the event loop"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+            return audio
+
+    def get_slow(self, key: str) -> Optional[bytes]:
+        """Disk and S3 tier lookup (blocking); promotes hits into memory"""
+        audio = None
+        if self.disk_dir:
+            path = os.path.join(self.disk_dir, f"{key}.mp3")
+            try:
+                with open(path, 'rb') as f:
+                    audio = f.read()
+                os.utime(path)
+                with self._lock:
+                    self.counters["disk_hits"] += 1
+            except FileNotFoundError:
+                pass
+
+        if audio is None and self.s3_client:
+            try:
+                response = self.s3_client.get_object(Bucket=self.s3_bucket, Key=f"{self.s3_prefix}{key}.mp3")
+                audio = response['Body'].read()
+                with self._lock:
+                    self.counters["s3_hits"] += 1
+                self._put_disk(key, audio)
+            except self.s3_client.exceptions.NoSuchKey:
+                pass
+            except Exception as e:
+                print(f"[TTS-CACHE] S3 read error: {e}")
+
+        if audio is None:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+
+        self._put_memory(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store audio in every enabled tier (blocking for disk and S3)"""
+        self._put_memory(key, audio)
+        self._put_disk(key, audio)
+        if self.s3_client:
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.s3_bucket,
+                    Key=f"{self.s3_prefix}{key}.mp3",
+                    Body=audio,
+                    ContentType='audio/mpeg'
+                )
+            except Exception as e:
+                print(f"[TTS-CACHE] S3 write error: {e}")
+
+    def _put_memory(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.counters["evictions"] += 1
+
+    def _put_disk(self, key: str, audio: bytes) -> None:
+        if not self.disk_dir or len(audio) > self.disk_max_bytes:
+            return
+        path = os.path.join(self.disk_dir, f"{key}.mp3")
+        if os.path.exists(path):
+            return
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(audio)
+
+        # Concurrent writers of the same key both get here; account for whatever file the replace displaced
+        with self._disk_lock:
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(temp_path, path)
+        with self._lock:
+            self._disk_bytes += len(audio) - replaced
+            if self._disk_bytes <= self.disk_max_bytes:
+                return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = sorted(
+            (entry for entry in os.scandir(self.disk_dir) if entry.is_file() and entry.name.endswith('.mp3')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["s3_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "s3_enabled": self.s3_client is not None
+            }
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """
+    Get the shared TTS audio cache.
+
+    Returns:
+        TTSCache, or None when TTS_CACHE_MAX_MB is 0
+    """
+    global tts_cache
+    if TTS_CACHE_MAX_MB <= 0:
+        return None
+    if tts_cache is None:
+        s3_client = None
+        if TTS_CACHE_S3_ENABLED:
+            s3_client = get_client('s3')
+        tts_cache = TTSCache(
+            max_bytes=TTS_CACHE_MAX_MB * 1024 * 1024,
+            disk_dir=TTS_CACHE_DIR or None,
+            disk_max_bytes=TTS_CACHE_DISK_MAX_MB * 1024 * 1024,
+            s3_client=s3_client,
+            s3_bucket=S3_BUCKET_USER_DATA
+        )
+    return tts_cache
+
+
+async def cached_stream_text_to_speech(text: str, voice: str = EDGE_TTS_VOICE) -> AsyncIterator[bytes]:
+    """
+    Serve audio from the TTS cache, falling back to Edge TTS and caching the result.
+    """
+    cache = get_tts_cache()
+    if cache is None:
+        async for data in stream_text_to_speech(text, voice):
+            yield data
+        return
+
+    key = TTSCache.make_key(voice, text)
+    audio = cache.get_memory(key)
+    if audio is None:
+        audio = await run_blocking(cache.get_slow, key) if cache.has_slow_tiers else cache.get_slow(key)
+
+    if audio is not None:
+        yield audio
+        return
+
+    audio_buffer = io.BytesIO()
+    async for data in stream_text_to_speech(text, voice):
+        audio_buffer.write(data)
+        yield data
+
+    # Only cache complete syntheses (an interrupted stream never gets here)
+    if audio_buffer.tell():
+        if cache.has_slow_tiers:
+            task = asyncio.create_task(run_blocking(cache.put, key, audio_buffer.getvalue()))
+            _pending_cache_puts.add(task)
+            task.add_done_callback(_cache_put_done)
+        else:
+            cache.put(key, audio_buffer.getvalue())
+
+
+def _cache_put_done(task: asyncio.Task):
+    _pending_cache_puts.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[TTS-CACHE] Background store failed: {task.exception()}")
+
+
+class TTSPipeline:
+    """
+    Ordered, concurrent sentence synthesis for one assistant reply.
+
+    Each sentence starts synthesizing as soon as it is added, with at most
+    max_in_flight syntheses running at once. A single sender task drains the
+    sentences in the order they were added, so audio always reaches the
+    client in sentence order while LLM reading, synthesis and sending overlap.
+
+    By default each sentence is sent as one binary message once it is fully
+    synthesized. With stream_chunks, the current sentence's chunks are
+    forwarded as framed messages as they arrive (see frame_audio_chunk), and
+    later sentences buffer until it is done.
+    """
+
+    def __init__(
+        self,
+        send_audio: Callable[[bytes], Awaitable[None]],
+        synthesize_stream: Callable[[str], AsyncIterator[bytes]] = cached_stream_text_to_speech,
+        max_in_flight: int = 3,
+        stream_chunks: bool = False,
+        reply_id: int = 0
+    ):
+        """
+        Args:
+            send_audio: Coroutine that delivers one binary message to the client
+            synthesize_stream: Async generator that turns text into audio chunks
+            max_in_flight: Maximum concurrent syntheses
+            stream_chunks: Forward framed chunks instead of whole sentences
+            reply_id: Reply id stamped on chunk frames
+        """
+        self.send_audio = send_audio
+        self.synthesize_stream = synthesize_stream
+        self.stream_chunks = stream_chunks
+        self.reply_id = reply_id
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._tasks = []
+        self._sender = asyncio.create_task(self._send_in_order())
+        self.sentences = 0
+        self.first_audio_time: Optional[float] = None
+        self._start_time = time.time()
+
+    def add(self, text: str) -> None:
+        """Start synthesizing one sentence"""
+        sentence_id = self.sentences
+        self.sentences += 1
+        chunks: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self._synthesize(text, chunks))
+        self._tasks.append(task)
+        self._pending.put_nowait((sentence_id, chunks))
+
+    async def _synthesize(self, text: str, chunks: asyncio.Queue) -> None:
+        try:
+            async with self._semaphore:
+                async for data in self.synthesize_stream(text):
+                    chunks.put_nowait(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[EDGE-TTS] Error: {e}")
+            traceback.print_exc()
+        finally:
+            chunks.put_nowait(None)
+
+    def _mark_first_audio(self):
+        if self.first_audio_time is None:
+            self.first_audio_time = time.time() - self._start_time
+
+    async def _send_in_order(self):
+        while True:
+            item = await self._pending.get()
+            if item is None:
+                break
+            sentence_id, chunks = item
+
+            if self.stream_chunks:
+                sequence = 0
+                while (data := await chunks.get()) is not None:
+                    self._mark_first_audio()
+                    await self.send_audio(frame_audio_chunk(self.reply_id, sentence_id, sequence, data))
+                    sequence += 1
+                if sequence:
+                    await self.send_audio(frame_audio_chunk(self.reply_id, sentence_id, sequence, b"", end_of_sentence=True))
+            else:
+                audio_buffer = io.BytesIO()
+                while (data := await chunks.get()) is not None:
+                    audio_buffer.write(data)
+                if audio_buffer.tell():
+                    self._mark_first_audio()
+                    await self.send_audio(audio_buffer.getvalue())
+
+    async def finish(self) -> None:
+        """Wait until every added sentence has been synthesized and sent"""
+        self._pending.put_nowait(None)
+        try:
+            await self._sender
+        finally:
+            await self.cancel()
+
+    async def cancel(self) -> None:
+        """Drop any syntheses that have not been sent yet"""
+        if not self._sender.done():
+            self._sender.cancel()
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(self._sender, *self._tasks, return_exceptions=True)
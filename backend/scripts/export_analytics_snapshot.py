@@ -0,0 +1,19 @@
+"""
+Export the columnar analytics snapshot (analytics/snapshot.npz) from every session in the bucket
+
+Usage (from backend/):
+    python -m scripts.export_analytics_snapshot
+"""
+
+from app.services.analytics_snapshot_service import AnalyticsSnapshotService
+
+
+def main():
+    snapshot = AnalyticsSnapshotService().export()
+    print(f"Snapshot exported: {snapshot.size} sessions, "
+          f"{len(snapshot.columns['interview_types'])} interview types, "
+          f"{len(snapshot.columns['candidate_names'])} candidates")
+
+
+if __name__ == "__main__":
+    main()
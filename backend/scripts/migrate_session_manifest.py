@@ -0,0 +1,18 @@
+"""
+Backfill the date-partitioned session manifest (manifests/sessions/YYYY/MM/DD.json)
+from existing sessions/{id}.json objects. Safe to re-run.
+
+Usage (from backend/):
+    python -m scripts.migrate_session_manifest
+"""
+
+from app.services.session_manifest_service import SessionManifestService
+
+
+def main():
+    count = SessionManifestService().migrate()
+    print(f"Session manifest migrated: {count} sessions")
+
+
+if __name__ == "__main__":
+    main()
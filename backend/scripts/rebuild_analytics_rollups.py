@@ -0,0 +1,19 @@
+"""
+Rebuild the materialized analytics rollups and the candidate index from every session in the bucket
+
+Usage (from backend/):
+    python -m scripts.rebuild_analytics_rollups
+"""
+
+from app.services.analytics_rollup_service import AnalyticsRollupService
+
+
+def main():
+    rollups = AnalyticsRollupService().rebuild()
+    print(f"Rollups rebuilt: {rollups['total_interviews']} sessions, "
+          f"{rollups['completed_interviews']} completed, "
+          f"{rollups['candidate_count']} candidates (candidate index backfilled in the same pass)")
+
+
+if __name__ == "__main__":
+    main()
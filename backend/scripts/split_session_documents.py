@@ -0,0 +1,20 @@
+"""
+Split sessions stored as a single document into a small header
+(sessions/{id}.json) and separately stored parts (sessions/{id}/{field}.json).
+Sessions already split are skipped, so this is safe to re-run. Unsplit
+sessions are still readable, and are split on their next save anyway.
+
+Usage (from backend/):
+    python -m scripts.split_session_documents
+"""
+
+from app.services.s3_service import S3Service
+
+
+def main():
+    count = S3Service().split_legacy_sessions()
+    print(f"Session documents split: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Shared test fixtures
+
+Provides an in-memory S3 client and, when the AWS and web packages are not
+installed, minimal stand-ins for the names the service modules import, so the
+services can be exercised without credentials or network access.
+"""
+
+import hashlib
+import io
+import sys
+import threading
+import types
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _stub_module(name: str, **attributes) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    class ClientError(Exception):
+        def __init__(self, error_response, operation_name):
+            super().__init__(f"{operation_name}: {error_response}")
+            self.response = error_response
+            self.operation_name = operation_name
+
+    _stub_module("botocore")
+    _stub_module("botocore.exceptions", ClientError=ClientError)
+    _stub_module("botocore.config", Config=lambda **kwargs: kwargs)
+
+try:
+    import boto3  # noqa: F401
+except ImportError:
+    _stub_module("boto3", session=types.SimpleNamespace(Session=None))
+
+try:
+    import dotenv  # noqa: F401
+except ImportError:
+    _stub_module("dotenv", load_dotenv=lambda *args, **kwargs: None)
+
+try:
+    import fastapi  # noqa: F401
+except ImportError:
+    class Response:
+        def __init__(self, content=None, status_code=200, media_type=None, headers=None):
+            self.body = content
+            self.status_code = status_code
+            self.media_type = media_type
+            self.headers = headers or {}
+
+    _stub_module("fastapi")
+    _stub_module("fastapi.responses", Response=Response, JSONResponse=Response)
+
+
+class FakeS3Client:
+    """
+    In-memory subset of the boto3 S3 client used by S3Service: conditional
+    put_object, get_object, head_object, delete_objects and list_objects_v2
+    pagination. Thread-safe, like the real client.
+    """
+
+    def __init__(self):
+        self.objects = {}  # key -> (body, etag, last_modified, extra put kwargs)
+        self.failing_deletes = set()  # keys delete_objects reports as errors
+        self.puts = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _error(code: str, operation: str) -> ClientError:
+        return ClientError({"Error": {"Code": code}}, operation)
+
+    def put_object(self, Bucket, Key, Body, IfMatch=None, IfNoneMatch=None, **kwargs):
+        body = Body.encode("utf-8") if isinstance(Body, str) else bytes(Body)
+        with self._lock:
+            current = self.objects.get(Key)
+            if IfNoneMatch == "*" and current is not None:
+                raise self._error("PreconditionFailed", "PutObject")
+            if IfMatch is not None and (current is None or current[1] != IfMatch):
+                raise self._error("PreconditionFailed", "PutObject")
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            self.objects[Key] = (body, etag, datetime.now(timezone.utc), kwargs)
+            self.puts += 1
+        return {"ETag": etag}
+
+    def get_object(self, Bucket, Key):
+        with self._lock:
+            if Key not in self.objects:
+                raise self._error("NoSuchKey", "GetObject")
+            body, etag, last_modified, kwargs = self.objects[Key]
+        return {
+            "Body": io.BytesIO(body),
+            "ETag": etag,
+            "LastModified": last_modified,
+            "ContentEncoding": kwargs.get("ContentEncoding"),
+            "Metadata": kwargs.get("Metadata", {})
+        }
+
+    def head_object(self, Bucket, Key):
+        with self._lock:
+            if Key not in self.objects:
+                raise self._error("404", "HeadObject")
+            body, etag, last_modified, _ = self.objects[Key]
+        return {"ETag": etag, "LastModified": last_modified, "ContentLength": len(body)}
+
+    def delete_objects(self, Bucket, Delete):
+        errors = []
+        with self._lock:
+            for item in Delete["Objects"]:
+                if item["Key"] in self.failing_deletes:
+                    errors.append({"Key": item["Key"], "Code": "InternalError"})
+                else:
+                    self.objects.pop(item["Key"], None)
+        return {"Errors": errors} if errors else {}
+
+    def get_paginator(self, operation_name):
+        client = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix="", **kwargs):
+                with client._lock:
+                    keys = sorted(key for key in client.objects if key.startswith(Prefix))
+                    contents = [
+                        {"Key": key, "LastModified": client.objects[key][2], "Size": len(client.objects[key][0])}
+                        for key in keys
+                    ]
+                yield {"Contents": contents}
+
+        return Paginator()
+
+    def keys(self, prefix: str = ""):
+        with self._lock:
+            return sorted(key for key in self.objects if key.startswith(prefix))
+
+
+@pytest.fixture
+def fake_s3():
+    return FakeS3Client()
+
+
+@pytest.fixture
+def s3_service(fake_s3, monkeypatch):
+    """S3Service wired to the in-memory client"""
+    from app.services import s3_service as s3_module
+
+    monkeypatch.setattr(s3_module, "get_client", lambda *args, **kwargs: fake_s3)
+    return s3_module.S3Service()
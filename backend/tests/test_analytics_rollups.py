@@ -0,0 +1,51 @@
+"""
+Analytics rollups: rebuilds backfill the candidate index, and queued events
+count each distinct candidate once.
+"""
+
+from app.services.analytics_rollup_service import ROLLUP_KEY, AnalyticsRollupService
+from app.services.candidate_index_service import CandidateIndexService
+
+
+def session(session_id: str, candidate_name: str) -> dict:
+    return {"session_id": session_id, "candidate_name": candidate_name, "created_at": "2026-10-01T10:00:00",
+            "interview_type": "Technical Interview", "status": "active"}
+
+
+def create(s3_service, rollup_service, candidate_index, session_data: dict):
+    """What create_session's background task does"""
+    s3_service.save_session(session_data)
+    rollup_service.record_session_created(session_data)
+    candidate_index.record_session(session_data)
+
+
+def test_legacy_candidates_are_not_counted_twice(s3_service):
+    rollup_service = AnalyticsRollupService(s3_service, flush_interval=0)
+    candidate_index = CandidateIndexService(s3_service, on_new_candidate=rollup_service.record_candidate_added)
+    s3_service.save_session(session("legacy-1", "Ada Lovelace"))
+    s3_service.save_session(session("legacy-2", "ada lovelace"))
+
+    rollups = rollup_service.get_rollups()
+    assert rollups["candidate_count"] == 1
+    assert candidate_index.get_history("Ada Lovelace")["total_interviews"] == 2
+
+    create(s3_service, rollup_service, candidate_index, session("s1", "Ada Lovelace"))
+    create(s3_service, rollup_service, candidate_index, session("s2", "Grace Hopper"))
+    assert rollup_service.flush()
+
+    stored, _ = s3_service.get_json(ROLLUP_KEY)
+    assert stored["total_interviews"] == 4
+    assert stored["candidate_count"] == 2
+
+
+def test_events_before_the_first_rebuild_are_left_to_it(s3_service):
+    rollup_service = AnalyticsRollupService(s3_service, flush_interval=0)
+    candidate_index = CandidateIndexService(s3_service, on_new_candidate=rollup_service.record_candidate_added)
+    s3_service.save_session(session("legacy", "Ada Lovelace"))
+
+    create(s3_service, rollup_service, candidate_index, session("s1", "Ada Lovelace"))
+    assert rollup_service.flush()  # no rollups yet: nothing is written
+    rollups = rollup_service.get_rollups()
+
+    assert rollups["total_interviews"] == 2
+    assert rollups["candidate_count"] == 1
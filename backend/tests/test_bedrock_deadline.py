@@ -0,0 +1,202 @@
+"""
+Deadline-aware Bedrock invocations: first-token and total budgets, hedging and
+failover to the fallback target, history replay to targets that do not
+share the primary's agent memory, and warm-only prefetches kept out of the
+latency statistics.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.models import session_context as session_context_module
+from app.models.session_context import SessionContext
+from app.services import bedrock_service as bedrock_module
+from app.services.bedrock_service import AgentTarget, BedrockService
+from app.services.bedrock_warmup import prefetch_first_turn
+from app.services.session_state_store import LRUSessionStateStore
+
+SESSION_ID = "session-1"
+
+
+class FakeEventStream:
+    """Completion stream yielding (delay, text) steps; close() ends it at once"""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        for delay, text in self.steps:
+            if self.closed.wait(delay):
+                return
+            yield {"chunk": {"bytes": text.encode("utf-8")}}
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeAgentClient:
+    """bedrock-agent-runtime stand-in recording every invoke_agent call"""
+
+    def __init__(self, steps=None, error=None):
+        self.steps = steps or [(0, "Hello.")]
+        self.error = error
+        self.calls = []
+        self.streams = []
+
+    def invoke_agent(self, **params):
+        self.calls.append(params)
+        if self.error is not None:
+            raise self.error
+        stream = FakeEventStream(self.steps)
+        self.streams.append(stream)
+        return {"completion": stream}
+
+
+def make_service(monkeypatch, primary, fallback=None, hedge_delay=0.05) -> BedrockService:
+    monkeypatch.setattr(bedrock_module, "get_client", lambda *args, **kwargs: primary)
+    service = BedrockService(session_states=LRUSessionStateStore())
+    if fallback is not None:
+        service.targets.append(AgentTarget("fallback", fallback, "agent", "fallback-alias"))
+    monkeypatch.setattr(service, "hedge_delay", lambda: hedge_delay)
+    return service
+
+
+def session_state(history=None) -> dict:
+    return {
+        "interviewType": "Technical Interview",
+        "candidateName": "Ada",
+        "turnCount": 1,
+        "conversationHistory": history if history is not None else [
+            {"role": "assistant", "content": "Hello Ada, tell me about yourself."},
+            {"role": "user", "content": "I build compilers."},
+            {"role": "assistant", "content": "Which one are you proudest of?"}
+        ]
+    }
+
+
+async def collect(service: BedrockService, **kwargs) -> str:
+    chunks = []
+    async for text in service.astream_agent_deadline(SESSION_ID, "Mostly LLVM passes.", **kwargs):
+        chunks.append(text)
+    return "".join(chunks)
+
+
+def test_fast_primary_answers_without_a_hedge(monkeypatch):
+    primary = FakeAgentClient([(0, "Nice. "), (0, "Why?")])
+    fallback = FakeAgentClient()
+    service = make_service(monkeypatch, primary, fallback, hedge_delay=5)
+
+    text = asyncio.run(collect(service, session_state=session_state(), hedge=True))
+
+    assert text == "Nice. Why?"
+    assert fallback.calls == []
+    # The primary keeps its own agent memory, so history is not replayed to it
+    assert "conversationHistory" not in primary.calls[0].get("sessionState", {})
+
+
+def test_hedged_request_replays_history_and_closes_the_loser(monkeypatch):
+    primary = FakeAgentClient([(2, "late")])
+    fallback = FakeAgentClient([(0, "From the fallback.")])
+    service = make_service(monkeypatch, primary, fallback)
+    hedges = bedrock_module.invocation_counters["hedges"]
+
+    text = asyncio.run(collect(service, session_state=session_state(), hedge=True))
+
+    assert text == "From the fallback."
+    assert bedrock_module.invocation_counters["hedges"] == hedges + 1
+    assert primary.streams[0].closed.wait(1)
+    params = fallback.calls[0]
+    assert params["agentAliasId"] == "fallback-alias"
+    assert params["sessionId"] == SESSION_ID
+    # Replay opens with the candidate's message; the greeting before it is dropped
+    assert params["sessionState"]["conversationHistory"]["messages"] == [
+        {"role": "user", "content": [{"text": "I build compilers."}]},
+        {"role": "assistant", "content": [{"text": "Which one are you proudest of?"}]}
+    ]
+    assert params["sessionState"]["sessionAttributes"]["candidate_name"] == "Ada"
+
+
+def test_failed_primary_fails_over_with_history(monkeypatch):
+    primary = FakeAgentClient(error=RuntimeError("region down"))
+    fallback = FakeAgentClient([(0, "Still here.")])
+    service = make_service(monkeypatch, primary, fallback, hedge_delay=5)
+
+    text = asyncio.run(collect(service, session_state=session_state(), hedge=True))
+
+    assert text == "Still here."
+    assert len(fallback.calls[0]["sessionState"]["conversationHistory"]["messages"]) == 2
+
+
+def test_replay_joins_consecutive_messages_of_one_role(monkeypatch):
+    history = [
+        {"role": "user", "content": "First part."},
+        {"role": "user", "content": "Second part."},
+        {"role": "assistant", "content": "Understood."}
+    ]
+    params = BedrockService._with_history_replay({"inputText": "x"}, session_state(history))
+
+    assert params["sessionState"]["conversationHistory"]["messages"] == [
+        {"role": "user", "content": [{"text": "First part.\nSecond part."}]},
+        {"role": "assistant", "content": [{"text": "Understood."}]}
+    ]
+    assert BedrockService._with_history_replay({"inputText": "x"}, session_state([])) == {"inputText": "x"}
+
+
+def test_first_token_budget_times_out_and_closes_the_stream(monkeypatch):
+    primary = FakeAgentClient([(2, "too late")])
+    service = make_service(monkeypatch, primary)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(collect(service, budget=0.1, hedge=False))
+    assert primary.streams[0].closed.wait(1)
+
+
+def test_total_budget_bounds_a_stalled_response(monkeypatch):
+    primary = FakeAgentClient([(0, "Quick start, "), (2, "stalled end")])
+    service = make_service(monkeypatch, primary)
+
+    async def scenario():
+        received = []
+        with pytest.raises(TimeoutError):
+            async for text in service.astream_agent_deadline(SESSION_ID, "hi", hedge=False, total_budget=0.2):
+                received.append(text)
+        return received
+
+    assert asyncio.run(scenario()) == ["Quick start, "]
+    assert primary.streams[0].closed.wait(1)
+
+
+def test_session_context_state_carries_capped_history(monkeypatch):
+    monkeypatch.setattr(session_context_module, "get_session_write_buffer", lambda: None)
+    transcript = [{"role": "assistant", "content": "Hello."}]
+    for turn in range(30):
+        transcript.append({"role": "user", "content": f"answer {turn}"})
+        transcript.append({"role": "system", "content": "code submitted"})
+        transcript.append({"role": "assistant", "content": f"question {turn}"})
+    context = SessionContext(None, SESSION_ID, {"candidate_name": "Ada", "transcript": transcript})
+
+    history = context.bedrock_session_state()["conversationHistory"]
+
+    assert len(history) == bedrock_module.BEDROCK_STATE_MAX_HISTORY
+    assert all(message["role"] in ("user", "assistant") for message in history)
+    assert history[-1] == {"role": "assistant", "content": "question 29"}
+    assert context.conversation_history(0) == []
+
+
+def test_prefetch_stays_out_of_the_latency_histograms(monkeypatch):
+    primary = FakeAgentClient([(0, "OK")])
+    service = make_service(monkeypatch, primary)
+    first_tokens = bedrock_module.first_token_latency.count
+    totals = bedrock_module.total_latency.count
+
+    assert asyncio.run(prefetch_first_turn(service, SESSION_ID, "Reply with only: OK", session_state()))
+
+    assert bedrock_module.first_token_latency.count == first_tokens
+    assert bedrock_module.total_latency.count == totals
+    # Warm-only: the prefetch runs on a throwaway agent session
+    assert primary.calls[0]["sessionId"] != SESSION_ID
+    asyncio.run(collect(service, hedge=False))
+    assert bedrock_module.first_token_latency.count == first_tokens + 1
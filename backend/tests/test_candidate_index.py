@@ -0,0 +1,87 @@
+"""
+Candidate index: history lookups and rebuilds that merge with sessions the
+application records while the rebuild scans the bucket.
+"""
+
+from app.services.candidate_index_service import CandidateIndexService
+
+
+def session(session_id: str, created_at: str, **fields) -> dict:
+    return {"session_id": session_id, "candidate_name": "Ada Lovelace", "created_at": created_at,
+            "updated_at": created_at, "interview_type": "Technical Interview", "status": "active", **fields}
+
+
+def history_ids(index_service, **kwargs) -> list:
+    history = index_service.get_history("ada  LOVELACE", **kwargs)
+    return [entry["session_id"] for entry in history["page"]]
+
+
+def test_history_pages_scored_sessions_newest_first(s3_service):
+    index_service = CandidateIndexService(s3_service)
+    index_service.rebuild()
+    report = {"overallScore": 80, "recommendation": "hire"}
+    for day in (1, 2, 3):
+        index_service.record_session(session(f"s{day}", f"2026-10-0{day}T10:00:00", performance_report=report))
+
+    assert history_ids(index_service) == ["s3", "s2", "s1"]
+    assert history_ids(index_service, limit=1, offset=1) == ["s2"]
+    assert history_ids(index_service, since="2026-10-02") == ["s3", "s2"]
+
+
+def test_rebuild_keeps_sessions_recorded_during_the_scan(s3_service):
+    index_service = CandidateIndexService(s3_service)
+    s3_service.save_session(session("old", "2026-10-01T10:00:00"))
+    s3_service.save_session(session("ending", "2026-10-02T10:00:00"))
+    scan = s3_service.iter_sessions
+
+    def scan_then_record(*args, **kwargs):
+        sessions = list(scan(*args, **kwargs))
+        # The application records a new session and ends another after the scan read them
+        index_service.record_session(session("new", "2026-10-03T10:00:00"))
+        index_service.record_session(session(
+            "ending", "2026-10-02T10:00:00", status="completed", ended_at="2026-10-03T11:00:00",
+            performance_report={"overallScore": 70}
+        ))
+        return iter(sessions)
+
+    s3_service.iter_sessions = scan_then_record
+    assert index_service.rebuild() == 1
+    del s3_service.iter_sessions
+
+    history = index_service.get_history("Ada Lovelace")
+    assert history["total_interviews"] == 3
+    assert history["completed_interviews"] == 1
+    assert [entry["session_id"] for entry in history["page"]] == ["ending"]
+
+
+def test_legacy_history_is_found_before_the_backfill(s3_service):
+    s3_service.save_session(session("legacy", "2026-09-01T10:00:00", performance_report={"overallScore": 60}))
+    index_service = CandidateIndexService(s3_service)
+    # A new session creates the index, which lacks the candidate's earlier sessions
+    s3_service.save_session(session("current", "2026-10-01T10:00:00"))
+    index_service.record_session(session("current", "2026-10-01T10:00:00"))
+
+    history = index_service.get_history("Ada Lovelace")
+
+    assert history["total_interviews"] == 2
+    assert [entry["session_id"] for entry in history["page"]] == ["legacy"]
+    index, _ = s3_service.get_json(index_service._index_key("Ada Lovelace"))
+    assert index["complete"] and set(index["sessions"]) == {"legacy", "current"}
+
+
+def test_new_candidates_are_counted_only_after_the_backfill(s3_service):
+    added = []
+    index_service = CandidateIndexService(s3_service, on_new_candidate=lambda: added.append(1))
+    s3_service.save_session(session("legacy", "2026-09-01T10:00:00"))
+
+    # Before the backfill, a first index may belong to a candidate with older sessions
+    index_service.record_session(session("s1", "2026-10-01T10:00:00"))
+    assert added == []
+
+    index_service.rebuild()
+    assert index_service.is_backfilled()
+    index_service.record_session(session("s2", "2026-10-02T10:00:00"))
+    index_service.record_session({**session("s3", "2026-10-02T10:00:00"), "candidate_name": "Grace Hopper"})
+
+    assert added == [1]
+    assert CandidateIndexService(s3_service).get_history("Nobody") is None
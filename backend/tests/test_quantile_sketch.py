@@ -0,0 +1,106 @@
+"""
+t-digest quantile sketch: accuracy against exact percentiles, merging,
+retraction, serialization and bounded size.
+"""
+
+import random
+
+import pytest
+
+from app.services.quantile_sketch import TDigest
+
+
+def exact_quantile(values: list, q: float) -> float:
+    """Linear-interpolation percentile (numpy's default method)"""
+    ordered = sorted(values)
+    position = q * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def digest_of(values, compression: float = 100) -> TDigest:
+    digest = TDigest(compression)
+    for value in values:
+        digest.add(value)
+    return digest
+
+
+@pytest.fixture
+def scores():
+    generator = random.Random(7)
+    return [min(100.0, max(0.0, generator.gauss(70, 12))) for _ in range(5000)]
+
+
+def test_empty_and_single_value():
+    assert TDigest().quantile(0.5) == 0
+    assert TDigest().mean() == 0
+    single = digest_of([42])
+    assert single.quantile(0.1) == 42
+    assert single.quantile(0.9) == 42
+
+
+@pytest.mark.parametrize("q", [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+def test_quantiles_track_exact_percentiles(scores, q):
+    digest = digest_of(scores)
+    # Scores span 0-100; tails are kept tighter than the middle by the k1 scale function
+    assert digest.quantile(q) == pytest.approx(exact_quantile(scores, q), abs=1.0)
+
+
+def test_min_max_mean_and_count_are_exact(scores):
+    digest = digest_of(scores)
+    assert digest.count == len(scores)
+    assert digest.min == min(scores)
+    assert digest.max == max(scores)
+    assert digest.mean() == pytest.approx(sum(scores) / len(scores))
+    assert digest.quantile(0) == pytest.approx(min(scores))
+    assert digest.quantile(1) == pytest.approx(max(scores))
+
+
+def test_merged_daily_digests_match_one_digest(scores):
+    days = [digest_of(scores[start:start + 250]) for start in range(0, len(scores), 250)]
+    merged = TDigest.merged(days)
+
+    assert merged.count == len(scores)
+    for q in (0.1, 0.5, 0.9):
+        assert merged.quantile(q) == pytest.approx(exact_quantile(scores, q), abs=1.0)
+
+
+def test_size_stays_bounded(scores):
+    digest = digest_of(scores * 4, compression=100)
+    digest.quantile(0.5)
+    assert len(digest.centroids) <= 100
+    assert len(digest.to_dict()["m"]) == len(digest.centroids)
+
+
+def test_round_trip_through_dict(scores):
+    digest = digest_of(scores)
+    restored = TDigest.from_dict(digest.to_dict())
+
+    assert restored.count == digest.count
+    assert restored.min == digest.min
+    assert restored.max == digest.max
+    for q in (0.05, 0.5, 0.95):
+        assert restored.quantile(q) == pytest.approx(digest.quantile(q), abs=0.01)
+
+
+def test_remove_retracts_values(scores):
+    digest = digest_of(scores)
+    replaced = digest_of(scores)
+    replaced.add(5)
+    replaced.remove(5)
+
+    assert replaced.count == digest.count
+    assert replaced.mean() == pytest.approx(digest.mean())
+    assert replaced.quantile(0.5) == pytest.approx(digest.quantile(0.5), abs=1.0)
+
+
+def test_removing_everything_empties_the_digest():
+    digest = digest_of([60, 80])
+    digest.remove(60)
+    digest.remove(80)
+
+    assert digest.count == 0
+    assert digest.centroids == []
+    assert digest.min is None and digest.max is None
+    assert digest.quantile(0.5) == 0
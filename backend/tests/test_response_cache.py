@@ -0,0 +1,180 @@
+"""
+Response cache: TTL hits, single-flight misses, stale-while-revalidate and
+generation-based invalidation of cached and in-flight computations.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import response_cache as response_cache_module
+from app.services.response_cache import ResponseCache
+
+
+class Clock:
+    """Controllable stand-in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache_module.time, "monotonic", clock)
+    return clock
+
+
+class Counter:
+    """Compute function returning 1, 2, 3... that can be held open"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        value = self.calls
+        await self.release.wait()
+        return value
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_miss_then_hit_until_ttl(clock):
+    async def scenario():
+        cache, compute = ResponseCache(), Counter()
+        first = await cache.get_or_compute("aggregate", (), compute, ttl=30)
+        second = await cache.get_or_compute("aggregate", (), compute, ttl=30)
+        clock.now += 31
+        third = await cache.get_or_compute("aggregate", (), compute, ttl=30)
+        return first, second, third
+
+    assert run(scenario()) == ((1, "MISS"), (1, "HIT"), (2, "MISS"))
+
+
+def test_parameters_are_part_of_the_key(clock):
+    async def scenario():
+        cache, compute = ResponseCache(), Counter()
+        a = await cache.get_or_compute("trends", (("days", 7),), compute, ttl=30)
+        b = await cache.get_or_compute("trends", (("days", 30),), compute, ttl=30)
+        return a, b
+
+    assert run(scenario()) == ((1, "MISS"), (2, "MISS"))
+
+
+def test_concurrent_misses_share_one_computation(clock):
+    async def scenario():
+        cache, compute = ResponseCache(), Counter()
+        compute.release.clear()
+        requests = [asyncio.create_task(cache.get_or_compute("aggregate", (), compute, ttl=30)) for _ in range(5)]
+        await asyncio.sleep(0)
+        compute.release.set()
+        return await asyncio.gather(*requests), compute.calls, cache.stats()
+
+    results, calls, stats = run(scenario())
+    assert calls == 1
+    assert sorted(status for _, status in results) == ["MISS"] + ["SHARED"] * 4
+    assert {value for value, _ in results} == {1}
+    assert stats["in_flight"] == 0
+
+
+def test_stale_value_is_served_while_one_refresh_runs(clock):
+    async def scenario():
+        cache, compute = ResponseCache(), Counter()
+        await cache.get_or_compute("aggregate", (), compute, ttl=30, stale_ttl=300)
+        clock.now += 60
+        compute.release.clear()
+        stale = [await cache.get_or_compute("aggregate", (), compute, ttl=30, stale_ttl=300) for _ in range(3)]
+        compute.release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        refreshed = await cache.get_or_compute("aggregate", (), compute, ttl=30, stale_ttl=300)
+        return stale, refreshed, compute.calls
+
+    stale, refreshed, calls = run(scenario())
+    assert stale == [(1, "STALE")] * 3
+    assert refreshed == (2, "HIT")
+    assert calls == 2
+
+
+def test_invalidate_drops_cached_values_by_tag(clock):
+    async def scenario():
+        cache, compute = ResponseCache(), Counter()
+        await cache.get_or_compute("aggregate", (), compute, ttl=30)
+        await cache.get_or_compute("benchmarks", (), compute, ttl=30)
+        cache.invalidate("aggregate")
+        return (
+            await cache.get_or_compute("aggregate", (), compute, ttl=30),
+            await cache.get_or_compute("benchmarks", (), compute, ttl=30)
+        )
+
+    assert run(scenario()) == ((3, "MISS"), (2, "HIT"))
+
+
+def test_in_flight_result_is_not_shared_or_stored_after_invalidation(clock):
+    async def scenario():
+        cache = ResponseCache()
+        gates = [asyncio.Event(), asyncio.Event()]
+        calls = []
+
+        async def compute():
+            index = len(calls)
+            calls.append(index)
+            await gates[index].wait()
+            return f"generation-{index}"
+
+        before = asyncio.create_task(cache.get_or_compute("aggregate", (), compute, ttl=30))
+        await asyncio.sleep(0)
+        joined_before = asyncio.create_task(cache.get_or_compute("aggregate", (), compute, ttl=30))
+        await asyncio.sleep(0)
+
+        cache.invalidate("aggregate")
+        after = asyncio.create_task(cache.get_or_compute("aggregate", (), compute, ttl=30))
+        await asyncio.sleep(0)
+
+        # The outdated computation finishes first; it must not be stored
+        gates[0].set()
+        outdated = await before, await joined_before
+        gates[1].set()
+        fresh = await after
+        cached = await cache.get_or_compute("aggregate", (), compute, ttl=30)
+        return outdated, fresh, cached, len(calls)
+
+    outdated, fresh, cached, calls = run(scenario())
+    assert outdated == (("generation-0", "MISS"), ("generation-0", "SHARED"))
+    assert fresh == ("generation-1", "MISS")
+    assert cached == ("generation-1", "HIT")
+    assert calls == 2
+
+
+def test_errors_are_not_cached(clock):
+    async def scenario():
+        cache = ResponseCache()
+        attempts = []
+
+        async def compute():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("S3 unavailable")
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("aggregate", (), compute, ttl=30)
+        return await cache.get_or_compute("aggregate", (), compute, ttl=30)
+
+    assert run(scenario()) == ("ok", "MISS")
+
+
+def test_disabled_cache_bypasses(clock):
+    async def scenario():
+        cache, compute = ResponseCache(enabled=False), Counter()
+        return [await cache.get_or_compute("aggregate", (), compute, ttl=30) for _ in range(2)]
+
+    assert run(scenario()) == [(1, "BYPASS"), (2, "BYPASS")]
@@ -0,0 +1,83 @@
+"""
+Session index writer: failed candidate index and manifest writes are queued,
+retried, and never roll an entry back to an older version of the session.
+"""
+
+from datetime import date
+
+from app.services.candidate_index_service import CandidateIndexService
+from app.services.session_index_writer import SessionIndexWriter
+from app.services.session_manifest_service import SessionManifestService
+
+CREATED = {"session_id": "s1", "candidate_name": "Ada", "created_at": "2026-10-01T10:00:00",
+           "updated_at": "2026-10-01T10:00:00", "interview_type": "Technical Interview", "status": "active"}
+COMPLETED = {**CREATED, "status": "completed", "ended_at": "2026-10-01T11:00:00",
+             "performance_report": {"overallScore": 82, "recommendation": "hire"}}
+
+
+def manifest_entry(s3_service) -> dict:
+    partition, _ = s3_service.get_json(SessionManifestService.partition_key(date(2026, 10, 1)))
+    return partition["sessions"]["s1"]
+
+
+def fail_writes_to(s3_service, prefix: str):
+    """Make conditional writes under prefix fail as if every ETag race was lost"""
+    update_json = s3_service.update_json
+
+    def failing(key, *args, **kwargs):
+        return False if key.startswith(prefix) else update_json(key, *args, **kwargs)
+
+    s3_service.update_json = failing
+    return lambda: setattr(s3_service, "update_json", update_json)
+
+
+def test_failed_writes_are_queued_and_retried(s3_service):
+    writer = SessionIndexWriter(s3_service, retry_interval=0)
+    restore = fail_writes_to(s3_service, "manifests/")
+
+    assert not writer.record_session(CREATED)
+    stats = writer.stats()
+    assert stats["pending_writes"] == 1
+    assert stats["failures"] == 1
+
+    assert not writer.retry()  # still failing: stays queued
+    restore()
+    assert writer.retry()
+
+    assert manifest_entry(s3_service)["status"] == "active"
+    assert writer.stats()["pending_writes"] == 0
+    index, _ = s3_service.get_json(CandidateIndexService(s3_service)._index_key("Ada"))
+    assert list(index["sessions"]) == ["s1"]
+
+
+def test_queue_keeps_only_the_latest_version(s3_service):
+    writer = SessionIndexWriter(s3_service, retry_interval=0)
+    restore = fail_writes_to(s3_service, "manifests/")
+    writer.record_session(CREATED)
+    writer.record_session(COMPLETED)
+    restore()
+
+    assert writer.stats()["pending_writes"] == 1
+    assert writer.retry()
+    assert manifest_entry(s3_service)["status"] == "completed"
+
+
+def test_late_retry_of_an_older_version_is_ignored(s3_service):
+    writer = SessionIndexWriter(s3_service, retry_interval=0)
+    restore = fail_writes_to(s3_service, "manifests/")
+    writer.record_session(CREATED)
+    restore()
+    # The completion is written directly while the creation is still queued
+    assert SessionManifestService(s3_service).record_session(COMPLETED)
+
+    assert writer.retry()
+    entry = manifest_entry(s3_service)
+    assert entry["status"] == "completed"
+    assert entry["score"] == 82
+
+
+def test_undated_sessions_are_not_queued(s3_service):
+    writer = SessionIndexWriter(s3_service, retry_interval=0)
+
+    assert writer.record_session({**CREATED, "created_at": None})
+    assert writer.stats()["pending_writes"] == 0
@@ -0,0 +1,115 @@
+"""
+Session parts: parts are written under content-addressed names before the
+header that references them, so readers never pair a new part with an old
+header, and superseded versions are deleted after the swap.
+"""
+
+import json
+
+from app.services.s3_service import PART_VERSIONS_FIELD, PARTS_FIELD
+
+SESSION_ID = "session-1"
+HEADER_KEY = f"sessions/{SESSION_ID}.json"
+
+
+def message(content: str) -> dict:
+    return {"role": "user", "content": content, "timestamp": "2026-10-01T10:00:00"}
+
+
+def contents(session_data: dict) -> list:
+    return [entry["content"] for entry in session_data.get("transcript", [])]
+
+
+def part_keys(fake_s3) -> list:
+    return fake_s3.keys(f"sessions/{SESSION_ID}/")
+
+
+def test_reader_during_a_save_sees_the_previous_session(s3_service):
+    assert s3_service.save_session({"session_id": SESSION_ID, "status": "active", "transcript": [message("one")]})
+    write = s3_service._write_session_object
+    seen = []
+
+    def write_then_read(key, value):
+        if key == HEADER_KEY:
+            # The new parts are stored, the header is not swapped yet
+            seen.append(s3_service.get_session(SESSION_ID))
+        write(key, value)
+
+    s3_service._write_session_object = write_then_read
+    assert s3_service.update_session(SESSION_ID, {"transcript": [message("one"), message("two")]})
+    del s3_service._write_session_object
+
+    assert contents(seen[0]) == ["one"]
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one", "two"]
+
+
+def test_compaction_swaps_transcript_and_folded_segments_together(s3_service):
+    assert s3_service.save_session({"session_id": SESSION_ID, "status": "active", "transcript": []})
+    s3_service.append_transcript_messages(SESSION_ID, [message("one")])
+    s3_service.append_transcript_messages(SESSION_ID, [message("two")])
+    write = s3_service._write_session_object
+    seen = []
+
+    def write_then_read(key, value):
+        if key == HEADER_KEY and not seen:
+            seen.append(s3_service.get_session(SESSION_ID))
+        write(key, value)
+
+    s3_service._write_session_object = write_then_read
+    s3_service.compact_transcript(SESSION_ID)
+    del s3_service._write_session_object
+
+    # Mid-compaction readers still merge the segments once, never twice
+    assert contents(seen[0]) == ["one", "two"]
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one", "two"]
+
+
+def test_superseded_part_versions_are_deleted(s3_service, fake_s3):
+    assert s3_service.save_session({
+        "session_id": SESSION_ID, "transcript": [message("one")], "code_submissions": [{"code": "pass"}]
+    })
+    for content in ("two", "three"):
+        session_data = s3_service.get_session(SESSION_ID)
+        session_data["transcript"].append(message(content))
+        assert s3_service.save_session(session_data)
+
+    header, _ = s3_service.get_json(HEADER_KEY)
+    versions = header[PART_VERSIONS_FIELD]
+    assert sorted(part_keys(fake_s3)) == sorted(
+        f"sessions/{SESSION_ID}/{field}.{versions[field]}.json" for field in ("transcript", "code_submissions")
+    )
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one", "two", "three"]
+
+
+def test_unversioned_parts_are_read_and_replaced(s3_service, fake_s3):
+    legacy_part = f"sessions/{SESSION_ID}/transcript.json"
+    fake_s3.put_object(Bucket="bucket", Key=legacy_part, Body=json.dumps([message("one")]))
+    fake_s3.put_object(Bucket="bucket", Key=HEADER_KEY, Body=json.dumps(
+        {"session_id": SESSION_ID, "status": "active", PARTS_FIELD: ["transcript"]}
+    ))
+
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one"]
+    assert s3_service.update_session(SESSION_ID, {"transcript": [message("one"), message("two")]})
+
+    assert legacy_part not in part_keys(fake_s3)
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one", "two"]
+
+
+def test_reader_retries_when_a_save_deletes_the_parts_it_listed(s3_service):
+    assert s3_service.save_session({"session_id": SESSION_ID, "transcript": [message("one")]})
+    read = s3_service._read_session_object
+    raced = []
+
+    def read_then_save(key):
+        value = read(key)
+        if key == HEADER_KEY and not raced:
+            # Another writer swaps the header and deletes this header's part version
+            raced.append(True)
+            assert s3_service.update_session(SESSION_ID, {"transcript": [message("one"), message("two")]})
+        return value
+
+    s3_service._read_session_object = read_then_save
+    session_data = s3_service.get_session(SESSION_ID)
+    del s3_service._read_session_object
+
+    assert contents(session_data) == ["one", "two"]
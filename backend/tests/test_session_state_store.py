@@ -0,0 +1,206 @@
+"""
+Session state store: LRU bound and idle expiry in process, sliding expiry and
+atomic updates through the external backend, the compact wire format, and the
+agent state resumed by reconnecting connections.
+"""
+
+import threading
+
+import pytest
+
+from app.models import session_context as session_context_module
+from app.models.session_context import SessionContext
+from app.services import bedrock_service as bedrock_module
+from app.services import session_state_store as store_module
+from app.services.bedrock_service import BedrockService
+from app.services.session_state_store import (
+    ExternalSessionStateStore,
+    LocalKeyValueBackend,
+    LRUSessionStateStore,
+    decode_state,
+    encode_state
+)
+
+
+class Clock:
+    """Controllable stand-in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(store_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def bedrock_service(monkeypatch):
+    monkeypatch.setattr(bedrock_module, "get_client", lambda *args, **kwargs: None)
+    return BedrockService(session_states=LRUSessionStateStore())
+
+
+def test_lru_evicts_the_least_recently_used_session(clock):
+    store = LRUSessionStateStore(max_sessions=2, ttl=0)
+    store.put("a", {"n": 1})
+    store.put("b", {"n": 2})
+    assert store.get("a") == {"n": 1}  # "b" is now the least recently used
+
+    store.put("c", {"n": 3})
+
+    assert store.get("b") is None
+    assert store.get("a") == {"n": 1}
+    assert store.get("c") == {"n": 3}
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["sessions"] == 2
+
+
+def test_lru_expires_idle_sessions_and_access_refreshes_them(clock):
+    store = LRUSessionStateStore(max_sessions=10, ttl=60)
+    store.put("active", {"n": 1})
+    store.put("idle", {"n": 2})
+
+    clock.now += 45
+    assert store.get("active") is not None
+    clock.now += 45
+
+    assert store.get("active") == {"n": 1}
+    assert store.get("idle") is None
+    assert store.stats()["expirations"] == 1
+
+
+def test_lru_update_mutates_in_place(clock):
+    store = LRUSessionStateStore(max_sessions=10, ttl=60)
+    store.put("a", {"n": 1})
+
+    assert store.update("a", lambda state: state.update(n=state["n"] + 1))
+    assert not store.update("missing", lambda state: None)
+    assert store.get("a") == {"n": 2}
+
+
+def test_encoded_state_round_trips_compactly():
+    state = {"sessionId": "s", "conversationHistory": [["user", "héllo " * 50, 1.5]], "turnCount": 1}
+    data = encode_state(state)
+
+    assert decode_state(data) == state
+    assert len(data) < len(str(state))
+
+
+def test_local_backend_reads_slide_the_expiry(clock):
+    backend = LocalKeyValueBackend()
+    backend.set("k", b"v", ttl=60)
+
+    clock.now += 45
+    assert backend.get("k", ttl=60) == b"v"
+    clock.now += 45
+    assert backend.get("k") == b"v"  # read without a ttl does not extend it
+    clock.now += 20
+
+    assert backend.get("k") is None
+
+
+def test_external_store_expires_only_idle_sessions(clock):
+    store = ExternalSessionStateStore(LocalKeyValueBackend(), ttl=60)
+    store.put("active", {"turnCount": 0})
+    store.put("idle", {"turnCount": 0})
+
+    for _ in range(3):
+        clock.now += 45
+        assert store.get("active") is not None
+
+    assert store.get("idle") is None
+    assert store.update("active", lambda state: state.update(turnCount=1))
+    assert store.get("active") == {"turnCount": 1}
+    assert not store.update("idle", lambda state: None)
+
+
+def test_concurrent_external_updates_lose_no_turns():
+    store = ExternalSessionStateStore(LocalKeyValueBackend(), ttl=0)
+    store.put("s", {"turns": []})
+    workers, per_worker = 8, 50
+
+    def worker(index: int):
+        for turn in range(per_worker):
+            store.update("s", lambda state: state["turns"].append(f"{index}-{turn}"))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.get("s")["turns"]) == workers * per_worker
+
+
+def test_failed_backend_update_is_counted_not_raised():
+    class BrokenBackend(LocalKeyValueBackend):
+        def update(self, key, transform, ttl):
+            raise ConnectionError("redis down")
+
+    store = ExternalSessionStateStore(BrokenBackend(), ttl=60)
+
+    assert not store.update("s", lambda state: None)
+    assert store.stats()["errors"] == 1
+
+
+def test_bedrock_state_history_is_compact_and_bounded(bedrock_service):
+    bedrock_service.max_history = 4
+    bedrock_service.initialize_session("s", "Technical Interview", "Ada")
+
+    bedrock_service.update_session_state("s", None, "Hello Ada.")
+    for turn in range(3):
+        assert bedrock_service.update_session_state("s", f"answer {turn}", f"question {turn}")
+
+    stored = bedrock_service.session_states.get("s")
+    assert stored["turnCount"] == 3
+    assert [row[:2] for row in stored["conversationHistory"]] == [
+        ["user", "answer 1"], ["assistant", "question 1"], ["user", "answer 2"], ["assistant", "question 2"]
+    ]
+    expanded = bedrock_service.get_session_state("s")["conversationHistory"]
+    assert expanded[0]["role"] == "user" and expanded[0]["content"] == "answer 1"
+    assert not bedrock_service.update_session_state("missing", "a", "b")
+
+
+def make_context(monkeypatch, transcript) -> SessionContext:
+    monkeypatch.setattr(session_context_module, "get_session_write_buffer", lambda: None)
+    return SessionContext(None, "s", {"candidate_name": "Ada", "transcript": transcript})
+
+
+def test_resume_seeds_the_store_from_the_transcript(monkeypatch, bedrock_service):
+    transcript = [
+        {"role": "assistant", "content": "Hello."},
+        {"role": "user", "content": "Hi."},
+        {"role": "assistant", "content": "Tell me more."}
+    ]
+    context = make_context(monkeypatch, transcript)
+
+    state = bedrock_service.resume_session("s", context.bedrock_session_state())
+
+    assert state["turnCount"] == 1
+    assert [message["content"] for message in state["conversationHistory"]] == ["Hello.", "Hi.", "Tell me more."]
+    assert not context.restore_agent_state(state)
+
+
+def test_reconnect_resumes_turns_missing_from_the_transcript(monkeypatch, bedrock_service):
+    # An earlier connection recorded two turns; the reloaded transcript only has the first
+    bedrock_service.initialize_session("s", "Technical Interview", "Ada")
+    bedrock_service.update_session_state("s", "first answer", "second question")
+    bedrock_service.update_session_state("s", "second answer", "third question")
+    context = make_context(monkeypatch, [
+        {"role": "user", "content": "first answer"},
+        {"role": "assistant", "content": "second question"}
+    ])
+
+    state = bedrock_service.resume_session("s", context.bedrock_session_state())
+    assert context.restore_agent_state(state)
+    context.transcript.append({"role": "user", "content": "third answer"})
+
+    assert context.turn_count == 2
+    assert [message["content"] for message in context.conversation_history()] == [
+        "first answer", "second question", "second answer", "third question", "third answer"
+    ]
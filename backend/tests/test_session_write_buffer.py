@@ -0,0 +1,134 @@
+"""
+Session write buffer: pending writes are visible before they reach S3, flushes
+coalesce them, failed flushes keep them in order, and counters stay consistent
+under concurrent use.
+"""
+
+import threading
+
+from app.services.s3_service import TRANSCRIPT_PREFIX
+from app.services.session_write_buffer import SessionWriteBuffer
+
+SESSION_ID = "session-1"
+
+
+def message(content: str) -> dict:
+    return {"role": "user", "content": content, "timestamp": "2026-10-01T10:00:00"}
+
+
+def contents(messages: list) -> list:
+    return [entry["content"] for entry in messages]
+
+
+def make_buffer(s3_service) -> SessionWriteBuffer:
+    assert s3_service.save_session({"session_id": SESSION_ID, "status": "active", "transcript": []})
+    return SessionWriteBuffer(s3_service, flush_interval=0)  # flushed explicitly, no timer thread
+
+
+def test_pending_writes_are_visible_before_flush(s3_service):
+    buffer = make_buffer(s3_service)
+    buffer.append_transcript(SESSION_ID, message("one"))
+    buffer.append_to_list(SESSION_ID, "code_submissions", {"id": 1})
+
+    session_data = buffer.get_session(SESSION_ID)
+
+    assert contents(session_data["transcript"]) == ["one"]
+    assert session_data["code_submissions"] == [{"id": 1}]
+    assert s3_service.get_transcript(SESSION_ID) == []
+
+
+def test_flush_coalesces_messages_into_one_segment(s3_service, fake_s3):
+    buffer = make_buffer(s3_service)
+    for content in ("one", "two", "three"):
+        buffer.append_transcript(SESSION_ID, message(content))
+    buffer.append_to_list(SESSION_ID, "code_submissions", {"id": 1})
+    buffer.append_to_list(SESSION_ID, "code_submissions", {"id": 2})
+
+    assert buffer.flush(SESSION_ID)
+
+    assert len(fake_s3.keys(f"{TRANSCRIPT_PREFIX}/{SESSION_ID}/")) == 1
+    session_data = s3_service.get_session(SESSION_ID)
+    assert contents(session_data["transcript"]) == ["one", "two", "three"]
+    assert session_data["code_submissions"] == [{"id": 1}, {"id": 2}]
+    stats = buffer.stats()
+    assert stats["buffered_writes"] == 5
+    assert stats["flushes"] == 1
+    assert stats["s3_writes"] == 2
+    assert stats["pending_updates"] == 0
+
+
+def test_flush_with_nothing_pending_is_a_no_op(s3_service, fake_s3):
+    buffer = make_buffer(s3_service)
+    puts = fake_s3.puts
+
+    assert buffer.flush(SESSION_ID)
+    assert fake_s3.puts == puts
+    assert buffer.stats()["flushes"] == 0
+
+
+def test_failed_flush_keeps_messages_ahead_of_newer_ones(s3_service):
+    buffer = make_buffer(s3_service)
+    buffer.append_transcript(SESSION_ID, message("one"))
+
+    append = s3_service.append_transcript_messages
+
+    def failing_append(session_id, messages):
+        # A newer message arrives while the failing write is in flight
+        buffer.append_transcript(SESSION_ID, message("two"))
+        return False
+
+    s3_service.append_transcript_messages = failing_append
+    assert not buffer.flush(SESSION_ID)
+    s3_service.append_transcript_messages = append
+
+    assert buffer.stats()["flush_failures"] == 1
+    assert contents(buffer.get_session(SESSION_ID)["transcript"]) == ["one", "two"]
+
+    assert buffer.flush(SESSION_ID)
+    assert contents(s3_service.get_transcript(SESSION_ID)) == ["one", "two"]
+
+
+def test_transcript_is_not_rewritten_when_only_the_list_update_fails(s3_service):
+    buffer = make_buffer(s3_service)
+    buffer.append_transcript(SESSION_ID, message("one"))
+    buffer.append_to_list(SESSION_ID, "code_submissions", {"id": 1})
+
+    update = s3_service.update_session
+    s3_service.update_session = lambda session_id, updates: False
+    assert not buffer.flush(SESSION_ID)
+    s3_service.update_session = update
+
+    assert buffer.flush(SESSION_ID)
+    session_data = s3_service.get_session(SESSION_ID)
+    assert contents(session_data["transcript"]) == ["one"]
+    assert session_data["code_submissions"] == [{"id": 1}]
+
+
+def test_concurrent_appends_and_flushes_lose_nothing(s3_service, fake_s3):
+    buffer = make_buffer(s3_service)
+    threads_count, per_thread = 8, 25
+
+    def worker(thread_index: int):
+        for index in range(per_thread):
+            buffer.append_transcript(SESSION_ID, message(f"{thread_index}-{index}"))
+            if index % 5 == 4:
+                buffer.flush(SESSION_ID)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert buffer.flush_all()
+
+    transcript = contents(s3_service.get_transcript(SESSION_ID))
+    assert sorted(transcript) == sorted(f"{t}-{i}" for t in range(threads_count) for i in range(per_thread))
+    for thread_index in range(threads_count):
+        own = [entry for entry in transcript if entry.startswith(f"{thread_index}-")]
+        assert own == [f"{thread_index}-{index}" for index in range(per_thread)]
+
+    stats = buffer.stats()
+    assert stats["buffered_writes"] == threads_count * per_thread
+    assert stats["s3_writes"] == len(fake_s3.keys(f"{TRANSCRIPT_PREFIX}/{SESSION_ID}/"))
+    assert stats["flushes"] == stats["s3_writes"]
+    assert stats["flush_failures"] == 0
@@ -0,0 +1,120 @@
+"""
+Transcript append log: segments are merged on read, folded segments are tracked
+by name, and compaction deletes exactly the segments it folded.
+"""
+
+import json
+
+from app.services.s3_service import COMPACTION_MARKER, FOLDED_SEGMENTS_FIELD, TRANSCRIPT_PREFIX
+
+SESSION_ID = "session-1"
+
+
+def message(content: str) -> dict:
+    return {"role": "user", "content": content, "timestamp": "2026-10-01T10:00:00"}
+
+
+def contents(session_data: dict) -> list:
+    return [entry["content"] for entry in session_data.get("transcript", [])]
+
+
+def put_segment(fake_s3, name: str, messages: list):
+    fake_s3.put_object(
+        Bucket="bucket",
+        Key=f"{TRANSCRIPT_PREFIX}/{SESSION_ID}/{name}.json",
+        Body=json.dumps(messages)
+    )
+
+
+def segment_keys(fake_s3) -> list:
+    return fake_s3.keys(f"{TRANSCRIPT_PREFIX}/{SESSION_ID}/")
+
+
+def create_session(s3_service, **fields):
+    assert s3_service.save_session({"session_id": SESSION_ID, "status": "active", "transcript": [], **fields})
+
+
+def test_appended_segments_are_merged_in_order(s3_service, fake_s3):
+    create_session(s3_service)
+    assert s3_service.append_transcript_messages(SESSION_ID, [message("one"), message("two")])
+    assert s3_service.update_session_transcript(SESSION_ID, message("three"))
+
+    session_data = s3_service.get_session(SESSION_ID)
+
+    assert contents(session_data) == ["one", "two", "three"]
+    assert len(segment_keys(fake_s3)) == 2
+    assert len(session_data[FOLDED_SEGMENTS_FIELD]) == 2
+
+
+def test_compaction_deletes_only_folded_segments(s3_service, fake_s3):
+    create_session(s3_service)
+    s3_service.append_transcript_messages(SESSION_ID, [message("one")])
+    s3_service.append_transcript_messages(SESSION_ID, [message("two")])
+
+    compacted = s3_service.compact_transcript(SESSION_ID)
+
+    assert contents(compacted) == ["one", "two"]
+    assert segment_keys(fake_s3) == []
+    assert compacted[FOLDED_SEGMENTS_FIELD] == []
+    # The stored document holds the transcript once, with no pending segments to re-merge
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one", "two"]
+
+
+def test_late_segment_with_earlier_name_survives_compaction(s3_service, fake_s3):
+    create_session(s3_service)
+    s3_service.append_transcript_messages(SESSION_ID, [message("one")])
+
+    # A segment from a writer with a slow clock lands after compaction read the session
+    read_session = s3_service.get_session
+
+    def get_session_then_late_write(session_id, fields=None):
+        session_data = read_session(session_id, fields=fields)
+        put_segment(fake_s3, "00000000000000000001-late", [message("late")])
+        return session_data
+
+    s3_service.get_session = get_session_then_late_write
+    compacted = s3_service.compact_transcript(SESSION_ID)
+    del s3_service.get_session
+
+    assert contents(compacted) == ["one"]
+    assert [key.rsplit("/", 1)[-1] for key in segment_keys(fake_s3)] == ["00000000000000000001-late.json"]
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one", "late"]
+
+    s3_service.compact_transcript(SESSION_ID)
+    assert segment_keys(fake_s3) == []
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one", "late"]
+
+
+def test_segment_that_failed_to_delete_is_not_merged_twice(s3_service, fake_s3):
+    create_session(s3_service)
+    s3_service.append_transcript_messages(SESSION_ID, [message("one")])
+    stuck_key = segment_keys(fake_s3)[0]
+    fake_s3.failing_deletes.add(stuck_key)
+
+    s3_service.compact_transcript(SESSION_ID)
+
+    assert segment_keys(fake_s3) == [stuck_key]
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one"]
+
+    fake_s3.failing_deletes.clear()
+    s3_service.compact_transcript(SESSION_ID)
+    assert segment_keys(fake_s3) == []
+    assert contents(s3_service.get_session(SESSION_ID)) == ["one"]
+
+
+def test_legacy_compaction_marker_is_still_honoured(s3_service, fake_s3):
+    create_session(s3_service, transcript=[message("old")], **{COMPACTION_MARKER: "00000000000000000005-a"})
+    put_segment(fake_s3, "00000000000000000003-a", [message("old")])
+    put_segment(fake_s3, "00000000000000000009-a", [message("new")])
+
+    assert contents(s3_service.get_session(SESSION_ID)) == ["old", "new"]
+
+
+def test_projected_reads_skip_the_segment_log(s3_service, fake_s3):
+    create_session(s3_service)
+    s3_service.append_transcript_messages(SESSION_ID, [message("one")])
+
+    session_data = s3_service.get_session(SESSION_ID, fields=("status",))
+
+    assert session_data["status"] == "active"
+    assert "transcript" not in session_data
@@ -3,6 +3,7 @@
 import { useState, useRef, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import dynamic from 'next/dynamic';
+import { parseAudioFrame, StreamingAudioPlayer, supportsFramedAudio } from './audio/audioFrames';
 
 // Dynamically import CodeEditor to avoid SSR issues
 const CodeEditor = dynamic(() => import('./code-editor/CodeEditor'), { ssr: false });
@@ -42,6 +43,9 @@ export default function VoiceInterview({ sessionId, interviewType, candidateName
   const audioQueueRef = useRef<ArrayBuffer[]>([]);
   const isPlayingRef = useRef(false);
   const currentAudioSourceRef = useRef<AudioBufferSourceNode | null>(null);
+  // Set once the server confirms framed TTS chunks (audio_config); see ./audio/audioFrames
+  const framedAudioRef = useRef(false);
+  const streamingPlayerRef = useRef<StreamingAudioPlayer | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const streamRef = useRef<MediaStream | null>(null);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
@@ -56,6 +60,10 @@ export default function VoiceInterview({ sessionId, interviewType, candidateName
 
     wsRef.current.onopen = () => {
       console.log('WebSocket connected');
+      if (supportsFramedAudio()) {
+        // Ask for TTS audio as framed chunks so playback starts before a sentence is fully synthesized
+        wsRef.current?.send(JSON.stringify({ type: 'audio_config', stream_chunks: true }));
+      }
       // Auto-start interview when WebSocket is connected
       initializeInterview();
     };
@@ -63,6 +71,14 @@ export default function VoiceInterview({ sessionId, interviewType, candidateName
     wsRef.current.onmessage = async (event) => {
       if (event.data instanceof Blob) {
         const audioBuffer = await event.data.arrayBuffer();
+        const frame = framedAudioRef.current ? parseAudioFrame(audioBuffer) : null;
+        if (frame) {
+          if (!streamingPlayerRef.current) {
+            streamingPlayerRef.current = new StreamingAudioPlayer(message => setError(message));
+          }
+          streamingPlayerRef.current.handleFrame(frame);
+          return;
+        }
         audioQueueRef.current.push(audioBuffer);
 
         if (!isPlayingRef.current) {
@@ -71,7 +87,12 @@ export default function VoiceInterview({ sessionId, interviewType, candidateName
       } else {
         const data = JSON.parse(event.data);
 
-        if (data.type === 'transcript' && data.role === 'user') {
+        if (data.type === 'audio_config') {
+          framedAudioRef.current = data.stream_chunks === true;
+        } else if (data.type === 'transcript' && data.role === 'user' && data.is_final === false) {
+          // Interim streaming transcript while the candidate is still speaking
+          setCurrentTranscript(data.text);
+        } else if (data.type === 'transcript' && data.role === 'user') {
           console.log(`[${new Date().toLocaleTimeString()}] Transcript received:`, data.text);
           setMessages(prev => [...prev, { role: 'user', content: data.text, timestamp: new Date() }]);
           setCurrentTranscript('');
@@ -114,6 +135,7 @@ export default function VoiceInterview({ sessionId, interviewType, candidateName
       if (audioContextRef.current) {
         audioContextRef.current.close();
       }
+      streamingPlayerRef.current?.close();
     };
   }, [sessionId]);
 
@@ -250,6 +272,9 @@ export default function VoiceInterview({ sessionId, interviewType, candidateName
     // Clear the audio queue
     audioQueueRef.current = [];
     isPlayingRef.current = false;
+
+    // Drop the rest of a reply streaming as framed chunks
+    streamingPlayerRef.current?.stop();
   };
 
   const playNextAudioChunk = async () => {
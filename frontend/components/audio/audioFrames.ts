@@ -0,0 +1,183 @@
+// Framed TTS audio chunks (see backend/app/services/tts_service.py frame_audio_chunk).
+//
+// After the client sends {"type": "audio_config", "stream_chunks": true} and the
+// server confirms it, each binary message is one frame:
+//
+//   bytes 0-1  magic "TT"
+//   bytes 2-3  reply id      (uint16, big-endian, wraps at 65536)
+//   bytes 4-5  sentence id   (uint16, big-endian, index within the reply)
+//   bytes 6-7  sequence      (uint16, big-endian, index within the sentence)
+//   byte  8    flags         (0x01 = end of sentence)
+//   bytes 9-   MP3 bytes, empty on the end-of-sentence frame
+//
+// Frames arrive in order: sentences of a reply one after another, and the
+// chunks of a sentence in sequence order.
+
+export const AUDIO_FRAME_HEADER_SIZE = 9;
+export const FRAME_FLAG_END_OF_SENTENCE = 0x01;
+
+export type AudioFrame = {
+  replyId: number;
+  sentenceId: number;
+  sequence: number;
+  endOfSentence: boolean;
+  data: Uint8Array<ArrayBuffer>;
+};
+
+export function parseAudioFrame(buffer: ArrayBuffer): AudioFrame | null {
+  if (buffer.byteLength < AUDIO_FRAME_HEADER_SIZE) {
+    return null;
+  }
+  const view = new DataView(buffer);
+  // "TT"
+  if (view.getUint8(0) !== 0x54 || view.getUint8(1) !== 0x54) {
+    return null;
+  }
+  const flags = view.getUint8(8);
+  return {
+    replyId: view.getUint16(2),
+    sentenceId: view.getUint16(4),
+    sequence: view.getUint16(6),
+    endOfSentence: (flags & FRAME_FLAG_END_OF_SENTENCE) !== 0,
+    data: new Uint8Array(buffer, AUDIO_FRAME_HEADER_SIZE)
+  };
+}
+
+// Progressive playback needs MediaSource with MP3 support; without it the
+// client does not negotiate framed chunks and keeps whole-sentence audio.
+export function supportsFramedAudio(): boolean {
+  return typeof window !== 'undefined'
+    && typeof MediaSource !== 'undefined'
+    && MediaSource.isTypeSupported('audio/mpeg');
+}
+
+// Plays one reply's frames as they arrive by appending their MP3 bytes to a
+// MediaSource. Sentences are appended back to back in 'sequence' mode, so the
+// audio continues across sentence boundaries without gaps.
+class ReplyStream {
+  readonly replyId: number;
+  readonly audio: HTMLAudioElement;
+  private mediaSource: MediaSource;
+  private sourceBuffer: SourceBuffer | null = null;
+  private pending: Uint8Array<ArrayBuffer>[] = [];
+  private ended = false;
+  private url: string;
+
+  constructor(replyId: number, onEnded: () => void, onError: (message: string) => void) {
+    this.replyId = replyId;
+    this.mediaSource = new MediaSource();
+    this.url = URL.createObjectURL(this.mediaSource);
+    this.audio = new Audio(this.url);
+    this.audio.onended = onEnded;
+    this.audio.onerror = () => onError('Failed to play audio stream');
+
+    this.mediaSource.addEventListener('sourceopen', () => {
+      this.sourceBuffer = this.mediaSource.addSourceBuffer('audio/mpeg');
+      this.sourceBuffer.mode = 'sequence';
+      this.sourceBuffer.addEventListener('updateend', () => this.flush());
+      this.flush();
+    }, { once: true });
+  }
+
+  append(data: Uint8Array<ArrayBuffer>) {
+    if (data.byteLength) {
+      this.pending.push(data);
+      this.flush();
+    }
+  }
+
+  // No more frames will come for this reply: play out what is buffered, then end
+  end() {
+    this.ended = true;
+    this.flush();
+  }
+
+  play() {
+    this.audio.play().catch(() => {
+      // Autoplay may be refused until the next user gesture; the reply stays buffered
+    });
+  }
+
+  close() {
+    this.pending = [];
+    this.audio.onended = null;
+    this.audio.onerror = null;
+    this.audio.pause();
+    this.audio.removeAttribute('src');
+    this.audio.load();
+    URL.revokeObjectURL(this.url);
+  }
+
+  private flush() {
+    const sourceBuffer = this.sourceBuffer;
+    if (!sourceBuffer || sourceBuffer.updating || this.mediaSource.readyState !== 'open') {
+      return;
+    }
+    const next = this.pending.shift();
+    if (next) {
+      sourceBuffer.appendBuffer(next);
+    } else if (this.ended) {
+      this.mediaSource.endOfStream();
+    }
+  }
+}
+
+// Plays framed replies in order. A reply starts as soon as its first chunk
+// arrives (or when the previous reply finishes), and the frames of a reply
+// that was interrupted by the candidate are dropped.
+export class StreamingAudioPlayer {
+  private current: ReplyStream | null = null;
+  private queued: ReplyStream[] = [];
+  private interruptedReplyId: number | null = null;
+  private onError: (message: string) => void;
+
+  constructor(onError: (message: string) => void) {
+    this.onError = onError;
+  }
+
+  handleFrame(frame: AudioFrame) {
+    if (frame.replyId === this.interruptedReplyId) {
+      return;
+    }
+    this.streamFor(frame.replyId).append(frame.data);
+  }
+
+  stop() {
+    const latest = this.queued[this.queued.length - 1] ?? this.current;
+    if (latest) {
+      this.interruptedReplyId = latest.replyId;
+    }
+    this.current?.close();
+    this.queued.forEach(stream => stream.close());
+    this.current = null;
+    this.queued = [];
+  }
+
+  close() {
+    this.stop();
+  }
+
+  private streamFor(replyId: number): ReplyStream {
+    const latest = this.queued[this.queued.length - 1] ?? this.current;
+    if (latest && latest.replyId === replyId) {
+      return latest;
+    }
+    // A new reply: the previous one gets no more frames
+    latest?.end();
+    const stream = new ReplyStream(replyId, () => this.advance(), this.onError);
+    this.interruptedReplyId = null;
+    if (this.current) {
+      this.queued.push(stream);
+    } else {
+      this.current = stream;
+      stream.play();
+    }
+    return stream;
+  }
+
+  private advance() {
+    this.current?.close();
+    this.current = this.queued.shift() ?? null;
+    this.current?.play();
+  }
+}
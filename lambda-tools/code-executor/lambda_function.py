@@ -7,8 +7,13 @@ Supports Python and JavaScript
 import json
 import sys
 import io
+import os
+import math
 import time
+import signal
+import resource
 import traceback
+import multiprocessing
 from typing import Dict, Any, List
 
 def lambda_handler(event, context):
@@ -117,115 +122,334 @@ def format_response(event: Dict, body: Dict, status_code: int = 200) -> Dict:
         }
 
 
-def execute_python(code: str, test_cases: List[Dict], function_name: str, timeout: int) -> Dict[str, Any]:
-    """
-    Execute Python code in sandboxed environment
-    """
-    results = {
-        'success': True,
-        'language': 'python',
-        'testResults': [],
-        'allTestsPassed': True,
-        'executionTime': 0,
-        'output': None,
+# Sandbox limits (seconds / MB); MAX_EXECUTION_TIME is the per-test wall-clock ceiling
+MAX_EXECUTION_TIME = float(os.environ.get('MAX_EXECUTION_TIME', '5'))
+MIN_EXECUTION_TIME = 0.1  # floor for caller-supplied per-test timeouts
+MAX_SUBMISSION_TIME = float(os.environ.get('MAX_SUBMISSION_TIME', '20'))  # all tests of one submission
+SANDBOX_POOL_SIZE = int(os.environ.get('SANDBOX_POOL_SIZE', '2'))
+SANDBOX_MAX_RUNS = int(os.environ.get('SANDBOX_MAX_RUNS', '50'))  # submissions before a worker is recycled
+SANDBOX_MEMORY_MB = int(os.environ.get('SANDBOX_MEMORY_MB', '256'))  # address space on top of the worker's own
+
+# Builtins available to candidate code (no imports, files or introspection)
+SAFE_BUILTINS = {
+    'abs': abs,
+    'all': all,
+    'any': any,
+    'bool': bool,
+    'dict': dict,
+    'enumerate': enumerate,
+    'filter': filter,
+    'float': float,
+    'int': int,
+    'len': len,
+    'list': list,
+    'map': map,
+    'max': max,
+    'min': min,
+    'print': print,
+    'range': range,
+    'reversed': reversed,
+    'set': set,
+    'sorted': sorted,
+    'str': str,
+    'sum': sum,
+    'tuple': tuple,
+    'zip': zip,
+}
+
+
+def _limit_memory(extra_mb: int):
+    """Cap the worker's address space at its current size plus extra_mb"""
+    if extra_mb <= 0:
+        return
+    with open('/proc/self/statm') as f:
+        current = int(f.read().split()[0]) * resource.getpagesize()
+    limit = current + extra_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _limit_cpu(seconds: float):
+    """Allow `seconds` more CPU time from now; exceeding it kills the worker with SIGXCPU"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(math.ceil(usage.ru_utime + usage.ru_stime + seconds))
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _load_function(compiled, function_name: str):
+    """Run the candidate module in fresh globals and return the function (or None)"""
+    sandbox_globals = {'__builtins__': dict(SAFE_BUILTINS)}
+    exec(compiled, sandbox_globals)
+    return sandbox_globals.get(function_name)
+
+
+def _run_test(compiled, function_name: str, index: int, test_case: Dict) -> Dict[str, Any]:
+    """Run one test case against a fresh copy of the candidate's module"""
+    test_result = {
+        'testCase': index + 1,
+        'passed': False,
+        'input': test_case.get('input'),
+        'expected': test_case.get('expected'),
+        'actual': None,
         'error': None
     }
 
-    start_time = time.time()
-
     try:
-        # Create restricted globals (no dangerous imports)
-        safe_globals = {
-            '__builtins__': {
-                'abs': abs,
-                'all': all,
-                'any': any,
-                'bool': bool,
-                'dict': dict,
-                'enumerate': enumerate,
-                'filter': filter,
-                'float': float,
-                'int': int,
-                'len': len,
-                'list': list,
-                'map': map,
-                'max': max,
-                'min': min,
-                'print': print,
-                'range': range,
-                'reversed': reversed,
-                'set': set,
-                'sorted': sorted,
-                'str': str,
-                'sum': sum,
-                'tuple': tuple,
-                'zip': zip,
-            }
-        }
+        # Parse input (eval safely)
+        test_input = eval(test_case['input'], {"__builtins__": {}})
+        expected_output = eval(test_case['expected'], {"__builtins__": {}})
 
-        # Execute the user's code
-        exec(code, safe_globals)
+        user_function = _load_function(compiled, function_name)
+        if isinstance(test_input, (list, tuple)):
+            actual_output = user_function(*test_input)
+        else:
+            actual_output = user_function(test_input)
 
-        # Check if function exists
-        if function_name not in safe_globals:
-            results['success'] = False
-            results['error'] = f"Function '{function_name}' not found in code"
-            return results
+        test_result['actual'] = str(actual_output)
+        test_result['passed'] = actual_output == expected_output
 
-        user_function = safe_globals[function_name]
+    except MemoryError:
+        test_result['error'] = f'Memory limit exceeded ({SANDBOX_MEMORY_MB} MB)'
+    except Exception as e:
+        test_result['error'] = str(e)
 
-        # Run test cases
-        for i, test_case in enumerate(test_cases):
-            test_result = {
-                'testCase': i + 1,
-                'passed': False,
-                'input': test_case.get('input'),
-                'expected': test_case.get('expected'),
-                'actual': None,
-                'error': None
-            }
+    return test_result
 
-            try:
-                # Parse input (eval safely)
-                test_input = eval(test_case['input'], {"__builtins__": {}})
-                expected_output = eval(test_case['expected'], {"__builtins__": {}})
 
-                # Call function with timeout
-                if isinstance(test_input, (list, tuple)):
-                    actual_output = user_function(*test_input)
-                else:
-                    actual_output = user_function(test_input)
+def _sandbox_worker(conn, memory_mb: int):
+    """
+    Sandbox worker process loop
 
-                test_result['actual'] = str(actual_output)
+    Receives jobs {code, functionName, testCases, cpuLimit} and answers with
+    ('ready',) or ('error', message, violated), then ('test', result, violated)
+    per test and ('done',). Runs until the pipe closes.
+    """
+    _limit_memory(memory_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+
+        function_name = job['functionName']
+        try:
+            _limit_cpu(job['cpuLimit'])
+            compiled = compile(job['code'], '<candidate>', 'exec')
+            if _load_function(compiled, function_name) is None:
+                conn.send(('error', f"Function '{function_name}' not found in code", False))
+                continue
+        except SyntaxError as e:
+            conn.send(('error', f'Syntax Error: {str(e)}', False))
+            continue
+        except MemoryError:
+            # The heap may be left fragmented near the limit, so this worker must be replaced
+            conn.send(('error', f'Runtime Error: Memory limit exceeded ({SANDBOX_MEMORY_MB} MB) while loading the code', True))
+            continue
+        except Exception as e:
+            conn.send(('error', f'Runtime Error: {str(e)}', False))
+            continue
+        conn.send(('ready',))
+
+        for index, test_case in job['testCases']:
+            _limit_cpu(job['cpuLimit'])
+            test_result = _run_test(compiled, function_name, index, test_case)
+            conn.send(('test', test_result, test_result['error'] is not None and 'Memory limit' in test_result['error']))
+        conn.send(('done',))
+
+
+class SandboxWorker:
+    """A pre-forked sandbox process and the parent's end of its pipe"""
+
+    def __init__(self):
+        # Lambda has no /dev/shm, so only fork + Pipe (no Queue/Pool) is used
+        ctx = multiprocessing.get_context('fork')
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_sandbox_worker, args=(child_conn, SANDBOX_MEMORY_MB), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+    def exit_reason(self) -> str:
+        self.process.join(0.5)
+        if self.process.exitcode == -signal.SIGXCPU:
+            return 'CPU time limit exceeded'
+        return f'Sandbox worker terminated (exit code {self.process.exitcode}); memory limit or crash'
+
+
+class SandboxPool:
+    """
+    Warm sandbox workers, forked from the initialized handler process so each
+    submission skips interpreter start-up and imports. A worker is recycled
+    after SANDBOX_MAX_RUNS submissions or as soon as it breaks a limit.
+    """
 
-                # Compare results
-                if actual_output == expected_output:
-                    test_result['passed'] = True
-                else:
-                    test_result['passed'] = False
-                    results['allTestsPassed'] = False
+    def __init__(self, size: int, max_runs: int):
+        self.size = max(1, size)
+        self.max_runs = max_runs
+        self.idle: List[SandboxWorker] = []
+        self.recycled = 0
+
+    def acquire(self) -> SandboxWorker:
+        while self.idle:
+            worker = self.idle.pop()
+            if worker.is_alive():
+                return worker
+            worker.kill()
+        return SandboxWorker()
+
+    def release(self, worker: SandboxWorker, violated: bool = False):
+        worker.runs += 1
+        if violated or worker.runs >= self.max_runs or not worker.is_alive():
+            worker.kill()
+            self.recycled += 1
+        else:
+            self.idle.append(worker)
+        self.fill()
 
-            except Exception as e:
-                test_result['error'] = str(e)
-                test_result['passed'] = False
-                results['allTestsPassed'] = False
+    def fill(self):
+        while len(self.idle) < self.size:
+            self.idle.append(SandboxWorker())
 
-            results['testResults'].append(test_result)
 
-        # Store output from last successful run
-        if results['testResults'] and results['testResults'][-1].get('actual'):
-            results['output'] = results['testResults'][-1]['actual']
+# Forked during the Lambda init phase, reused by every invocation of this environment
+sandbox_pool = SandboxPool(SANDBOX_POOL_SIZE, SANDBOX_MAX_RUNS)
 
-    except SyntaxError as e:
-        results['success'] = False
-        results['error'] = f'Syntax Error: {str(e)}'
-        results['allTestsPassed'] = False
 
-    except Exception as e:
-        results['success'] = False
-        results['error'] = f'Runtime Error: {str(e)}'
+def execute_python(code: str, test_cases: List[Dict], function_name: str, timeout: int) -> Dict[str, Any]:
+    """
+    Execute Python code in a pooled sandbox worker
+
+    Every test runs against a fresh copy of the candidate's module with its
+    own CPU and wall-clock limit (timeout, capped at MAX_EXECUTION_TIME). A
+    test that breaks a limit fails, its worker is replaced and the remaining
+    tests continue on a fresh one, until MAX_SUBMISSION_TIME runs out.
+    """
+    results = {
+        'success': True,
+        'language': 'python',
+        'testResults': [],
+        'allTestsPassed': True,
+        'executionTime': 0,
+        'output': None,
+        'error': None
+    }
+
+    start_time = time.time()
+    try:
+        requested_time = float(timeout) if timeout is not None else MAX_EXECUTION_TIME
+    except (TypeError, ValueError):
+        requested_time = MAX_EXECUTION_TIME
+    # Zero, negative or NaN timeouts must not disable or undercut the wall-clock limit
+    time_limit = min(max(requested_time, MIN_EXECUTION_TIME), MAX_EXECUTION_TIME)
+    if math.isnan(time_limit):
+        time_limit = MAX_EXECUTION_TIME
+    submission_deadline = time.monotonic() + MAX_SUBMISSION_TIME
+    pending = list(enumerate(test_cases))
+
+    def fail_test(index: int, test_case: Dict, error: str):
+        results['testResults'].append({
+            'testCase': index + 1,
+            'passed': False,
+            'input': test_case.get('input'),
+            'expected': test_case.get('expected'),
+            'actual': None,
+            'error': error
+        })
         results['allTestsPassed'] = False
 
+    def receive(worker: SandboxWorker, wait_time: float = None):
+        """Next message from the worker, or None once the time limit (or submission budget) is hit"""
+        if wait_time is None:
+            wait_time = min(time_limit, submission_deadline - time.monotonic())
+        if wait_time <= 0 or not worker.conn.poll(wait_time):
+            return None
+        return worker.conn.recv()
+
+    while True:
+        worker = sandbox_pool.acquire()
+        loaded = False
+        violation = None
+        violation_recorded = False
+        # A worker is only reused once it has answered ('done',); anything else
+        # (a late or unexpected message) would be read by the next submission
+        healthy = False
+        try:
+            worker.conn.send({
+                'code': code,
+                'functionName': function_name,
+                'testCases': pending,
+                'cpuLimit': time_limit
+            })
+            message = receive(worker)
+            if message is None:
+                violation = f'Timeout: execution exceeded {time_limit} seconds'
+            elif message[0] == 'error':
+                results['success'] = False
+                results['error'] = message[1]
+                results['allTestsPassed'] = False
+                healthy = not message[2]
+            elif message != ('ready',):
+                violation = f'Sandbox worker sent an unexpected message ({message[0]!r})'
+            else:
+                loaded = True
+                while pending:
+                    message = receive(worker)
+                    if message is None:
+                        violation = f'Timeout: execution exceeded {time_limit} seconds'
+                        break
+                    if len(message) != 3 or message[0] != 'test':
+                        violation = f'Sandbox worker sent an unexpected message ({message[0]!r})'
+                        break
+                    _, test_result, violated = message
+                    pending.pop(0)
+                    results['testResults'].append(test_result)
+                    if not test_result['passed']:
+                        results['allTestsPassed'] = False
+                    if violated:
+                        violation = test_result['error']
+                        violation_recorded = True
+                        break
+                else:
+                    # Sent right after the last result, so the submission budget does not apply
+                    healthy = receive(worker, time_limit) == ('done',)
+        except (EOFError, OSError):
+            violation = worker.exit_reason()
+        finally:
+            sandbox_pool.release(worker, violated=violation is not None or not healthy)
+
+        if violation is None:
+            break
+        if not loaded:
+            # Loading the module itself broke a limit, so no test can run
+            results['success'] = False
+            results['error'] = f'Runtime Error: {violation} while loading the code'
+            results['allTestsPassed'] = False
+            break
+        if not violation_recorded and pending:
+            index, test_case = pending.pop(0)
+            fail_test(index, test_case, violation)
+        if pending and time.monotonic() >= submission_deadline:
+            for index, test_case in pending:
+                fail_test(index, test_case, f'Not run: submission exceeded {MAX_SUBMISSION_TIME} seconds')
+            break
+        if not pending:
+            break
+
+    # Store output from last successful run
+    if results['testResults'] and results['testResults'][-1].get('actual'):
+        results['output'] = results['testResults'][-1]['actual']
+
     results['executionTime'] = round(time.time() - start_time, 3)
 
     return results
@@ -0,0 +1,233 @@
+"""
+Python sandbox: per-test limits, worker recycling after a violation, fresh
+module state per test, clamping of caller-supplied timeouts, and workers that
+return to the pool only with nothing left in their pipe.
+
+Run from this directory: python -m pytest -q test_sandbox.py
+"""
+
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import lambda_function  # noqa: E402
+from lambda_function import execute_python  # noqa: E402
+
+SQUARE = '''
+def square(n):
+    return n * n
+'''
+
+SQUARE_TESTS = [
+    {'input': '3', 'expected': '9'},
+    {'input': '-4', 'expected': '16'},
+]
+
+
+def passed(results: dict) -> list:
+    return [test['passed'] for test in results['testResults']]
+
+
+def test_passing_solution():
+    results = execute_python(SQUARE, SQUARE_TESTS, 'square', 2)
+
+    assert results['success']
+    assert results['allTestsPassed']
+    assert passed(results) == [True, True]
+    assert results['output'] == '16'
+
+
+def test_wrong_answer_fails_only_that_test():
+    code = '''
+def square(n):
+    return n * n if n > 0 else n
+'''
+    results = execute_python(code, SQUARE_TESTS, 'square', 2)
+
+    assert results['success']
+    assert not results['allTestsPassed']
+    assert passed(results) == [True, False]
+
+
+def test_infinite_loop_times_out_and_later_tests_still_run():
+    code = '''
+def spin(n):
+    while n < 0:
+        pass
+    return n
+'''
+    tests = [
+        {'input': '1', 'expected': '1'},
+        {'input': '-1', 'expected': '-1'},
+        {'input': '2', 'expected': '2'},
+    ]
+    results = execute_python(code, tests, 'spin', 1)
+
+    assert results['success']
+    assert passed(results) == [True, False, True]
+    assert [test['testCase'] for test in results['testResults']] == [1, 2, 3]
+    error = results['testResults'][1]['error']
+    assert 'Timeout' in error or 'CPU time' in error
+
+
+def test_memory_bomb_fails_and_worker_is_recycled():
+    code = '''
+def allocate(n):
+    if n:
+        return len('x' * (n * 1024 * 1024 * 1024))
+    return 0
+'''
+    tests = [
+        {'input': '4', 'expected': '0'},
+        {'input': '0', 'expected': '0'},
+    ]
+    recycled = lambda_function.sandbox_pool.recycled
+    results = execute_python(code, tests, 'allocate', 2)
+
+    assert passed(results) == [False, True]
+    assert 'Memory limit' in results['testResults'][0]['error']
+    assert lambda_function.sandbox_pool.recycled > recycled
+
+
+def test_module_state_is_fresh_for_every_test():
+    code = '''
+calls = []
+
+def count(n):
+    calls.append(n)
+    return len(calls)
+'''
+    tests = [{'input': str(n), 'expected': '1'} for n in range(3)]
+    results = execute_python(code, tests, 'count', 2)
+
+    assert passed(results) == [True, True, True]
+
+
+def test_syntax_error_is_reported():
+    results = execute_python('def square(n)\n    return n', SQUARE_TESTS, 'square', 2)
+
+    assert not results['success']
+    assert results['error'].startswith('Syntax Error')
+    assert results['testResults'] == []
+
+
+def test_missing_function_is_reported():
+    results = execute_python(SQUARE, SQUARE_TESTS, 'cube', 2)
+
+    assert not results['success']
+    assert results['error'] == "Function 'cube' not found in code"
+
+
+def test_imports_are_unavailable():
+    code = '''
+def escape(n):
+    import os
+    return os.getcwd()
+'''
+    results = execute_python(code, [{'input': '0', 'expected': '0'}], 'escape', 2)
+
+    assert passed(results) == [False]
+    assert results['testResults'][0]['error']
+
+
+@pytest.mark.parametrize('timeout', [0, -5, 'soon', None, float('nan')])
+def test_degenerate_timeouts_are_clamped(timeout):
+    results = execute_python(SQUARE, SQUARE_TESTS, 'square', timeout)
+
+    assert results['allTestsPassed']
+
+
+def test_timeout_above_the_ceiling_is_capped(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'MAX_EXECUTION_TIME', 0.5)
+    code = '''
+def spin(n):
+    while True:
+        pass
+'''
+    results = execute_python(code, [{'input': '0', 'expected': '0'}], 'spin', 60)
+
+    assert passed(results) == [False]
+    assert results['executionTime'] < 5
+
+
+def test_submission_budget_fails_the_remaining_tests(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'MAX_SUBMISSION_TIME', 1.5)
+    code = '''
+def spin(n):
+    while True:
+        pass
+'''
+    tests = [{'input': str(n), 'expected': '0'} for n in range(5)]
+    results = execute_python(code, tests, 'spin', 1)
+
+    assert passed(results) == [False] * 5
+    assert any(test['error'].startswith('Not run') for test in results['testResults'])
+    assert results['executionTime'] < 5
+
+
+def test_memory_bomb_while_loading_recycles_the_worker():
+    code = """
+ballast = 'x' * (4 * 1024 * 1024 * 1024)
+
+def square(n):
+    return n * n
+"""
+    recycled = lambda_function.sandbox_pool.recycled
+    results = execute_python(code, SQUARE_TESTS, 'square', 2)
+
+    assert not results['success']
+    assert 'Memory limit' in results['error']
+    assert lambda_function.sandbox_pool.recycled > recycled
+    assert execute_python(SQUARE, SQUARE_TESTS, 'square', 2)['allTestsPassed']
+
+
+class LateClockConnection:
+    """Worker pipe that exhausts the submission budget once the last result is read"""
+
+    def __init__(self, conn, clock):
+        self.conn = conn
+        self.clock = clock
+
+    def send(self, obj):
+        self.conn.send(obj)
+
+    def poll(self, timeout=0.0):
+        return self.conn.poll(timeout)
+
+    def recv(self):
+        message = self.conn.recv()
+        if message[0] == 'test':
+            self.clock.offset = 3600
+        return message
+
+    def close(self):
+        self.conn.close()
+
+
+def test_worker_is_released_only_after_done(monkeypatch):
+    clock = types.SimpleNamespace(offset=0)
+    monkeypatch.setattr(lambda_function, 'time', types.SimpleNamespace(
+        time=time.time, monotonic=lambda: time.monotonic() + clock.offset
+    ))
+    pool = lambda_function.sandbox_pool
+    acquire = pool.acquire
+
+    def acquire_with_late_clock():
+        worker = acquire()
+        if not isinstance(worker.conn, LateClockConnection):
+            worker.conn = LateClockConnection(worker.conn, clock)
+        return worker
+
+    monkeypatch.setattr(pool, 'acquire', acquire_with_late_clock)
+    results = execute_python(SQUARE, SQUARE_TESTS[:1], 'square', 2)
+    monkeypatch.undo()
+
+    assert passed(results) == [True]
+    # No worker goes back to the pool with an unread message for the next submission
+    assert not any(worker.conn.poll(0) for worker in pool.idle)
+    assert execute_python(SQUARE, SQUARE_TESTS, 'square', 2)['allTestsPassed']